@@ -2,4 +2,22 @@ from AyUI.core.engine import Engine
 from AyUI.core.activity import Activity
 from AyUI.core.event import Event
 from AyUI.core.view import View
-from AyUI.core.drawable import Drawable
\ No newline at end of file
+from AyUI.core.drawable import Drawable
+from AyUI.core.style import Style, Theme, style, use_theme
+
+# 视图和组件在第一次使用时才导入，减少启动时间和内存占用
+_lazy = {
+    "BasicView": "AyUI.views.basic",
+    "ColumnView": "AyUI.views.column",
+    "ScrollView": "AyUI.views.scroll",
+    "Memtest": "AyUI.widgets.memtest",
+    "Pixel": "AyUI.widgets.pixel",
+}
+
+
+def __getattr__(name):
+    if name in _lazy:
+        value = getattr(__import__(_lazy[name], None, None, (name,)), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(name)
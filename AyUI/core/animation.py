@@ -0,0 +1,120 @@
+import time
+from micropython import const
+from AyUI.core.layer import touch
+
+# 动画进度使用Q10定点数表示，0~1024对应0~1，避免在MicroPython上分配浮点数
+ONE = const(1024)
+
+
+def linear(t):
+    return t
+
+
+def ease_in(t):
+    return (t * t) >> 10
+
+
+def ease_out(t):
+    t = ONE - t
+    return ONE - ((t * t) >> 10)
+
+
+def ease_in_out(t):
+    if t < 512:
+        return (t * t) >> 9
+    t = ONE - t
+    return ONE - ((t * t) >> 9)
+
+
+class Animation:
+    """数值属性的补间动画，由Animator创建和推进"""
+
+    def __init__(self, target, attr: str, start: int, end: int, duration: int,
+                 easing, region, on_done, owner, surface):
+        self.target = target
+        self.attr = attr
+        self.start = start
+        self.delta = end - start
+        self.duration = duration if duration > 0 else 1
+        self.easing = easing
+        self.region = region        # 受影响的区域 (x, y, w, h)，None为整个画面
+        self.on_done = on_done
+        self.owner = owner          # 创建动画的Instance，Activity销毁时一并取消
+        self.surface = surface      # 需要重绘的显示表面
+        self.begin = surface.engine.now()
+        self.finished = False
+
+
+class Animator:
+    """动画调度器，由Engine持有，每帧统一推进所有动画"""
+
+    def __init__(self, engine):
+        self._engine = engine
+        self.animations = []
+
+    @property
+    def active(self):
+        return len(self.animations) > 0
+
+    def active_on(self, surface):
+        """是否有动画正在改变该显示表面"""
+        for a in self.animations:
+            if a.surface is surface:
+                return True
+        return False
+
+    def tween(self, target, attr: str, end: int, duration: int, easing=ease_out,
+              start: int = None, region=None, on_done=None, owner=None):
+        """在duration毫秒内将target.attr从start变化到end，start默认为当前值"""
+        if start is None:
+            start = getattr(target, attr)
+        self.cancel(target, attr)
+        surface = self._engine.surface if owner is None else owner.surface
+        animation = Animation(target, attr, start, end, duration,
+                              easing, region, on_done, owner, surface)
+        self.animations.append(animation)
+        surface.invalidate(region)
+        return animation
+
+    def cancel(self, target, attr: str = None):
+        """取消target上的动画，attr为None时取消该对象的所有动画"""
+        for a in self.animations:
+            if a.target is target and (attr is None or a.attr == attr):
+                a.finished = True
+        self._sweep()
+
+    def cancel_owner(self, owner):
+        """取消某个Instance创建的所有动画"""
+        for a in self.animations:
+            if a.owner is owner:
+                a.finished = True
+        self._sweep()
+
+    def tick(self, now: int):
+        """推进所有动画到now时刻，并标记受影响的区域"""
+        if len(self.animations) == 0:
+            return
+        finished = False
+        for a in self.animations:
+            if a.finished:
+                finished = True
+                continue
+            elapsed = time.ticks_diff(now, a.begin)
+            if elapsed >= a.duration:
+                t = ONE
+                a.finished = True
+                finished = True
+            else:
+                t = (elapsed << 10) // a.duration
+            setattr(a.target, a.attr, a.start + ((a.delta * a.easing(t)) >> 10))
+            touch(a.target)
+            a.surface.invalidate(a.region, layout=True)  # 动画可能改变组件的尺寸
+        if finished:
+            done = [a for a in self.animations if a.finished]
+            self._sweep()
+            for a in done:
+                if a.on_done is not None:
+                    a.on_done(a.target)
+
+    def _sweep(self):
+        self.animations = [a for a in self.animations if not a.finished]
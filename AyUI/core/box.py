@@ -0,0 +1,19 @@
+from array import array
+from micropython import const
+
+# 盒模型数组中的下标
+MARGIN = const(0)   # 外边距 左上右下，0~3
+PADDING = const(4)  # 内边距 左上右下，4~7
+BORDER = const(8)   # 边框宽度
+
+_boxes = {}
+
+
+def box(margin=(0, 0, 0, 0), padding=(0, 0, 0, 0), border=0):
+    """返回盒模型的紧凑表示array('h')，参数相同的元素共享同一个数组，因此不能修改返回值"""
+    key = (tuple(margin), tuple(padding), border)
+    b = _boxes.get(key)
+    if b is None:
+        b = array('h', key[0] + key[1] + (border,))
+        _boxes[key] = b
+    return b
@@ -0,0 +1,77 @@
+import gc
+import time
+
+
+class Collector:
+    """垃圾回收调度器，由Engine持有
+    只在帧末尾剩余时间足够时回收，避免MicroPython在分配内存时自动回收造成卡顿"""
+
+    def __init__(self, engine, enabled=False):
+        self._engine = engine
+        self.enabled = enabled
+        self.soft = 0           # 距上次回收分配超过该字节数时需要回收
+        self.reserve = 0        # 剩余内存低于该字节数时不再等待空闲时间
+        self.estimate = 0       # 预计的回收耗时(ms)
+        self.count = 0          # 回收次数
+        self.last_us = 0        # 最近一次回收的耗时(us)
+        self.max_us = 0         # 最长的一次回收耗时(us)
+        self._base = 0          # 上次回收后已分配的内存
+        self._forced = False
+        self._idle_done = False  # 本次空闲期间是否已经回收过
+        if enabled:
+            self.configure()
+
+    def configure(self, soft: int = None, reserve: int = None):
+        """设置回收条件，默认分配超过堆的1/8时回收，剩余内存低于堆的1/8时立即回收
+        自动回收的阈值设为堆的1/4，只作为调度器来不及回收时的保底"""
+        gc.enable()
+        gc.collect()
+        heap = gc.mem_free() + gc.mem_alloc()
+        self.soft = soft if soft is not None else heap // 8
+        self.reserve = reserve if reserve is not None else heap // 8
+        gc.threshold(heap // 4)
+        self._base = gc.mem_alloc()
+
+    def needed(self):
+        """是否需要回收"""
+        return self._forced or gc.mem_alloc() - self._base >= self.soft \
+            or gc.mem_free() < self.reserve
+
+    def request(self):
+        """在本帧结束时回收，用于Activity切换之后"""
+        self._forced = True
+
+    def step(self, slack: int):
+        """帧末尾调用，slack为距下一帧的剩余时间(ms)，返回是否进行了回收"""
+        self._idle_done = False     # 渲染了新的一帧，下次空闲时可以再回收一次
+        if not self.enabled or not self.needed():
+            return False
+        if not self._forced and gc.mem_free() >= self.reserve \
+                and slack <= self.estimate:
+            return False    # 时间不够，留到之后的帧
+        self.collect()
+        return True
+
+    def idle(self):
+        """空闲时调用，有任何新分配就回收，每次空闲期间最多回收一次
+        空闲期间帧循环会因为轮询输入、喂狗而多次醒来，不应每次都回收"""
+        if self.enabled and not self._idle_done and gc.mem_alloc() > self._base:
+            self._idle_done = True
+            self.collect()
+
+    def collect(self):
+        """立即回收并记录耗时"""
+        self._engine.feed()
+        start = time.ticks_us()
+        gc.collect()
+        pause = time.ticks_diff(time.ticks_us(), start)
+        self._forced = False
+        self._base = gc.mem_alloc()
+        self.count += 1
+        self.last_us = pause
+        if pause > self.max_us:
+            self.max_us = pause
+        # 预计耗时向上取整，增长时立即跟上，减少时缓慢回落
+        ms = (pause + 999) // 1000
+        self.estimate = ms if ms > self.estimate else (self.estimate * 3 + ms) // 4
+        self._engine.report("gc", pause)
@@ -2,30 +2,56 @@ from AyUI.core.event import Event
 from AyUI.core.instance import Instance
 
 class ActivityCtrl:
-    """用于控制引擎相关"""
+    """用于控制引擎相关，作用于Activity所在的显示表面"""
 
-    def __init__(self, engine):
-        self._engine = engine
+    def __init__(self, surface, instance: Instance = None):
+        self._surface = surface
+        self._engine = surface.engine
+        self._instance = instance
 
     def change(self, activity_name: str):
         """更改当前Activity，这会导致前一个Activity被摧毁"""
         assert type(activity_name) is str, Exception(
             "The 'activity_name' must be string")
-        self._engine.commit(Event(Event.CHANGE_ACTIVITY, activity_name))
+        self._surface.commit(Event(Event.CHANGE_ACTIVITY, activity_name))
 
     def push(self, activity_name: str):
         """创建并进入一个Activity"""
         assert type(activity_name) is str, Exception(
             "The 'activity_name' must be string")
-        self._engine.commit(Event(Event.PUSH_ACTIVITY, activity_name))
+        self._surface.commit(Event(Event.PUSH_ACTIVITY, activity_name))
 
     def pop(self):
         """返回上一个Activity"""
-        self._engine.commit(Event(Event.POP_ACTIVITY))
+        self._surface.commit(Event(Event.POP_ACTIVITY))
 
     def create_event(self, event: Event):
         """创建一个事件"""
-        self._engine.commit(event)
+        self._surface.commit(event)
+
+    def invalidate(self, rect=None, layout=False):
+        """通知引擎当前画面需要重绘，rect为(x, y, w, h)，None为整个画面
+        只重绘rect且修改了组件的尺寸时，需要传入layout=True重新计算布局"""
+        self._surface.invalidate(rect, layout)
+
+    def update(self):
+        """在下一帧重新调用view()，只更新发生变化的节点，保留其余节点的布局和缓存"""
+        self._instance.stale = True
+        self._surface.wake()
+
+    def submit(self, gen, event: str = None):
+        """提交一个生成器任务，在每帧剩余的时间内分段执行，不会阻塞帧循环
+        完成后当前Activity会收到事件event，负载为生成器return的值；Activity销毁时自动取消"""
+        return self._engine.jobs.submit(gen, event, owner=self._instance, surface=self._surface)
+
+    def state(self, value=None):
+        """创建一个状态，使用state.bind(组件, 属性名)绑定后，修改状态只重绘绑定的组件"""
+        return self._instance.store.state(value)
+
+    def animate(self, target, attr: str, end: int, duration: int, **kw):
+        """创建一个补间动画，参数与Animator.tween相同，Activity销毁时自动取消"""
+        return self._engine.animator.tween(
+            target, attr, end, duration, owner=self._instance, **kw)
 
 
 class EventCtrl:
@@ -37,4 +63,9 @@ class EventCtrl:
     def on(self, event_name: str, callback):
         """注册一个事件监听函数"""
         assert callable(callback), Exception("'callback' should be callable")
-        self._instance.event_reg(event_name, callback)
\ No newline at end of file
+        self._instance.event_reg(event_name, callback)
+
+    @property
+    def focus(self):
+        """当前Activity的焦点管理"""
+        return self._instance.focus
\ No newline at end of file
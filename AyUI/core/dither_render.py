@@ -0,0 +1,92 @@
+from driver import dither
+from driver.dither import GRAY
+from AyUI.core.render import Renderer, FrameBufferRenderer
+
+
+class DitherRenderer(FrameBufferRenderer):
+    """单色MONO_VLSB屏幕（如SSD1306）的渲染后端，driver.dither.gray()生成的灰度颜色
+    以Bayer有序抖动绘制，其他颜色与FrameBufferRenderer相同；主题可以使用driver.dither.rgb转换颜色
+    temporal为True时相邻两帧使用错开的图案交替显示，看起来更接近灰色，画面中有灰度时每帧都会重绘，
+    缓存为位图的视图中的灰度不参与时间抖动"""
+
+    def __init__(self, target, width: int, height: int, temporal=False, buffer=None):
+        super().__init__(target, width, height)
+        self.buffer = target.buffer if buffer is None else buffer
+        self.temporal = temporal
+        self.phase = 0
+        self._gray = False  # 本帧是否绘制了灰度
+        # 灰度颜色需要抖动的图元，其余方法仍然直接使用FrameBuffer
+        self._fill_rect = target.fill_rect
+        self._pixel = target.pixel
+        self._hline = target.hline
+        self._vline = target.vline
+        self._line = target.line
+        self._rect = target.rect
+        self._text = target.text
+        self.fill_rect = self.dither_fill_rect
+        self.fill = self.dither_fill
+        self.pixel = self.dither_pixel
+        self.hline = self.dither_hline
+        self.vline = self.dither_vline
+        self.line = self.dither_line
+        self.rect = self.dither_rect
+        self.text = self.dither_text
+
+    @property
+    def animated(self):
+        return self.temporal and self._gray    # 上一帧绘制了灰度
+
+    def begin(self):
+        if self.temporal and self._gray:
+            self.phase ^= 1     # 与帧循环同步，每帧切换一次图案
+        self._gray = False
+
+    def layer(self, buf, fb, w: int, h: int):
+        return DitherRenderer(fb, w, h, buffer=buf)
+
+    def dither_fill_rect(self, x, y, w, h, c):
+        if c & GRAY:
+            self._gray = True
+            dither.fill(self.buffer, self.width, self.height, x, y, w, h, c, self.phase)
+        else:
+            self._fill_rect(x, y, w, h, c)
+
+    def dither_fill(self, c):
+        self.dither_fill_rect(0, 0, self.width, self.height, c)
+
+    def dither_pixel(self, x, y, c=None):
+        if c is None:
+            return self._pixel(x, y)
+        if c & GRAY:
+            self._gray = True
+            c = dither.bit(x, y, c, self.phase)
+        self._pixel(x, y, c)
+
+    def dither_hline(self, x, y, w, c):
+        if c & GRAY:
+            self.dither_fill_rect(x, y, w, 1, c)
+        else:
+            self._hline(x, y, w, c)
+
+    def dither_vline(self, x, y, h, c):
+        if c & GRAY:
+            self.dither_fill_rect(x, y, 1, h, c)
+        else:
+            self._vline(x, y, h, c)
+
+    def dither_rect(self, x, y, w, h, c, f=False):
+        if c & GRAY:
+            Renderer.rect(self, x, y, w, h, c, f)
+        else:
+            self._rect(x, y, w, h, c, f)
+
+    def dither_line(self, x0, y0, x1, y1, c):
+        if c & GRAY:
+            # 斜线很细，抖动后会断开，按亮度取0或1
+            c = 1 if (c & 0xFF) >= 128 else 0
+        self._line(x0, y0, x1, y1, c)
+
+    def dither_text(self, s, x, y, c=1):
+        if c & GRAY:
+            c = 1 if (c & 0xFF) >= 128 else 0
+        self._text(s, x, y, c)
@@ -2,6 +2,14 @@
 
 class Drawable:
     """基本绘画元素"""
+    focusable = False   # 是否可以获得焦点
+    focused = False     # 当前是否获得焦点
+    focus_index = -1    # 在焦点顺序中的位置
+    rect = None         # 最近一次布局的绝对区域 (x, y, w, h)，只记录可获得焦点的元素
+    moved = False       # rect在上次同步后是否发生变化
+    tracked = False     # 是否绑定了状态，为True时布局也会记录rect
+    key = None          # 重新调用view()时用于匹配节点
+    keep = ("rect", "moved", "focused", "focus_index", "tracked")  # 重新调用view()时保留的属性
 
     @property
     def width(self):
@@ -12,4 +20,21 @@ class Drawable:
         return 0
 
     def draw(self, framebuf, axis):
-        pass
\ No newline at end of file
+        pass
+
+    def keyed(self, key):
+        """设置key并返回自身，用于在view()中标识节点"""
+        self.key = key
+        return self
+
+    def place(self, axis):
+        """由布局在绘制前调用，记录元素的绝对区域"""
+        r = self.rect
+        w, h = self.width, self.height
+        if r is None or r[0] != axis[0] or r[1] != axis[1] or r[2] != w or r[3] != h:
+            self.rect = (axis[0], axis[1], w, h)
+            self.moved = True
+
+    def on_event(self, event: str, payload) -> bool:
+        """获得焦点时接收事件，返回True表示事件已被处理"""
+        return False
\ No newline at end of file
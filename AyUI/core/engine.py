@@ -1,29 +1,46 @@
-import uasyncio
 import time
-import gc
 
 from AyUI.core.event import Event
 from AyUI.core.activity import Activity
-from AyUI.core.view import View
-from AyUI.core.instance import Instance
-from AyUI.core.control import ActivityCtrl, EventCtrl
+from AyUI.core.surface import Surface
 
 
 class Engine:
     """AyUI渲染引擎"""
     enable = True
 
-    def __init__(self, width: int, height: int, root_framebuf, draw_exec, gc_flag=False):
-        self.width = width
-        self.height = height
-        self.framebuf = root_framebuf
-        self.draw_exec = draw_exec
-        self.gc = gc_flag
-        self.instances = []  # 页面数据
+    def __init__(self, width: int, height: int, root_framebuf, draw_exec, gc_flag=False, partial_flush=False,
+                 renderer=None):
         self.registry = dict()  # Activity 注册
-        self.events = []  # 全局事件列表
+        self.surfaces = []  # 所有显示表面
+        # 动画、输入、后台任务和垃圾回收在第一次使用时才导入和创建，见同名的属性
+        self._animator = None
+        self._input = None
+        self._jobs = None
+        self._collector = None
+        self._last_tick = None
+        self.wdt = None  # 看门狗，由watchdog()设置
+        self.wdt_timeout = 0
+        self._fed = 0  # 上一次喂狗的时间
+        self._deferred = []  # 延后执行的耗时操作
+        self.probe = None  # 性能记录回调 probe(name, value)，由instrument()设置
+        self.recorder = None  # 事件和帧耗时记录，由record()设置
+        self.virtual_time = None  # 回放时使用记录的时间
         if gc_flag:
-            gc.enable()
+            from AyUI.core.collector import Collector
+            self._collector = Collector(self, True)  # 由引擎调度垃圾回收
+        # 主显示表面，接收输入事件，单屏幕时Engine的方法都作用于它
+        self.surface = self.add_surface(
+            "main", width, height, root_framebuf, draw_exec, partial_flush=partial_flush, renderer=renderer)
+
+    def add_surface(self, name: str, width: int, height: int, framebuf, draw_exec,
+                    target_fps=20, partial_flush=False, power_save=0, renderer=None):
+        """添加一个显示表面，拥有独立的Activity栈、帧率和刷新回调
+        renderer为渲染后端（AyUI.core.render），默认绘制到framebuf"""
+        surface = Surface(self, name, width, height, framebuf, draw_exec,
+                          target_fps, partial_flush, power_save, renderer)
+        self.surfaces.append(surface)
+        return surface
 
     def register(self, name: str, activity):
         """注册一个activity"""
@@ -43,109 +60,200 @@ class Engine:
             return activity
         return reg
 
+    @property
+    def animator(self):
+        """动画调度器"""
+        if self._animator is None:
+            from AyUI.core.animation import Animator
+            self._animator = Animator(self)
+        return self._animator
+
+    @property
+    def input(self):
+        """输入子系统，注册按键和编码器"""
+        if self._input is None:
+            from AyUI.core.input import Input
+            self._input = Input(self)
+        return self._input
+
+    @property
+    def jobs(self):
+        """后台任务队列"""
+        if self._jobs is None:
+            from AyUI.core.jobs import Jobs
+            self._jobs = Jobs(self)
+        return self._jobs
+
+    @property
+    def collector(self):
+        """垃圾回收调度器，创建Engine时传入gc_flag=True才会启用"""
+        if self._collector is None:
+            from AyUI.core.collector import Collector
+            self._collector = Collector(self)
+        return self._collector
+
+    @property
+    def layers(self):
+        """视图缓存位图，layers.budget为总内存上限"""
+        from AyUI.core.layer import layers
+        return layers
+
+    @property
+    def width(self):
+        return self.surface.width
+
+    @property
+    def height(self):
+        return self.surface.height
+
+    @property
+    def framebuf(self):
+        return self.surface.framebuf
+
+    @property
+    def draw_exec(self):
+        return self.surface.draw_exec
+
+    @property
+    def instances(self):
+        return self.surface.instances
+
+    @property
+    def events(self):
+        return self.surface.events
+
     def create_activity(self, activity_name: str):
-        """创建一个activity"""
-        assert type(activity_name) is str, Exception(
-            "The 'activity_name' must be string")
-        activity = self.registry[activity_name]  # 从注册列表获取Activity类
-        instance = Instance(activity_name)      # 创建一个Instance用于保存信息
-        actctrl = ActivityCtrl(self)            # 创建一个Activity控制器
-        evtctrl = EventCtrl(instance)           # 创建一个Event控制器
-        instance.activity = activity(actctrl, evtctrl)
-        self.instances.append(instance)
-        instance.activity.onCreate()
-        view = instance.activity.view(
-            space=(self.width, self.height)
-        )
-        assert isinstance(view, View), TypeError(
-            "[ERR] in activity {}, view() returned an incorrect type".format(activity_name))
-        instance.view = view
+        """在主显示表面上创建一个activity"""
+        self.surface.create_activity(activity_name)
 
     def destroy_activity(self, index: int = None):
-        """删除一个activity"""
-        if index is None:
-            index = -1
-        self.instances[index].activity.onDestroy()
-        del self.instances[index].activity.activity
-        del self.instances[index].activity.event
-        del self.instances[index].activity
-        del self.instances[index]
+        """删除主显示表面上的一个activity"""
+        self.surface.destroy_activity(index)
 
     def start_activity_from(self, activity_name: str):
         """启动一个activity，一般用于定义最开始的activity"""
-        assert type(activity_name) is str, TypeError(
-            "The 'activity_name' must be string")
-        self.events.append(Event(Event.PUSH_ACTIVITY, activity_name))
+        self.surface.start_activity_from(activity_name)
 
     def commit(self, event: Event):
-        """创建一个事件，事件来自类Event"""
-        assert isinstance(event, Event), TypeError(
-            "'event' is not a vaild Event class")
-        self.events.append(event)
+        """创建一个事件，事件来自类Event，由主显示表面接收"""
+        self.surface.commit(event)
+
+    def invalidate(self, rect=None, layout=False):
+        """标记主显示表面需要重绘，rect为(x, y, w, h)，None为整个画面"""
+        self.surface.invalidate(rect, layout)
+
+    def wake(self):
+        """唤醒主显示表面空闲的帧循环，但不要求重绘"""
+        self.surface.wake()
+
+    def stop(self):
+        """停止所有表面的帧循环，start()在当前帧结束后返回；按需渲染时唤醒空闲的表面"""
+        self.enable = False
+        for surface in self.surfaces:
+            surface.wake()
+
+    def busy(self):
+        """主显示表面是否有需要持续刷新的内容"""
+        return self.surface.busy()
+
+    def busy_any(self):
+        """是否有任何显示表面正在持续刷新"""
+        for surface in self.surfaces:
+            if surface.busy() or surface.dirty:
+                return True
+        return False
 
     def handle_events(self):
-        """处理上一帧发生的事件"""
-        if len(self.events) == 0:
-            return
-        events = self.events.copy()
-        self.events = []
-        for i in events:
-            # 处理ActivityCtrl
-            if i.event == Event.CHANGE_ACTIVITY:
-                # 更改Activity(onDestroy,onCreate)
-                self.destroy_activity(-1)
-                self.create_activity(i.payload)
-                self.instances[-1].activity.onStart()
-                break
-            elif i.event == Event.POP_ACTIVITY:
-                # 退出Activity(onDestroy)
-                assert len(self.instances) > 0, Exception(
-                    "No Activity can exit")
-                self.destroy_activity(-1)
-                if len(self.instances) == 0:
-                    print("[WARN] The last activity exited!")
-                else:
-                    self.instances[-1].activity.onStart()
-                break
-            elif i.event == Event.PUSH_ACTIVITY:
-                # 新建Activity(onCreate)
-                self.create_activity(i.payload)
-                self.instances[-1].activity.onStart()
-                break
-            else:
-                # 处理EventCtrl 调用Activity注册的回调函数
-                self.instances[-1].event_exec(i.event, i.payload)
-        del events
+        """处理主显示表面上一帧发生的事件"""
+        self.surface.handle_events()
 
     def draw(self):
-        """将当前帧渲染至framebuf"""
-        self.framebuf.fill(0)
-        if len(self.instances) == 0:
+        """将主显示表面的当前帧渲染至framebuf"""
+        self.surface.draw()
+
+    def flush(self):
+        """将主显示表面的framebuf刷新到屏幕"""
+        return self.surface.flush()
+
+    def watchdog(self, wdt, timeout: int):
+        """由帧循环喂狗，wdt需要提供feed()方法，timeout为看门狗的超时时间(ms)
+        两次喂狗的间隔超过timeout的一半时，主显示表面会收到Event.WATCHDOG事件"""
+        self.wdt = wdt
+        self.wdt_timeout = timeout
+        self._fed = time.ticks_ms()
+
+    def feed(self, now: int = None):
+        """喂狗，每帧开始时自动调用，耗时较长的onCreate或资源加载可以在中途调用"""
+        if self.wdt is None:
             return
-        # Activity 渲染阶段
-        self.instances[-1].activity.beforeFrame()
-        self.instances[-1].view.calc(f_space=(self.width, self.height))
-        self.instances[-1].view.draw(self.framebuf)
-        self.instances[-1].activity.afterFrame()
-
-    async def start(self, target_fps):
-        """启动UI线程和帧循环"""
+        if now is None:
+            now = time.ticks_ms()
+        gap = time.ticks_diff(now, self._fed)
+        self._fed = now
+        self.wdt.feed()
+        if gap * 2 > self.wdt_timeout:
+            print("[WARN] Watchdog fed after {}ms, timeout is {}ms".format(gap, self.wdt_timeout))
+            self.surface.commit(Event(Event.WATCHDOG, (gap, self.wdt_timeout)))
+
+    def defer(self, callback):
+        """延后执行耗时操作，主显示表面每帧结束后如果还有空闲时间，喂狗并执行其中一个"""
+        assert callable(callback), Exception("'callback' should be callable")
+        self._deferred.append(callback)
+        self.surface.wake()
+
+    def run_deferred(self):
+        """执行一个延后的操作"""
+        self.feed()
+        self._deferred.pop(0)()
+
+    def instrument(self, probe):
+        """设置性能记录回调probe(name, value)，None为关闭
+        目前会记录"frame"：每帧耗时(ms)，"gc"：垃圾回收耗时(us)"""
+        self.probe = probe
+
+    def record(self, recorder):
+        """设置事件和帧耗时记录AyUI.core.recorder.Recorder，None为关闭"""
+        if recorder is not None:
+            recorder.attach(self)
+        self.recorder = recorder
+
+    def now(self):
+        """当前时间(ms)，动画以此为起点，回放时为记录的时间"""
+        if self.virtual_time is not None:
+            return self.virtual_time
+        return time.ticks_ms()
+
+    def report(self, name: str, value: int):
+        """向性能记录回调报告一个数值"""
+        if self.probe is not None:
+            self.probe(name, value)
+
+    def tick(self, now: int):
+        """推进所有表面共享的输入和动画并喂狗，同一毫秒内只执行一次"""
+        if now == self._last_tick:
+            return
+        self._last_tick = now
+        self.feed(now)
+        if self._input is not None:
+            self._input.poll(now)
+        if self._animator is not None:
+            self._animator.tick(now)
+
+    async def start(self, target_fps, on_demand=False, min_fps=0):
+        """启动UI线程和帧循环
+
+        target_fps为主显示表面的帧率，其他表面使用add_surface时指定的帧率；
+        on_demand为True时，画面没有变化就不会渲染和刷新，直到有事件提交、
+        调用invalidate()或busy()为True；min_fps用于需要定时刷新的组件（如Memtest），
+        为0时空闲期间完全不刷新"""
+        import uasyncio
         print("[INFO] AyUI: The UI thread starts")
-        frame_target = int(1000/target_fps)
-        while self.enable:
-            for i in range(target_fps):
-                frame_start = time.ticks_ms()
-                self.handle_events()
-                self.draw()
-                self.draw_exec()
-                frame_total = time.ticks_diff(time.ticks_ms(), frame_start)
-                if frame_total > frame_target:
-                    print("[WARN] Can`t keep up, is it overloaded?")
-                    self.commit(
-                        Event(Event.OVERLOAD, (frame_total, frame_target, target_fps)))
-                else:
-                    await uasyncio.sleep_ms(frame_target-frame_total)
-            # 大概是每秒钟这里会被执行一次
-            if self.gc:
-                gc.collect()
+        self.enable = True
+        self.surface.target_fps = target_fps
+        if on_demand and self._input is not None:
+            self._input.start()
+        for surface in self.surfaces:
+            if surface is not self.surface:
+                uasyncio.create_task(surface.run(on_demand, min_fps))
+        await self.surface.run(on_demand, min_fps)
         print("[WARN] ui.engine has been closed!")
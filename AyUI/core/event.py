@@ -2,14 +2,23 @@ from micropython import const
 
 class Event:
     """事件类"""
+    __slots__ = ("event", "payload", "target")
+
     PUSH_ACTIVITY = const(0x00)
     POP_ACTIVITY = const(0x01)
     CHANGE_ACTIVITY = const(0x02)
     
     OVERLOAD = const("overload")
+    WATCHDOG = const("watchdog")
 
     BUTTON_CLICK = const("click")
+    BUTTON_LONG_PRESS = const("long_press")
+    BUTTON_REPEAT = const("repeat")
+    BUTTON_DOUBLE_CLICK = const("double_click")
+    ENCODER_TURN = const("turn")
+    TOUCH = const("touch")
 
-    def __init__(self, event: str, payload: object = None):
+    def __init__(self, event: str, payload: object = None, target=None):
         self.event = event
-        self.payload = payload
\ No newline at end of file
+        self.payload = payload
+        self.target = target    # 接收事件的Instance，None为最前面的Activity
\ No newline at end of file
@@ -0,0 +1,160 @@
+from AyUI.core.event import Event
+from AyUI.core.layer import touch
+
+
+def _y(node):
+    return node.rect[1]
+
+
+class Focus:
+    """焦点管理与点击测试索引，每个Instance持有一个，不应该直接创建
+
+    可获得焦点的Drawable（focusable为True）在视图创建时按树的先序收集，
+    其绝对位置在布局绘制时记录，位置变化时增量更新按y排序的索引。"""
+
+    def __init__(self, surface):
+        self._surface = surface
+        self.order = []         # 焦点顺序
+        self.index = -1         # 当前焦点在order中的位置
+        self._rows = []         # 按rect的y排序的Drawable
+        self._max_h = 0         # 最高的元素高度，用于限制点击测试的扫描范围
+        self.nav = {}           # 导航绑定 事件名 -> {负载: 步长}，None表示负载即步长
+
+    @property
+    def current(self):
+        """当前获得焦点的Drawable"""
+        if self.index < 0:
+            return None
+        return self.order[self.index]
+
+    def bind(self, event: str, payload=None, step: int = 1):
+        """将事件绑定为焦点导航，如 bind(Event.BUTTON_CLICK, "down", 1)
+        不指定payload时负载即步长，如 bind(Event.ENCODER_TURN) 用编码器移动焦点"""
+        if payload is None:
+            self.nav[event] = None
+            return
+        keys = self.nav.get(event)
+        if keys is None:
+            keys = self.nav[event] = dict()
+        keys[payload] = step
+
+    def collect(self, root):
+        """从视图树中收集可获得焦点的元素，视图树改变后需要重新调用"""
+        current = self.current
+        self.order = []
+        self._rows = []
+        self._max_h = 0
+        self._walk(root)
+        for i, node in enumerate(self.order):
+            node.focus_index = i
+            if node.rect is not None:
+                self._insert(node)
+        self.index = -1
+        if current is not None and current in self.order:
+            self.index = current.focus_index
+        elif len(self.order) > 0:
+            self.focus(self.order[0])
+
+    def _walk(self, node):
+        if getattr(node, "focusable", False):
+            self.order.append(node)
+        for child in getattr(node, "elements", ()):
+            self._walk(child)
+
+    def sync(self):
+        """在布局绘制后调用，更新位置发生变化的元素"""
+        moved = [node for node in self.order if node.moved]
+        if len(moved) == 0:
+            return
+        gone = set(moved)
+        rows = [node for node in self._rows if node not in gone]
+        for node in moved:
+            node.moved = False
+            rows.append(node)
+            if node.rect[3] > self._max_h:
+                self._max_h = node.rect[3]
+        rows.sort(key=_y)
+        self._rows = rows
+
+    def _insert(self, node):
+        rows = self._rows
+        y = node.rect[1]
+        lo, hi = 0, len(rows)
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if rows[mid].rect[1] <= y:
+                lo = mid + 1
+            else:
+                hi = mid
+        rows.insert(lo, node)
+        if node.rect[3] > self._max_h:
+            self._max_h = node.rect[3]
+
+    def hit(self, x: int, y: int):
+        """返回包含点(x, y)的可获得焦点的元素，没有则返回None"""
+        rows = self._rows
+        lo, hi = 0, len(rows)
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if rows[mid].rect[1] <= y:
+                lo = mid + 1
+            else:
+                hi = mid
+        # 只需要向前扫描y0大于 y-最大高度 的元素
+        i = lo - 1
+        while i >= 0:
+            r = rows[i].rect
+            if r[1] + self._max_h <= y:
+                break
+            if r[0] <= x < r[0] + r[2] and y < r[1] + r[3]:
+                return rows[i]
+            i -= 1
+        return None
+
+    def focus(self, node):
+        """将焦点移动到node"""
+        old = self.current
+        if old is node:
+            return
+        if old is not None:
+            old.focused = False
+            touch(old)
+            self._surface.invalidate(old.rect)
+        self.index = -1 if node is None else node.focus_index
+        if node is not None:
+            node.focused = True
+            touch(node)
+            self._surface.invalidate(node.rect)
+
+    def move(self, step: int):
+        """向后(正数)或向前(负数)移动焦点"""
+        n = len(self.order)
+        if n == 0:
+            return
+        if self.index < 0:
+            self.focus(self.order[0 if step > 0 else n - 1])
+        else:
+            self.focus(self.order[(self.index + step) % n])
+
+    def dispatch(self, event: str, payload) -> bool:
+        """将事件路由到焦点元素，返回True表示事件已被消费，不再广播给Activity"""
+        if len(self.order) == 0:
+            return False
+        if event in self.nav:
+            keys = self.nav[event]
+            if keys is None:
+                self.move(payload)
+                return True
+            if payload in keys:
+                self.move(keys[payload])
+                return True
+        if event == Event.TOUCH:
+            node = self.hit(payload[0], payload[1])
+            if node is None:
+                return False
+            self.focus(node)
+            return node.on_event(event, payload) is True
+        node = self.current
+        if node is None:
+            return False
+        return node.on_event(event, payload) is True
@@ -0,0 +1,200 @@
+import time
+from array import array
+from micropython import const
+
+from AyUI.core.event import Event
+
+# 编码器状态转换表，索引为(上一状态<<2)|当前状态，状态为(A<<1)|B
+_QUADRATURE = array('b', [0, -1, 1, 0, 1, 0, 0, -1, -1, 0, 0, 1, 0, 1, -1, 0])
+
+_EDGE = const(0)     # 中断记录：是否有新的边沿
+_STAMP = const(1)    # 中断记录：最后一次边沿的时间
+
+
+class Button:
+    """中断驱动的按键，支持单击、长按、连发和双击，不应该直接创建而是通过Input.button()"""
+
+    def __init__(self, manager, pin, name: str, active_low=True, debounce=20,
+                 long_press=600, repeat=0, double_click=0):
+        self.pin = pin
+        self.name = name
+        self.active = 0 if active_low else 1
+        self.debounce = debounce
+        self.long_press = long_press
+        self.repeat = repeat              # 长按后的连发间隔，0为不连发
+        self.double_click = double_click  # 双击判定间隔，0为不检测双击
+        self.pressed = False
+        self._manager = manager
+        self._irq_state = array('i', [0, 0])
+        self._press_time = 0
+        self._release_time = 0
+        self._next_repeat = 0
+        self._long_fired = False
+        self._click_pending = False
+        # 预先创建事件对象，提交事件时不需要分配内存
+        self._click = Event(Event.BUTTON_CLICK, name)
+        self._long = Event(Event.BUTTON_LONG_PRESS, name)
+        self._repeat = Event(Event.BUTTON_REPEAT, name)
+        self._double = Event(Event.BUTTON_DOUBLE_CLICK, name)
+        pin.irq(handler=self._irq, trigger=pin.IRQ_FALLING | pin.IRQ_RISING)
+
+    def _irq(self, pin):
+        # 中断中只记录时间，去抖和手势识别在poll中进行
+        self._irq_state[_EDGE] = 1
+        self._irq_state[_STAMP] = self._manager.clock()
+        flag = self._manager.flag
+        if flag is not None:
+            flag.set()
+
+    @property
+    def busy(self):
+        return self.pressed or self._click_pending or self._irq_state[_EDGE] == 1
+
+    def poll(self, now: int):
+        state = self._irq_state
+        if state[_EDGE] and time.ticks_diff(now, state[_STAMP]) >= self.debounce:
+            # 电平已经稳定了debounce毫秒
+            state[_EDGE] = 0
+            pressed = self.pin.value() == self.active
+            if pressed != self.pressed:
+                self.pressed = pressed
+                if pressed:
+                    self._on_press(now)
+                else:
+                    self._on_release(now)
+
+        if self.pressed:
+            if not self._long_fired:
+                if time.ticks_diff(now, self._press_time) >= self.long_press:
+                    self._long_fired = True
+                    self._click_pending = False    # 长按开始时放弃等待双击的单击
+                    self._next_repeat = time.ticks_add(now, self.repeat)
+                    self._manager.post(self._long)
+            elif self.repeat > 0 and time.ticks_diff(now, self._next_repeat) >= 0:
+                self._next_repeat = time.ticks_add(self._next_repeat, self.repeat)
+                self._manager.post(self._repeat)
+        elif self._click_pending and \
+                time.ticks_diff(now, self._release_time) > self.double_click:
+            self._click_pending = False
+            self._manager.post(self._click)
+
+    def _on_press(self, now):
+        self._press_time = now
+        self._long_fired = False
+
+    def _on_release(self, now):
+        if self._long_fired:
+            return
+        if self.double_click <= 0:
+            self._manager.post(self._click)
+        elif self._click_pending:
+            self._click_pending = False
+            self._manager.post(self._double)
+        else:
+            self._click_pending = True
+            self._release_time = now
+
+
+class Encoder:
+    """中断驱动的旋转编码器，每帧提交一次累计的格数，不应该直接创建而是通过Input.encoder()
+    事件名默认为Event.ENCODER_TURN，负载为转动的格数，顺时针为正"""
+
+    def __init__(self, manager, pin_a, pin_b, name: str = Event.ENCODER_TURN, steps=4):
+        self.pin_a = pin_a
+        self.pin_b = pin_b
+        self.name = name
+        self.steps = steps          # 每一格对应的状态变化数
+        self._manager = manager
+        # [累计计数, 上一状态]，只在中断中写入
+        self._irq_state = array('i', [0, (pin_a.value() << 1) | pin_b.value()])
+        self._consumed = 0
+        self._turn = Event(name, 0)
+        trigger = pin_a.IRQ_FALLING | pin_a.IRQ_RISING
+        pin_a.irq(handler=self._irq, trigger=trigger)
+        pin_b.irq(handler=self._irq, trigger=trigger)
+
+    def _irq(self, pin):
+        state = self._irq_state
+        current = (self.pin_a.value() << 1) | self.pin_b.value()
+        state[0] += _QUADRATURE[(state[1] << 2) | current]
+        state[1] = current
+        flag = self._manager.flag
+        if flag is not None:
+            flag.set()
+
+    @property
+    def busy(self):
+        return False
+
+    def poll(self, now: int):
+        delta = self._irq_state[0] - self._consumed
+        if delta >= 0:
+            detents = delta // self.steps
+        else:
+            detents = -((-delta) // self.steps)
+        if detents != 0:
+            self._consumed += detents * self.steps
+            turn = self._turn
+            if self._manager.queued(turn):
+                # 上次提交的事件还没有处理，合并到该事件中
+                turn.payload += detents
+            else:
+                turn.payload = detents
+                self._manager.post(turn)
+
+
+class Input:
+    """输入子系统，由Engine持有并在每帧开始时轮询，识别到的手势作为事件提交给Engine"""
+
+    def __init__(self, engine, clock=time.ticks_ms):
+        self._engine = engine
+        self.clock = clock
+        self.flag = None    # 用于在中断中唤醒空闲帧循环的 uasyncio.ThreadSafeFlag
+        self.devices = []
+
+    def button(self, pin, name: str, **kw):
+        """注册一个按键，参数见Button"""
+        device = Button(self, pin, name, **kw)
+        self.devices.append(device)
+        return device
+
+    def encoder(self, pin_a, pin_b, name: str = Event.ENCODER_TURN, steps=4):
+        """注册一个旋转编码器，name为提交的事件名，事件负载为转动的格数"""
+        device = Encoder(self, pin_a, pin_b, name, steps)
+        self.devices.append(device)
+        return device
+
+    @property
+    def busy(self):
+        """是否有需要继续轮询的状态，如按键按住、等待双击"""
+        for device in self.devices:
+            if device.busy:
+                return True
+        return False
+
+    def post(self, event: Event):
+        self._engine.commit(event)
+
+    def queued(self, event: Event):
+        """事件是否已经提交但还没有被处理"""
+        return event in self._engine.surface.events
+
+    def poll(self, now: int = None):
+        if now is None:
+            now = self.clock()
+        for device in self.devices:
+            device.poll(now)
+
+    def start(self):
+        """按需渲染时由Engine调用，使输入中断可以唤醒空闲的帧循环"""
+        import uasyncio
+        if len(self.devices) == 0 or not hasattr(uasyncio, "ThreadSafeFlag"):
+            return
+        self.flag = uasyncio.ThreadSafeFlag()
+        uasyncio.create_task(self._wake())
+
+    async def _wake(self):
+        while self.flag is not None:
+            await self.flag.wait()
+            self._engine.wake()
+
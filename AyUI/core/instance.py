@@ -2,10 +2,15 @@
 
 class Instance:
     """用于保存当前Activity的状态，以及Event的路由，不应该直接操作Instance类而是通过EventCtrl类间接操作"""
+    __slots__ = ("activity", "view", "surface", "focus", "event_calls", "name", "store", "stale")
 
     def __init__(self, activity_name:str):
         self.activity = None
         self.view = None
+        self.surface = None # 所在的显示表面，由Surface在创建Activity时设置
+        self.focus = None   # 焦点管理，由Surface在创建Activity时设置
+        self.store = None   # 状态，由Surface在创建Activity时设置
+        self.stale = False  # 是否需要重新调用view()
         self.event_calls = dict()
         self.name = activity_name
 
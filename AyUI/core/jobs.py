@@ -0,0 +1,73 @@
+import time
+
+from AyUI.core.event import Event
+
+
+class Job:
+    """后台任务，生成器每次yield让出一次，return的值作为结果"""
+    __slots__ = ("gen", "event", "owner", "surface")
+
+    def __init__(self, gen, event, owner, surface):
+        self.gen = gen
+        self.event = event      # 完成时发送给owner的事件名，None为不发送
+        self.owner = owner      # 提交任务的Instance，Activity销毁时一并取消
+        self.surface = surface
+
+
+class Jobs:
+    """后台任务队列，由Engine持有，在主显示表面每帧剩余的时间内轮流推进任务"""
+
+    def __init__(self, engine):
+        self._engine = engine
+        self.jobs = []
+        self._next = 0  # 下一个推进的任务，保证每个任务轮流执行
+
+    @property
+    def active(self):
+        return len(self.jobs) > 0
+
+    def submit(self, gen, event: str = None, owner=None, surface=None):
+        """提交一个生成器任务，完成后以事件event发送结果，负载为生成器return的值"""
+        job = Job(gen, event, owner, surface or self._engine.surface)
+        self.jobs.append(job)
+        self._engine.surface.wake()
+        return job
+
+    def cancel(self, job: Job):
+        """取消一个任务"""
+        if job in self.jobs:
+            self.jobs.remove(job)
+            job.gen.close()
+
+    def cancel_owner(self, owner):
+        """取消owner提交的所有任务"""
+        for job in [j for j in self.jobs if j.owner is owner]:
+            self.cancel(job)
+
+    def run(self, budget: int):
+        """在budget毫秒内轮流推进任务，每次推进一步"""
+        if budget <= 0 or not self.jobs:
+            return
+        start = time.ticks_ms()
+        while self.jobs and time.ticks_diff(time.ticks_ms(), start) < budget:
+            if self._next >= len(self.jobs):
+                self._next = 0
+            job = self.jobs[self._next]
+            try:
+                next(job.gen)
+                self._next += 1
+                continue
+            except StopIteration as ex:
+                result = ex.value
+            except Exception as ex:
+                print("[WARN] Job has create en exception")
+                print(ex)
+                self.jobs.remove(job)
+                continue
+            self.jobs.remove(job)
+            self._deliver(job, result)
+
+    def _deliver(self, job, result):
+        # 作为事件提交给任务所在的表面，在下一帧处理事件时只发送给提交任务的Activity，即使它不在最前面
+        if job.event is not None:
+            job.surface.commit(Event(job.event, result, job.owner))
@@ -0,0 +1,135 @@
+import framebuf
+from AyUI.core.render import FrameBufferRenderer
+
+
+def _nbytes(fmt, w, h):
+    # 各种FrameBuffer格式占用的字节数
+    if fmt == framebuf.RGB565:
+        return w * h * 2
+    if fmt == framebuf.GS8:
+        return w * h
+    if fmt == framebuf.GS4_HMSB:
+        return (w + 1) // 2 * h
+    if fmt == framebuf.GS2_HMSB:
+        return (w + 3) // 4 * h
+    if fmt == framebuf.MONO_VLSB:
+        return w * ((h + 7) // 8)
+    return (w + 7) // 8 * h
+
+
+class Layer:
+    """视图缓存的位图"""
+    __slots__ = ("buf", "fb", "renderer", "w", "h", "fmt", "nbytes", "axis", "valid")
+
+    def __init__(self, w, h, fmt):
+        self.w = w
+        self.h = h
+        self.fmt = fmt
+        self.nbytes = _nbytes(fmt, w, h)
+        self.buf = bytearray(self.nbytes)
+        self.fb = framebuf.FrameBuffer(self.buf, w, h, fmt)
+        self.renderer = None    # 由LayerCache按屏幕的渲染后端创建
+        self.axis = None    # 位图渲染时视图的绝对坐标
+        self.valid = False
+
+
+def touch(node):
+    """组件或视图被直接修改后调用，使包含它的缓存失效
+    状态绑定、动画、焦点变化和重新调用view()时会自动调用"""
+    layer = getattr(node, "_layer", None)
+    if layer is not None:
+        layer.valid = False
+    owner = getattr(node, "_owner", None)
+    if owner is not None and owner._layer is not None:
+        owner._layer.valid = False
+
+
+class LayerCache:
+    """所有缓存位图的总内存不超过budget字节，超出时释放最久没有绘制的位图"""
+
+    def __init__(self, budget=8192):
+        self.budget = budget
+        self.used = 0
+        self.views = []     # 持有位图的视图，最近绘制的在最后
+        self._rendering = False
+
+    def draw(self, view, target, axis, w, h):
+        """将视图通过缓存位图绘制到target，无法缓存时返回False，由视图直接绘制"""
+        fmt = getattr(target, "layer_format", None)
+        if fmt is None or self._rendering:
+            return False    # 屏幕没有声明格式，或者是嵌套在另一个缓存中的视图
+        layer = view._layer
+        if layer is None or layer.w != w or layer.h != h or layer.fmt != fmt:
+            layer = self._alloc(view, w, h, fmt)
+            if layer is None:
+                return False
+            make = getattr(target, "layer", None)
+            if make is None:
+                layer.renderer = FrameBufferRenderer(layer.fb, w, h)
+            else:
+                layer.renderer = make(layer.buf, layer.fb, w, h)
+        else:
+            self.views.remove(view)
+            self.views.append(view)
+        if not layer.valid or layer.axis != axis:
+            self._render(view, layer, axis)
+        target.blit(layer.fb, axis[0], axis[1], 0)
+        return True
+
+    def _alloc(self, view, w, h, fmt):
+        self.release(view)
+        nbytes = _nbytes(fmt, w, h)
+        if nbytes > self.budget:
+            return None
+        while self.used + nbytes > self.budget:
+            self.release(self.views[0])
+        layer = Layer(w, h, fmt)
+        view._layer = layer
+        self.views.append(view)
+        self.used += nbytes
+        return layer
+
+    def release(self, view):
+        """释放视图的缓存位图"""
+        layer = view._layer
+        if layer is None:
+            return
+        view._layer = None
+        self.views.remove(view)
+        self.used -= layer.nbytes
+
+    def release_tree(self, node):
+        """释放视图树中所有视图的缓存位图，Activity销毁时调用"""
+        if getattr(node, "_layer", None) is not None:
+            self.release(node)
+        for child in getattr(node, "elements", ()):
+            self.release_tree(child)
+
+    def clear(self):
+        """释放所有缓存位图"""
+        while self.views:
+            self.release(self.views[0])
+
+    def _render(self, view, layer, axis):
+        # 在位图的原点绘制视图，再将子元素记录的区域换算为屏幕坐标
+        layer.fb.fill(0)
+        self._rendering = True
+        try:
+            view._draw(layer.renderer, (0, 0))
+        finally:
+            self._rendering = False
+        self._adopt(view, view, axis[0], axis[1])
+        layer.axis = axis
+        layer.valid = True
+
+    def _adopt(self, owner, node, dx, dy):
+        for child in getattr(node, "elements", ()):
+            child._owner = owner
+            rect = getattr(child, "rect", None)
+            if rect is not None:
+                child.rect = (rect[0] + dx, rect[1] + dy, rect[2], rect[3])
+                child.moved = True
+            self._adopt(owner, child, dx, dy)
+
+
+layers = LayerCache()   # 所有视图共享
@@ -0,0 +1,88 @@
+from AyUI.core.layer import touch
+
+_MISSING = object()
+
+
+def _fields(node):
+    # 节点的实例属性，MicroPython中全部位于__dict__，CPython中还需要读取__slots__
+    d = getattr(node, "__dict__", None)
+    fields = dict(d) if d else {}
+    for name in getattr(type(node), "__slots__", ()):
+        value = getattr(node, name, _MISSING)
+        if value is not _MISSING:
+            fields[name] = value
+    return fields
+
+
+class Reconciler:
+    """将重新调用Activity.view()得到的视图树与已挂载的视图树对比
+
+    类型和key相同的节点保留原来的对象，只更新发生变化的属性，
+    布局、焦点和缓存等属性（以下划线开头或列在类的keep中）不会被覆盖；
+    类型或key不同的节点整个替换。"""
+
+    def __init__(self):
+        self.mapping = {}   # 新节点 -> 保留的旧节点
+        self.full = False   # 是否需要重绘整个画面
+        self.rects = []     # 需要重绘的区域
+
+    def patch(self, old, new):
+        """返回需要挂载的节点"""
+        if old is None or type(old) is not type(new) or old.key != new.key:
+            self.full = True
+            return new
+        self.mapping[new] = old
+        keep = old.keep
+        changed = False
+        old_fields = _fields(old)
+        for name, value in _fields(new).items():
+            if name == "elements" or name[0] == "_" or name in keep:
+                continue
+            if old_fields.get(name, _MISSING) != value:
+                setattr(old, name, value)
+                changed = True
+        if hasattr(new, "elements"):
+            elements = self._children(old.elements, new.elements)
+            if len(elements) != len(old.elements) or any(a is not b for a, b in zip(elements, old.elements)):
+                touch(old)  # 子节点被替换，缓存失效
+            old.elements = elements
+        if changed:
+            touch(old)
+            self._damage(old)
+        return old
+
+    def _children(self, old_list, new_list):
+        keyed = {}
+        unkeyed = []
+        for node in old_list:
+            if node.key is None:
+                unkeyed.append(node)
+            else:
+                keyed[node.key] = node
+        result = []
+        i = 0
+        for node in new_list:
+            if node.key is None:
+                old = unkeyed[i] if i < len(unkeyed) else None
+                i += 1
+            else:
+                old = keyed.pop(node.key, None)
+            result.append(self.patch(old, node))
+        if len(result) != len(old_list):
+            self.full = True    # 增加或删除了子节点
+        return result
+
+    def _damage(self, node):
+        # 记录了区域且尺寸不变的组件只重绘自身，其余情况重新布局整个画面
+        rect = getattr(node, "rect", None)
+        if rect is None or rect[2] != node.width or rect[3] != node.height:
+            self.full = True
+        else:
+            self.rects.append(rect)
+
+
+def reconcile(old, new):
+    """对比两个视图树，返回(挂载的根节点, Reconciler)"""
+    r = Reconciler()
+    root = r.patch(old, new)
+    return root, r
@@ -0,0 +1,247 @@
+import time
+import struct
+from micropython import const
+
+from AyUI.core.event import Event
+
+try:
+    from binascii import crc32
+except ImportError:
+    crc32 = None
+
+MAGIC = b"AYRC"
+VERSION = const(1)
+FRAME = const(0x46)     # 'F' 帧记录：表面序号、开始时间、耗时、画面CRC
+EVENT = const(0x45)     # 'E' 事件记录：表面序号、事件名、负载
+_FRAME_FMT = "<BIHI"
+_FRAME_LEN = const(11)
+
+
+def _encode(out: bytearray, value):
+    # 负载的紧凑编码，支持None、bool、int、str以及由它们组成的tuple/list
+    if value is None:
+        out.append(0x4E)    # N
+    elif value is True or value is False:
+        out.append(0x54 if value else 0x46)     # T / F
+    elif isinstance(value, int) and -0x80000000 <= value <= 0x7FFFFFFF:
+        out.append(0x69)    # i
+        out.extend(struct.pack("<i", value))
+    elif isinstance(value, str):
+        data = value.encode()[:255]
+        out.append(0x73)    # s
+        out.append(len(data))
+        out.extend(data)
+    elif isinstance(value, (tuple, list)):
+        out.append(0x74 if isinstance(value, tuple) else 0x6C)  # t / l
+        out.append(min(len(value), 255))
+        for item in value[:255]:
+            _encode(out, item)
+    else:
+        print("[WARN] Recorder can't encode payload of type", type(value))
+        out.append(0x4E)
+
+
+def _decode(data, i):
+    # 返回(值, 下一个位置)
+    tag = data[i]
+    i += 1
+    if tag == 0x4E:
+        return None, i
+    if tag == 0x54:
+        return True, i
+    if tag == 0x46:
+        return False, i
+    if tag == 0x69:
+        return struct.unpack_from("<i", data, i)[0], i + 4
+    if tag == 0x73:
+        n = data[i]
+        return bytes(data[i + 1:i + 1 + n]).decode(), i + 1 + n
+    n = data[i]
+    i += 1
+    items = []
+    for _ in range(n):
+        value, i = _decode(data, i)
+        items.append(value)
+    return (tuple(items) if tag == 0x74 else items), i
+
+
+def frame_buffer(surface):
+    """显示表面framebuf的缓冲区，不提供时为None"""
+    fb = surface.framebuf
+    if fb is None:
+        return None
+    buf = getattr(fb, "buffer", None)
+    if buf is None:
+        try:
+            buf = memoryview(fb)
+        except TypeError:
+            return None
+    return buf
+
+
+def frame_crc(surface):
+    """显示表面当前画面的CRC32，framebuf不提供缓冲区或不支持crc32时为0"""
+    buf = frame_buffer(surface)
+    if crc32 is None or buf is None:
+        return 0
+    return crc32(buf) & 0xFFFFFFFF
+
+
+class Recorder:
+    """将处理过的事件和每帧的耗时记录到size字节的环形缓冲区，写满后覆盖最早的记录
+    由Engine.record()启用，save()写入文件，用AyUI.core.recorder.replay或tools/replay.py回放
+    crc为True时每帧计算画面的CRC32用于对比，会增加每帧的耗时"""
+
+    def __init__(self, size=4096, path=None, crc=False):
+        self.size = size
+        self.ring = bytearray(size)
+        self._mv = memoryview(self.ring)
+        self.head = 0       # 最早的记录
+        self.used = 0
+        self.wrapped = False    # 是否覆盖过记录，此时回放的初始状态与设备不同
+        self.path = path    # 发生OVERLOAD时自动保存到该文件，None为不自动保存
+        self.crc = crc
+        self._engine = None
+        self._t0 = 0
+        self._frame = bytearray(_FRAME_LEN + 2)
+        self._saving = False
+
+    def attach(self, engine):
+        self._engine = engine
+        self._t0 = time.ticks_ms()
+
+    def _write(self, data):
+        n = len(data)
+        size = self.size
+        if n > size:
+            return
+        ring = self.ring
+        while size - self.used < n:
+            # 丢弃最早的记录
+            drop = ring[(self.head + 1) % size] + 2
+            self.head = (self.head + drop) % size
+            self.used -= drop
+            self.wrapped = True
+        tail = (self.head + self.used) % size
+        first = min(n, size - tail)
+        self._mv[tail:tail + first] = data[:first]
+        if first < n:
+            self._mv[0:n - first] = data[first:]
+        self.used += n
+
+    def event(self, surface_index: int, event: Event):
+        """记录一个事件，由Surface.handle_events调用"""
+        out = bytearray(2)
+        out[0] = EVENT
+        out.append(surface_index)
+        _encode(out, event.event)
+        _encode(out, event.payload)
+        if len(out) > 257:
+            # 负载太大，只记录事件名
+            out = out[:3]
+            _encode(out, event.event)
+            out.append(0x4E)
+        out[1] = len(out) - 2
+        self._write(out)
+
+    def frame(self, surface, start: int, duration: int):
+        """记录一帧，由Surface.run在每帧结束时调用"""
+        engine = self._engine
+        buf = self._frame
+        buf[0] = FRAME
+        buf[1] = _FRAME_LEN
+        struct.pack_into(_FRAME_FMT, buf, 2, engine.surfaces.index(surface),
+                         time.ticks_diff(start, self._t0) & 0xFFFFFFFF,
+                         min(duration, 0xFFFF), frame_crc(surface) if self.crc else 0)
+        self._write(buf)
+        if self.path is not None and not self._saving and duration * surface.target_fps > 1000:
+            # 超时的帧，在之后有空闲时间时保存到文件
+            self._saving = True
+            engine.defer(self._save_deferred)
+
+    def _save_deferred(self):
+        self._saving = False
+        self.save()
+
+    def save(self, path=None):
+        """将记录按时间顺序写入文件"""
+        with open(path or self.path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<BBI", VERSION, 1 if self.wrapped else 0, self.used))
+            end = self.head + self.used
+            if end <= self.size:
+                f.write(self._mv[self.head:end])
+            else:
+                f.write(self._mv[self.head:])
+                f.write(self._mv[:end - self.size])
+
+
+def load(path):
+    """读取记录文件，返回(wrapped, records)
+    records中事件为(EVENT, 表面序号, 事件名, 负载)，帧为(FRAME, 表面序号, 开始时间, 耗时, CRC)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data[:4] == MAGIC, Exception("'{}' is not a AyUI recording".format(path))
+    version, wrapped, used = struct.unpack_from("<BBI", data, 4)
+    assert version == VERSION, Exception("Unsupported recording version {}".format(version))
+    records = []
+    i = 10
+    end = 10 + used
+    while i < end:
+        kind, n = data[i], data[i + 1]
+        body = i + 2
+        if kind == FRAME:
+            records.append((FRAME,) + struct.unpack_from(_FRAME_FMT, data, body))
+        elif kind == EVENT:
+            name, j = _decode(data, body + 1)
+            payload, j = _decode(data, j)
+            records.append((EVENT, data[body], name, payload))
+        i = body + n
+    return bool(wrapped), records
+
+
+def replay(engine, records, recorder=None, wrapped=False):
+    """将记录的事件按原来的帧顺序交给engine处理并绘制，逐帧返回(表面序号, 耗时, CRC)
+    engine需要注册相同的Activity，使用主机上的framebuf；记录中包含启动初始Activity的事件，
+    wrapped为True（最早的记录已被覆盖）时，第一帧保留engine中已提交的事件，如start_activity_from；
+    回放期间引擎使用记录的时间，动画的进度与设备相同；
+    recorder不为None时同时记录回放的结果，可以保存为之后对比的基准"""
+    surfaces = engine.surfaces
+    pending = [[] for _ in surfaces]
+    started = [not wrapped for _ in surfaces]
+    base = time.ticks_ms()
+    if recorder is not None:
+        engine.record(recorder)
+        recorder._t0 = base
+    try:
+        for rec in records:
+            if rec[0] == EVENT:
+                pending[rec[1]].append(Event(rec[2], rec[3]))
+                continue
+            index = rec[1]
+            surface = surfaces[index]
+            now = time.ticks_add(base, rec[2])
+            engine.virtual_time = now
+            start = time.ticks_ms()
+            engine.tick(now)
+            # 只处理记录中的事件，回调中重新提交的事件已经包含在记录中
+            if started[index]:
+                surface.events.clear()
+            started[index] = True
+            surface.events.extend(pending[index])
+            pending[index].clear()
+            surface.handle_events()
+            surface.apply_state()
+            surface.draw()
+            steps = surface.flush()
+            if steps is not None:
+                for _ in steps:
+                    pass
+            duration = time.ticks_diff(time.ticks_ms(), start)
+            if recorder is not None:
+                recorder.frame(surface, now, duration)
+            yield index, duration, frame_crc(surface)
+    finally:
+        engine.virtual_time = None
+        if recorder is not None:
+            engine.record(None)
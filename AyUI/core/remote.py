@@ -0,0 +1,241 @@
+import time
+import struct
+import framebuf
+from micropython import const
+
+from driver import accel
+from AyUI.core.recorder import frame_buffer
+
+try:
+    from binascii import crc32
+except ImportError:
+    crc32 = None
+
+# 消息格式：A5 5A 类型 长度(2字节小端) 内容 校验(内容CRC32的最低字节)
+MSG_HEADER = const(0x48)    # 'H' 画面格式
+MSG_PALETTE = const(0x50)   # 'P' 调色板，大端RGB565
+MSG_TILE = const(0x54)      # 'T' 一个区块：列、行、编码(0原样/1游程)、数据
+MSG_FRAME = const(0x46)     # 'F' 一帧结束，主机在此时更新画面
+REQUEST_REFRESH = const(0x52)   # 主机发送'R'请求重新发送整个画面
+
+
+def _geometry(fmt, w, h, tile):
+    # 缓冲区按字节看作二维数组，返回(每行字节数, 行数, 区块字节宽度, 区块行数, 游程编码单位)
+    if fmt == framebuf.RGB565:
+        return w * 2, h, tile * 2, tile, 2
+    if fmt == framebuf.GS8:
+        return w, h, tile, tile, 1
+    if fmt == framebuf.GS4_HMSB:
+        return (w + 1) // 2, h, tile // 2, tile, 1
+    if fmt == framebuf.GS2_HMSB:
+        return (w + 3) // 4, h, tile // 4, tile, 1
+    if fmt == framebuf.MONO_VLSB:
+        return w, (h + 7) // 8, tile, tile // 8, 1   # 每8行为一页
+    return (w + 7) // 8, h, tile // 8, tile, 1
+
+
+class RemoteSink:
+    """将显示表面的画面通过字节流（如machine.UART）发送到主机上的tools/rfb_viewer.py
+    只发送变化的区块，并使用游程编码压缩；每帧发送占用的时间不超过帧时间的share%，
+    rate为字节流每秒可以发送的字节数（如波特率/10），用于在发送前估计每个区块的耗时，
+    None时按之前实际发送的速度估计；放不进本帧预算的区块留到之后的帧继续发送，
+    主机可以随时发送'R'请求完整的画面"""
+
+    def __init__(self, stream, share=10, rate=None, tile=16, fmt=None, big_endian=True):
+        assert tile % 8 == 0, Exception("'tile' must be a multiple of 8")
+        self.stream = stream
+        self.share = share
+        self.rate = rate
+        self.tile = tile
+        self.fmt = fmt
+        self.big_endian = big_endian    # RGB565缓冲区是否为大端（AIR103TFT的缓冲区已交换字节序）
+        self.surface = None
+        self.sent = 0       # 已发送的字节数
+        self.skipped = 0    # 因预算不足推迟到之后的帧的次数
+        self._head = bytearray(5)
+        self._head[0], self._head[1] = 0xA5, 0x5A
+        self._sum = bytearray(1)
+        self._last = time.ticks_us()
+        self._budget = 0    # 可用的发送时间(us)，不超过一帧的share%
+        self._us256 = 0     # rate为None时，实际测得的每256字节的发送耗时(us)
+        self._tile_crc = 0  # 最近一次编码的区块的CRC
+        self._cursor = 0    # 下一个检查的区块
+        self._dirty = None  # 每个区块是否需要检查
+        self._crc = None    # 每个区块上次发送的内容的CRC
+        self._pending = False  # 是否有已发送但还没有以'F'结束的区块
+
+    def attach(self, surface):
+        """接入显示表面的draw_exec，每次刷新时同时发送变化的区块"""
+        fb = surface.framebuf
+        buf = frame_buffer(surface)
+        fmt = self.fmt if self.fmt is not None else getattr(fb, "layer_format", None)
+        if buf is None or fmt is None or crc32 is None:
+            print("[WARN] RemoteSink needs binascii.crc32 and a framebuf with a buffer and a known format")
+            return False
+        self.surface = surface
+        self.fmt = fmt
+        self._mv = memoryview(buf)
+        self.row_bytes, self.rows, self.tile_bytes, self.tile_rows, self.unit = \
+            _geometry(fmt, surface.width, surface.height, self.tile)
+        self.cols = (self.row_bytes + self.tile_bytes - 1) // self.tile_bytes
+        self.lines = (self.rows + self.tile_rows - 1) // self.tile_rows
+        n = self.tile_bytes * self.tile_rows
+        self._tile = bytearray(n)
+        self._out = bytearray(3 + n * 3 // 2 + 2)
+        self._dirty = bytearray(self.cols * self.lines)
+        self._crc = [None] * (self.cols * self.lines)
+        if self.rate is not None and self._cost(3 + n + 6) > self.burst():
+            print("[WARN] RemoteSink: a raw tile takes longer than share% of a frame, use a smaller tile or a faster stream")
+        self.refresh()
+        draw_exec = surface.draw_exec
+
+        def tap(*args):
+            result = draw_exec(*args)
+            # 刷新期间framebuf不会改变，分段刷新时也可以立即读取
+            self.update(args[0] if args else None)
+            return result
+        surface.draw_exec = tap
+        return True
+
+    def refresh(self):
+        """重新发送画面格式和整个画面"""
+        w, h = self.surface.width, self.surface.height
+        self._send(MSG_HEADER, struct.pack("<HHBHHHHBB", w, h, self.fmt, self.row_bytes, self.rows,
+                                           self.tile_bytes, self.tile_rows, self.unit,
+                                           1 if self.big_endian else 0))
+        palette = getattr(self.surface.framebuf, "palette", None)
+        if palette is not None:
+            self._send(MSG_PALETTE, palette)
+        for i in range(len(self._crc)):
+            self._crc[i] = None
+            self._dirty[i] = 1
+
+    def _send(self, kind, data, n=None):
+        if n is None:
+            n = len(data)
+        head = self._head
+        head[2] = kind
+        head[3] = n & 0xFF
+        head[4] = n >> 8
+        body = memoryview(data)[:n]
+        self._sum[0] = crc32(body) & 0xFF
+        stream = self.stream
+        stream.write(head)
+        stream.write(body)
+        stream.write(self._sum)
+        self.sent += n + 6
+
+    def _poll(self):
+        # 读取主机的请求
+        avail = getattr(self.stream, "any", None)
+        if avail is None or not avail():
+            return
+        data = self.stream.read()
+        if data and REQUEST_REFRESH in data:
+            self.refresh()
+
+    def mark(self, rect=None):
+        """标记需要检查的区域，rect为(x, y, w, h)，None为整个画面"""
+        dirty = self._dirty
+        if rect is None:
+            for i in range(len(dirty)):
+                dirty[i] = 1
+            return
+        tile = self.tile    # 所有格式的区块都是tile*tile个像素
+        c0, c1 = max(rect[0], 0) // tile, min(rect[0] + rect[2] - 1, self.surface.width - 1) // tile
+        r0, r1 = max(rect[1], 0) // tile, min(rect[1] + rect[3] - 1, self.surface.height - 1) // tile
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                dirty[r * self.cols + c] = 1
+
+    def burst(self):
+        """每帧最多可以使用的发送时间(us)，即帧时间的share%"""
+        return 1000000 // self.surface.target_fps * self.share // 100
+
+    def _cost(self, n):
+        # 发送n字节预计的耗时(us)
+        if self.rate is not None:
+            return n * 1000000 // self.rate
+        return n * self._us256 >> 8
+
+    def update(self, rect=None):
+        """发送变化的区块，由attach()接入的draw_exec在每次刷新时调用"""
+        now = time.ticks_us()
+        elapsed = time.ticks_diff(now, self._last)
+        self._last = now
+        # 空闲的帧不会累积超过一帧的预算，预算为负时是之前超出的部分
+        burst = self.burst()
+        self._budget = min(self._budget + elapsed * self.share // 100, burst)
+        self._poll()
+        self.mark(rect)
+        dirty = self._dirty
+        count = len(dirty)
+        checked = 0
+        while checked < count:
+            if self._budget <= 0:
+                self.skipped += 1
+                break
+            i = self._cursor
+            if not dirty[i]:
+                self._cursor = (i + 1) % count
+                checked += 1
+                continue
+            start = time.ticks_us()
+            size = self._encode(i)
+            if size > 0:
+                cost = self._cost(3 + size + 12)    # 包括帧结束的'F'消息
+                # 区块在发送前估计耗时，放不进本帧的预算时留到之后的帧；
+                # 比一帧的预算还大的区块只在预算满时发送，超出的部分由之后的帧扣除
+                if cost > self._budget and (cost <= burst or self._budget < burst):
+                    self.skipped += 1
+                    break
+                self._send(MSG_TILE, self._out, 3 + size)
+                self._crc[i] = self._tile_crc
+                self._pending = True
+            dirty[i] = 0
+            self._cursor = (i + 1) % count
+            checked += 1
+            spent = time.ticks_diff(time.ticks_us(), start)
+            if size > 0:
+                if self.rate is None:
+                    self._us256 = (self._us256 + (spent << 8) // (3 + size + 6) + 1) >> 1
+                spent = max(spent, cost)
+            self._budget -= spent
+        if self._pending:
+            # 预算不足时画面分几帧更新完成
+            self._send(MSG_FRAME, b"")
+            self._pending = False
+        stream = self.stream
+        if hasattr(stream, "flush"):
+            stream.flush()
+
+    def _encode(self, i):
+        # 读取并编码区块，结果在self._out中，返回数据的字节数，内容与上次发送的相同时返回0
+        c, r = i % self.cols, i // self.cols
+        x0 = c * self.tile_bytes
+        y0 = r * self.tile_rows
+        w = min(self.tile_bytes, self.row_bytes - x0)
+        h = min(self.tile_rows, self.rows - y0)
+        n = w * h
+        tile = self._tile
+        mv = self._mv
+        o = 0
+        start = y0 * self.row_bytes + x0
+        for y in range(h):
+            tile[o:o + w] = mv[start:start + w]
+            o += w
+            start += self.row_bytes
+        crc = crc32(memoryview(tile)[:n])
+        if crc == self._crc[i]:
+            return 0
+        out = self._out
+        out[0], out[1] = c, r
+        size = accel.rle_encode(memoryview(out)[3:], tile, n, self.unit)
+        if size < n:
+            out[2] = 1
+        else:
+            out[2] = 0
+            out[3:3 + n] = tile[:n]
+            size = n
+        self._tile_crc = crc    # 发送之后才记录，放不进预算的区块下次重新读取
+        return size
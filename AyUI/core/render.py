@@ -0,0 +1,206 @@
+import framebuf
+from micropython import const
+
+# 渲染后端的能力
+FILL_RECT = const(1)    # 填充矩形不需要逐像素处理，粗边框等可以拆分为几个填充矩形
+TEXT = const(2)         # 可以直接绘制文字
+BLIT = const(4)         # 可以blit其他FrameBuffer，视图缓存需要
+DIRECT = const(8)       # 直接绘制到屏幕，不需要刷新
+
+
+class Renderer:
+    """视图与绘图目标之间的渲染后端，提供与framebuf.FrameBuffer相同的绘图方法
+    caps为后端的能力，引擎和组件据此为每种图元选择开销最小的方式
+    其他属性和方法交给目标，如ScrollView使用的scroll_region"""
+    caps = 0
+    layer_format = None     # 视图缓存位图使用的格式，None为不能缓存
+    animated = False        # 画面是否需要每帧重绘（如时间抖动）
+    clip = None             # 本帧需要重绘的区域[x0, y0, x1, y1]，None为整个画面，视图跳过区域外的子元素
+                            # 不能裁剪图元的后端绘制超出该区域时由视图置为None，之后完整绘制
+
+    def __init__(self, target, width: int, height: int):
+        self.target = target
+        self.width = width
+        self.height = height
+
+    def __getattr__(self, name):
+        return getattr(self.target, name)
+
+    def begin(self):
+        """每帧绘制前由Surface调用"""
+        pass
+
+    def layer(self, buf, fb, w: int, h: int):
+        """返回绘制到视图缓存位图fb的渲染后端，buf为fb的缓冲区"""
+        return FrameBufferRenderer(fb, w, h)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def border(self, x, y, w, h, n, c):
+        """绘制宽度为n的边框，(x, y, w, h)为边框的外沿"""
+        if n > 1 and self.caps & FILL_RECT:
+            # 四个填充矩形，比逐圈绘制n个矩形的调用少
+            inner = h - 2 * n
+            self.fill_rect(x, y, w, min(n, h), c)
+            if inner > -n:
+                self.fill_rect(x, y + h - n, w, n, c)
+            if inner > 0:
+                self.fill_rect(x, y + n, n, inner, c)
+                self.fill_rect(x + w - n, y + n, n, inner, c)
+            return
+        for i in range(n):
+            self.rect(x + i, y + i, w - 2 * i, h - 2 * i, c)
+
+
+class FrameBufferRenderer(Renderer):
+    """绘制到framebuf.FrameBuffer（包括屏幕驱动提供的FrameBuffer子类），由draw_exec刷新到屏幕"""
+    caps = FILL_RECT | TEXT | BLIT
+
+    def __init__(self, target, width: int = 0, height: int = 0):
+        super().__init__(target, width, height)
+        self.layer_format = getattr(target, "layer_format", None)
+        # 直接使用FrameBuffer的方法，绘图时没有额外的调用开销
+        self.fill = target.fill
+        self.pixel = target.pixel
+        self.hline = target.hline
+        self.vline = target.vline
+        self.line = target.line
+        self.rect = target.rect
+        self.fill_rect = target.fill_rect
+        self.text = target.text
+        self.blit = target.blit
+        self.scroll = target.scroll
+
+
+def _swap(c):
+    return ((c & 0xFF) << 8) | (c >> 8)
+
+
+class PanelRenderer(Renderer):
+    """不使用缓冲区，将图元直接写入ST7735的显存，适合内存不足以容纳整个画面的情况
+    tft为driver.ST7735.TFT，可以由AIR103TFT.Builder.build_panel()创建；
+    swap为True时颜色与AIR103TFT.RGB相同（已交换字节序），否则为ST7735.TFTColor
+    文字逐个字符渲染后写入，字符背景为0；不支持blit，因此视图不会被缓存"""
+    caps = FILL_RECT | DIRECT
+
+    def __init__(self, tft, size, size_offset=(0, 0), swap=True):
+        super().__init__(tft, size[0], size[1])
+        self.ox, self.oy = size_offset
+        self.swap = swap
+        self._glyph_buf = bytearray(8 * 8 * 2)
+        self._glyph = framebuf.FrameBuffer(self._glyph_buf, 8, 8, framebuf.RGB565)
+
+    def _clip(self, x, y, w, h):
+        # 裁剪到屏幕和本帧需要重绘的区域内，返回屏幕坐标下的(x, y, w, h)，完全在区域外时返回None
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.width), min(y + h, self.height)
+        clip = self.clip
+        if clip is not None:
+            x0, y0 = max(x0, clip[0]), max(y0, clip[1])
+            x1, y1 = min(x1, clip[2] + 1), min(y1, clip[3] + 1)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return x0 + self.ox, y0 + self.oy, x1 - x0, y1 - y0
+
+    def fill_rect(self, x, y, w, h, c):
+        r = self._clip(x, y, w, h)
+        if r is not None:
+            self.target.fillrect(r[0], r[1], r[2], r[3], _swap(c) if self.swap else c)
+
+    def fill(self, c):
+        self.fill_rect(0, 0, self.width, self.height, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def pixel(self, x, y, c=None):
+        if c is None:
+            return 0    # 屏幕的显存不能读取
+        if self._clip(x, y, 1, 1) is not None:
+            self.target.pixel(x + self.ox, y + self.oy, _swap(c) if self.swap else c)
+
+    def line(self, x0, y0, x1, y1, c):
+        x, y, w, h = min(x0, x1), min(y0, y1), abs(x1 - x0) + 1, abs(y1 - y0) + 1
+        if x0 == x1 or y0 == y1:
+            self.fill_rect(x, y, w, h, c)
+            return
+        if self._clip(x, y, w, h) is None:
+            return  # 不在需要重绘的区域内
+        self.target.line(x0 + self.ox, y0 + self.oy, x1 + self.ox, y1 + self.oy,
+                         _swap(c) if self.swap else c)
+
+    def text(self, s, x, y, c=1):
+        glyph = self._glyph
+        c = c if self.swap else _swap(c)   # 缓冲区中的颜色需要交换字节序
+        for ch in s:
+            if 0 <= x <= self.width - 8 and 0 <= y <= self.height - 8 \
+                    and self._clip(x, y, 8, 8) is not None:
+                glyph.fill(0)
+                glyph.text(ch, 0, 0, c)
+                self.target.image(x + self.ox, y + self.oy, x + self.ox + 7, y + self.oy + 7, self._glyph_buf)
+            x += 8
+
+
+class RecordingRenderer(Renderer):
+    """记录所有绘图调用而不绘制，用于测试视图的绘制结果和选择的图元
+    ops为(名称, 参数...)的列表，caps可以指定以模拟不同的后端"""
+
+    def __init__(self, width: int, height: int, caps=FILL_RECT | TEXT | BLIT):
+        super().__init__(None, width, height)
+        self.caps = caps
+        self.ops = []
+
+    def __getattr__(self, name):
+        raise AttributeError(name)
+
+    def count(self, name: str):
+        """name被调用的次数"""
+        n = 0
+        for op in self.ops:
+            if op[0] == name:
+                n += 1
+        return n
+
+    def clear(self):
+        self.ops.clear()
+
+    def fill(self, c):
+        self.ops.append(("fill", c))
+
+    def pixel(self, x, y, c=None):
+        self.ops.append(("pixel", x, y, c))
+        return 0
+
+    def hline(self, x, y, w, c):
+        self.ops.append(("hline", x, y, w, c))
+
+    def vline(self, x, y, h, c):
+        self.ops.append(("vline", x, y, h, c))
+
+    def line(self, x0, y0, x1, y1, c):
+        self.ops.append(("line", x0, y0, x1, y1, c))
+
+    def rect(self, x, y, w, h, c, f=False):
+        self.ops.append(("rect", x, y, w, h, c, f))
+
+    def fill_rect(self, x, y, w, h, c):
+        self.ops.append(("fill_rect", x, y, w, h, c))
+
+    def text(self, s, x, y, c=1):
+        self.ops.append(("text", s, x, y, c))
+
+    def blit(self, fb, x, y, key=-1, palette=None):
+        self.ops.append(("blit", fb, x, y, key))
+
+    def scroll(self, dx, dy):
+        self.ops.append(("scroll", dx, dy))
@@ -0,0 +1,89 @@
+from AyUI.core.layer import touch
+from AyUI.core.drawable import Drawable
+
+
+class State:
+    """可观察的状态值，由Store创建，值变化时更新绑定的组件属性"""
+    __slots__ = ("value", "bindings", "pending", "_store")
+
+    def __init__(self, store, value=None):
+        self._store = store
+        self.value = value
+        self.bindings = []  # (组件, 属性名, 转换函数)
+        self.pending = False  # 本帧内是否已经变化过
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        """修改状态，同一帧内的多次修改在下一帧开始时合并处理"""
+        if value == self.value:
+            return
+        self.value = value
+        if not self.pending:
+            self.pending = True
+            self._store.changed(self)
+
+    def bind(self, target, attr: str, fmt=None):
+        """将target.attr绑定到该状态，fmt为可选的转换函数，返回状态本身"""
+        self.bindings.append((target, attr, fmt))
+        if isinstance(target, Drawable):
+            target.tracked = True   # 布局时记录组件的区域，变化时只重绘该区域
+        # 绑定到视图（如space、border）时没有区域，变化时重新布局整个画面
+        setattr(target, attr, self.value if fmt is None else fmt(self.value))
+        return self
+
+
+class Store:
+    """Activity的状态集合，由Surface在创建Activity时创建"""
+
+    def __init__(self, surface):
+        self._surface = surface
+        self.pending = []   # 本帧内变化过的状态
+        self.states = []
+
+    def state(self, value=None):
+        """创建一个状态"""
+        state = State(self, value)
+        self.states.append(state)
+        return state
+
+    def changed(self, state: State):
+        self.pending.append(state)
+        self._surface.wake()
+
+    def unbind(self):
+        """清除所有状态的绑定，重新调用view()前执行"""
+        for state in self.states:
+            state.bindings.clear()
+
+    def retarget(self, mapping: dict):
+        """将绑定到新节点的状态改为绑定到保留的旧节点"""
+        for state in self.states:
+            bindings = state.bindings
+            for i in range(len(bindings)):
+                target, attr, fmt = bindings[i]
+                old = mapping.get(target)
+                if old is not None:
+                    if isinstance(old, Drawable):
+                        old.tracked = True
+                    bindings[i] = (old, attr, fmt)
+
+    def apply(self):
+        """将变化过的状态写入绑定的组件，只重绘这些组件的区域，尺寸变化时重绘整个画面"""
+        if not self.pending:
+            return
+        surface = self._surface
+        for state in self.pending:
+            state.pending = False
+            value = state.value
+            for target, attr, fmt in state.bindings:
+                setattr(target, attr, value if fmt is None else fmt(value))
+                touch(target)
+                rect = getattr(target, "rect", None)
+                if rect is None or not isinstance(target, Drawable) \
+                        or rect[2] != target.width or rect[3] != target.height:
+                    surface.invalidate()
+                else:
+                    surface.invalidate(rect)
+        self.pending.clear()
@@ -0,0 +1,97 @@
+from AyUI.core.box import box, MARGIN, PADDING
+
+
+def mono(r, g, b):
+    """单色屏幕的颜色转换，亮色为1"""
+    return 1 if r + g + b > 381 else 0
+
+
+class Theme:
+    """主题，颜色名称到(r, g, b)的映射，样式中以名称引用"""
+
+    def __init__(self, **colors):
+        self.colors = colors
+
+
+_styles = {}        # 所有样式，参数相同的样式是同一个对象
+_theme = Theme()
+_rgb = mono
+
+
+def _resolve(spec):
+    # 整数为framebuf的颜色值，直接使用；字符串为主题中的颜色名称；元组为(r, g, b)
+    if type(spec) is str:
+        name = spec
+        spec = _theme.colors.get(name)
+        if spec is None:
+            print("[WARN] The theme has no color named '{}'".format(name))
+            return 1
+    if type(spec) is tuple:
+        return _rgb(spec[0], spec[1], spec[2])
+    return spec
+
+
+class Style:
+    """不可变的样式，由style()创建并在组件之间共享，创建后不应修改
+    边距之和与颜色在创建或切换主题时计算好，绘制时直接读取"""
+    __slots__ = ("box", "border", "mx", "my", "ox", "oy", "edge_w", "edge_h",
+                 "pad_w", "pad_h", "box_w", "box_h", "color_spec", "border_spec", "color", "border_color")
+
+    def __init__(self, margin, padding, border, color, border_color):
+        b = box(margin, padding, border)
+        self.box = b
+        self.border = border
+        self.mx = b[MARGIN]                 # 边框的绘图原点
+        self.my = b[MARGIN + 1]
+        self.ox = self.mx + border + b[PADDING]  # 内容的绘图原点
+        self.oy = self.my + border + b[PADDING + 1]
+        self.edge_w = b[MARGIN] + b[MARGIN + 2] + border   # 视图在内容之外占用的空间
+        self.edge_h = b[MARGIN + 1] + b[MARGIN + 3] + border
+        self.pad_w = b[PADDING] + b[PADDING + 2]
+        self.pad_h = b[PADDING + 1] + b[PADDING + 3]
+        self.box_w = self.edge_w + self.pad_w   # 组件在内容之外占用的空间
+        self.box_h = self.edge_h + self.pad_h
+        self.color_spec = color
+        self.border_spec = border_color
+        self.color = _resolve(color)
+        self.border_color = _resolve(border_color)
+
+    @property
+    def margin(self):
+        return tuple(self.box[MARGIN:MARGIN + 4])
+
+    @property
+    def padding(self):
+        return tuple(self.box[PADDING:PADDING + 4])
+
+    def replace(self, margin=None, padding=None, border=None, color=None, border_color=None):
+        """返回修改了部分参数的样式"""
+        return style(
+            self.margin if margin is None else margin,
+            self.padding if padding is None else padding,
+            self.border if border is None else border,
+            self.color_spec if color is None else color,
+            self.border_spec if border_color is None else border_color)
+
+
+def style(margin=(0, 0, 0, 0), padding=(0, 0, 0, 0), border=0, color=1, border_color=1):
+    """返回参数对应的样式，参数相同时返回同一个对象
+    颜色可以是framebuf的颜色值、主题中的颜色名称或(r, g, b)"""
+    key = (tuple(margin), tuple(padding), border, color, border_color)
+    s = _styles.get(key)
+    if s is None:
+        s = Style(key[0], key[1], border, color, border_color)
+        _styles[key] = s
+    return s
+
+
+def use_theme(theme: Theme, rgb=None):
+    """切换主题，rgb为目标framebuf的颜色转换函数rgb(r, g, b)，如AIR103TFT.RGB
+    所有样式的颜色只在这里重新计算一次"""
+    global _theme, _rgb
+    _theme = theme
+    if rgb is not None:
+        _rgb = rgb
+    for s in _styles.values():
+        s.color = _resolve(s.color_spec)
+        s.border_color = _resolve(s.border_spec)
@@ -0,0 +1,359 @@
+import time
+
+from AyUI.core.event import Event
+from AyUI.core.view import View
+from AyUI.core.instance import Instance
+from AyUI.core.control import ActivityCtrl, EventCtrl
+from AyUI.core.render import FrameBufferRenderer, DIRECT
+
+
+class Surface:
+    """显示表面，每块屏幕一个，拥有独立的Activity栈、帧率和刷新回调，由Engine.add_surface()创建"""
+
+    def __init__(self, engine, name: str, width: int, height: int, framebuf, draw_exec,
+                 target_fps=20, partial_flush=False, power_save=0, renderer=None):
+        self.engine = engine
+        self.name = name
+        self.width = width
+        self.height = height
+        self.framebuf = framebuf
+        # 视图通过渲染后端绘图，默认绘制到framebuf，由draw_exec刷新
+        self.renderer = renderer or FrameBufferRenderer(framebuf, width, height)
+        self.draw_exec = draw_exec
+        self.target_fps = target_fps
+        self.instances = []  # 页面数据
+        self.events = []  # 事件列表
+        self._events_spare = []  # 与events交替使用，处理事件时不需要分配新的列表
+        self.dirty = True  # 画面是否需要重绘
+        self.damage = None  # 本帧需要刷新的区域 [x0, y0, x1, y1]
+        self._full = True  # 本帧是否需要刷新整个画面
+        self._layout = True  # 下一帧是否需要重新计算布局
+        self.partial_flush = partial_flush  # 为True时draw_exec会收到需要刷新的区域
+        self._wake = None  # 按需渲染时用于唤醒帧循环的 uasyncio.Event
+        self.power_save = power_save  # 按需渲染时空闲超过该毫秒数，屏幕进入低功耗模式，0为不使用
+
+    def create_activity(self, activity_name: str):
+        """在当前表面上创建一个activity"""
+        assert type(activity_name) is str, Exception(
+            "The 'activity_name' must be string")
+        from AyUI.core.focus import Focus
+        from AyUI.core.state import Store
+        activity = self.engine.registry[activity_name]  # 从注册列表获取Activity类
+        self.engine.feed()  # onCreate和view()可能耗时较长，先喂狗
+        instance = Instance(activity_name)      # 创建一个Instance用于保存信息
+        instance.surface = self
+        instance.focus = Focus(self)            # 创建焦点管理
+        instance.store = Store(self)            # 创建状态
+        actctrl = ActivityCtrl(self, instance)  # 创建一个Activity控制器
+        evtctrl = EventCtrl(instance)           # 创建一个Event控制器
+        instance.activity = activity(actctrl, evtctrl)
+        self.instances.append(instance)
+        instance.activity.onCreate()
+        instance.view = self._view(instance)
+        instance.focus.collect(instance.view)
+
+    def _view(self, instance):
+        view = instance.activity.view(
+            space=(self.width, self.height)
+        )
+        assert isinstance(view, View), TypeError(
+            "[ERR] in activity {}, view() returned an incorrect type".format(instance.name))
+        return view
+
+    def update_view(self, instance):
+        """重新调用view()，与已挂载的视图树对比，只更新发生变化的节点"""
+        from AyUI.core.reconcile import reconcile
+        instance.stale = False
+        instance.store.unbind()     # 绑定会在view()中重新建立
+        root, r = reconcile(instance.view, self._view(instance))
+        instance.store.retarget(r.mapping)
+        instance.view = root
+        instance.focus.collect(root)
+        if r.full:
+            self.invalidate()
+        else:
+            for rect in r.rects:
+                self.invalidate(rect, layout=True)
+
+    def destroy_activity(self, index: int = None):
+        """删除一个activity"""
+        if index is None:
+            index = -1
+        from AyUI.core.layer import layers
+        engine = self.engine
+        self.instances[index].activity.onDestroy()
+        if engine._animator is not None:
+            engine._animator.cancel_owner(self.instances[index])
+        if engine._jobs is not None:
+            engine._jobs.cancel_owner(self.instances[index])
+        layers.release_tree(self.instances[index].view)
+        del self.instances[index].activity.activity
+        del self.instances[index].activity.event
+        del self.instances[index].activity
+        del self.instances[index]
+
+    def start_activity_from(self, activity_name: str):
+        """启动一个activity，一般用于定义最开始的activity"""
+        assert type(activity_name) is str, TypeError(
+            "The 'activity_name' must be string")
+        self.events.append(Event(Event.PUSH_ACTIVITY, activity_name))
+
+    def commit(self, event: Event):
+        """创建一个事件，事件来自类Event"""
+        assert isinstance(event, Event), TypeError(
+            "'event' is not a vaild Event class")
+        self.events.append(event)
+        if self._wake is not None:
+            self._wake.set()
+
+    def invalidate(self, rect=None, layout=False):
+        """标记画面需要重绘，按需渲染时会唤醒帧循环，rect为(x, y, w, h)，None为整个画面
+        只重绘部分区域时默认沿用上一帧的布局，组件的尺寸可能变化时需要传入layout=True"""
+        if rect is None or layout:
+            self._layout = True
+        if rect is None:
+            self._full = True
+        elif not self._full:
+            x1, y1 = rect[0] + rect[2] - 1, rect[1] + rect[3] - 1
+            d = self.damage
+            if d is None:
+                self.damage = [rect[0], rect[1], x1, y1]
+            else:
+                d[0], d[1] = min(d[0], rect[0]), min(d[1], rect[1])
+                d[2], d[3] = max(d[2], x1), max(d[3], y1)
+        self.dirty = True
+        if self._wake is not None:
+            self._wake.set()
+
+    def wake(self):
+        """唤醒空闲的帧循环，但不要求重绘"""
+        if self._wake is not None:
+            self._wake.set()
+
+    def busy(self):
+        """是否有需要持续刷新的内容，按需渲染时为True则不会进入空闲"""
+        engine = self.engine
+        if len(self.instances) > 0:
+            top = self.instances[-1]
+            if top.stale or len(top.store.pending) > 0:
+                return True
+        if self is engine.surface and (len(engine._deferred) > 0 or
+                                       (engine._jobs is not None and engine._jobs.active)):
+            return True
+        if self.renderer.animated:
+            return True     # 时间抖动等需要每帧重绘的画面
+        return engine._animator is not None and engine._animator.active_on(self)
+
+    def handle_events(self):
+        """处理上一帧发生的事件"""
+        if len(self.events) == 0:
+            return
+        events = self.events
+        self.events = self._events_spare
+        if not self.renderer.caps & DIRECT:
+            self.invalidate()  # 事件回调可能修改了视图
+        # 直接绘制到屏幕时重绘整个画面的开销较大，由状态、焦点或回调中的invalidate(rect)标记需要重绘的区域
+        recorder = self.engine.recorder
+        for i in events:
+            if recorder is not None and i.target is None:
+                # 发送给指定Activity的事件（后台任务的结果）在回放时由重新执行的任务产生
+                recorder.event(self.engine.surfaces.index(self), i)
+            # 处理ActivityCtrl
+            if i.event in (Event.CHANGE_ACTIVITY, Event.POP_ACTIVITY, Event.PUSH_ACTIVITY):
+                self.invalidate()   # 切换Activity，重绘整个画面
+            if i.event == Event.CHANGE_ACTIVITY:
+                # 更改Activity(onDestroy,onCreate)
+                self.destroy_activity(-1)
+                self.create_activity(i.payload)
+                self.instances[-1].activity.onStart()
+                self._request_gc()
+                break
+            elif i.event == Event.POP_ACTIVITY:
+                # 退出Activity(onDestroy)
+                assert len(self.instances) > 0, Exception(
+                    "No Activity can exit")
+                self.destroy_activity(-1)
+                if len(self.instances) == 0:
+                    print("[WARN] The last activity exited!")
+                else:
+                    self.instances[-1].activity.onStart()
+                self._request_gc()
+                break
+            elif i.event == Event.PUSH_ACTIVITY:
+                # 新建Activity(onCreate)
+                self.create_activity(i.payload)
+                self.instances[-1].activity.onStart()
+                self._request_gc()
+                break
+            elif i.target is not None:
+                if i.target in self.instances:  # Activity已经销毁时丢弃
+                    i.target.event_exec(i.event, i.payload)
+            elif len(self.instances) > 0:
+                # 优先交给焦点元素，未被处理时调用Activity注册的回调函数
+                instance = self.instances[-1]
+                if not instance.focus.dispatch(i.event, i.payload):
+                    instance.event_exec(i.event, i.payload)
+        events.clear()
+        self._events_spare = events
+
+    def _request_gc(self):
+        # 在本帧结束时回收，没有启用垃圾回收调度时不需要创建调度器
+        collector = self.engine._collector
+        if collector is not None:
+            collector.request()
+
+    def apply_state(self):
+        """更新当前Activity的视图，并将本帧内变化的状态写入绑定的组件"""
+        if len(self.instances) > 0:
+            instance = self.instances[-1]
+            if instance.stale:
+                self.update_view(instance)
+            instance.store.apply()
+
+    def draw(self):
+        """将当前帧通过渲染后端绘制至framebuf或屏幕"""
+        renderer = self.renderer
+        renderer.begin()
+        if len(self.instances) > 0:
+            self.instances[-1].activity.beforeFrame()   # 可能调用invalidate()
+        if renderer.caps & DIRECT and not self.dirty:
+            return  # 屏幕上的画面没有变化，不需要重绘
+        d = self.damage
+        if self._full or d is None or renderer.animated:
+            renderer.clip = None
+            renderer.fill(0)
+        else:
+            # framebuf和屏幕上保留着上一帧的画面，只清除并重绘需要刷新的区域
+            renderer.clip = d
+            renderer.fill_rect(d[0], d[1], d[2] - d[0] + 1, d[3] - d[1] + 1, 0)
+        if len(self.instances) == 0:
+            return
+        # Activity 渲染阶段
+        if self._layout:
+            # 只有局部的、尺寸不变的修改（如状态绑定的组件）时沿用上一帧的布局
+            self.instances[-1].view.calc(f_space=(self.width, self.height))
+            self._layout = False
+        self.instances[-1].view.draw(renderer)
+        self.instances[-1].focus.sync()
+        self.instances[-1].activity.afterFrame()
+
+    def flush(self):
+        """将framebuf刷新到屏幕，并清除本帧的重绘标记
+        draw_exec返回生成器时表示分段刷新，返回该生成器由帧循环逐段推进"""
+        result = None
+        if self.renderer.caps & DIRECT:
+            pass    # 已经绘制到屏幕上
+        elif not self.partial_flush:
+            result = self.draw_exec()
+        elif self._full or self.damage is None:
+            result = self.draw_exec(None)
+        else:
+            d = self.damage
+            x0, y0 = max(d[0], 0), max(d[1], 0)
+            x1, y1 = min(d[2], self.width - 1), min(d[3], self.height - 1)
+            if x1 >= x0 and y1 >= y0:
+                result = self.draw_exec((x0, y0, x1 - x0 + 1, y1 - y0 + 1))
+        self.dirty = False
+        self.damage = None
+        self._full = False
+        return result
+
+    async def run(self, on_demand=False, min_fps=0):
+        """表面的帧循环，多个表面的帧循环之间协作调度"""
+        import uasyncio
+        engine = self.engine
+        frame_target = int(1000/self.target_fps)
+        idle_target = int(1000/min_fps) if min_fps > 0 else 0
+        if on_demand:
+            self._wake = uasyncio.Event()
+        last_frame = time.ticks_ms()
+        while engine.enable:
+            if on_demand:
+                await self._idle(last_frame, idle_target, frame_target)
+                if not engine.enable:
+                    break   # 空闲期间调用了Engine.stop()
+            frame_start = time.ticks_ms()
+            last_frame = frame_start
+            engine.tick(frame_start)
+            self.handle_events()
+            self.apply_state()
+            self.draw()
+            steps = self.flush()
+            if steps is not None:
+                # 分段刷新，每段之间让出给其他表面
+                for _ in steps:
+                    engine.feed()
+                    await uasyncio.sleep_ms(0)
+            frame_total = time.ticks_diff(time.ticks_ms(), frame_start)
+            engine.report("frame", frame_total)
+            if engine.recorder is not None:
+                engine.recorder.frame(self, frame_start, frame_total)
+            if frame_total > frame_target:
+                print("[WARN] Can`t keep up, is it overloaded?")
+                self.commit(
+                    Event(Event.OVERLOAD, (frame_total, frame_target, self.target_fps)))
+            elif self is engine.surface and engine._deferred:
+                # 利用本帧剩余的时间执行一个延后的操作
+                engine.run_deferred()
+                frame_total = time.ticks_diff(time.ticks_ms(), frame_start)
+            if self is engine.surface:
+                jobs = engine._jobs
+                if jobs is not None and jobs.active and frame_total < frame_target:
+                    # 在剩余的时间内推进后台任务，留出1ms给调度
+                    jobs.run(frame_target - frame_total - 1)
+                    frame_total = time.ticks_diff(time.ticks_ms(), frame_start)
+                # 剩余时间足够或刚切换过Activity时进行垃圾回收
+                collector = engine._collector
+                if collector is not None and collector.step(frame_target - frame_total):
+                    frame_total = time.ticks_diff(time.ticks_ms(), frame_start)
+            # 超时的帧也要让出一次，其他表面、输入和用户的任务才能运行
+            await uasyncio.sleep_ms(max(0, frame_target - frame_total))
+        self._wake = None
+
+    async def _idle(self, last_frame, idle_target, poll_target):
+        """空闲等待，直到需要渲染或达到最低刷新间隔，期间按需轮询输入"""
+        import uasyncio
+        engine = self.engine
+        inputs = engine._input    # 没有注册输入设备时为None
+        power = self.power_save > 0 and hasattr(self.framebuf, "low_power")
+        saving = False
+        try:
+            while True:
+                now = time.ticks_ms()
+                engine.tick(now)
+                if not engine.enable or self.dirty or self.events or self.busy():
+                    return
+                timeout = -1  # 无限等待
+                if idle_target > 0:
+                    timeout = idle_target - time.ticks_diff(now, last_frame)
+                    if timeout <= 0:
+                        return
+                rewait = False  # 超时只是为了喂狗或进入低功耗模式，之后继续等待
+                if engine.wdt is not None and (timeout < 0 or timeout > engine.wdt_timeout // 4):
+                    timeout = engine.wdt_timeout // 4
+                    rewait = True
+                if power and not saving:
+                    rest = self.power_save - time.ticks_diff(now, last_frame)
+                    if rest <= 0:
+                        self.framebuf.low_power(True)
+                        saving = True
+                    elif timeout < 0 or timeout > rest:
+                        timeout = rest
+                        rewait = True
+                polling = inputs is not None and inputs.busy
+                if polling and (timeout < 0 or timeout > poll_target):
+                    timeout = poll_target  # 按键按住或等待双击时需要继续计时
+                if self is engine.surface and engine._collector is not None and not engine.busy_any():
+                    engine._collector.idle()  # 所有表面都空闲，回收不会影响帧率
+                self._wake.clear()
+                if timeout < 0:
+                    await self._wake.wait()
+                    continue
+                try:
+                    await uasyncio.wait_for_ms(self._wake.wait(), timeout)
+                except uasyncio.TimeoutError:
+                    if not (inputs is not None and inputs.busy) and not rewait:
+                        return
+        finally:
+            if saving:
+                self.framebuf.low_power(False)
@@ -1,11 +1,36 @@
+from AyUI.core.render import DIRECT
 
 
 class View:
     """基本视图"""
+    focusable = False   # 视图本身不获得焦点，由其中的Drawable获得
+    tracked = False
+    key = None          # 重新调用view()时用于匹配节点
+    keep = ("tracked",) # 重新调用view()时保留的属性
+
+    def keyed(self, key):
+        """设置key并返回自身，用于在view()中标识节点"""
+        self.key = key
+        return self
     def draw(self, framebuf, axis=(0, 0)):
         """绘图函数，用于绘制视图和所有子元素"""
         pass
 
+    def _skip(self, framebuf, ele) -> bool:
+        """只重绘部分区域（framebuf.clip不为None）时，子元素ele完全位于区域外则可以跳过
+        framebuf不能裁剪图元时，超出区域绘制的元素会覆盖区域外之后的元素，此后不再跳过"""
+        clip = framebuf.clip
+        if clip is None or isinstance(ele, View):
+            return False    # 已经改为完整绘制，或由子视图自己判断其中的元素
+        r = ele.rect if ele.focusable or ele.tracked else None
+        if r is not None and (r[0] > clip[2] or r[1] > clip[3]
+                              or r[0] + r[2] <= clip[0] or r[1] + r[3] <= clip[1]):
+            return True
+        if not framebuf.caps & DIRECT and (r is None or r[0] < clip[0] or r[1] < clip[1]
+                                           or r[0] + r[2] - 1 > clip[2] or r[1] + r[3] - 1 > clip[3]):
+            framebuf.clip = None
+        return False
+
     def calc(self, f_space=(0, 0)):
         """计算函数，计算绘制空间，传入可用空间，传出占用空间"""
         return (0, 0)
\ No newline at end of file
@@ -1,53 +1,100 @@
 from AyUI import View
 from AyUI import Drawable
+from AyUI.core.style import style as make_style
+from AyUI.core.layer import layers
+from AyUI.core.render import DIRECT
 
 class BasicView(View):
     """基本视图，任何布局交由子元素管理"""
+    keep = ("tracked", "spaces")
+    _layer = None   # 缓存的位图
 
     def __init__(self, *elements,
                  space=(0, 0),
                  margin=(0, 0, 0, 0),   # 外边距 左上右下
                  padding=(0, 0, 0, 0),  # 内边距 左上右下
                  border=0,              # 边框宽度
-                 border_color=1):       # 边框颜色
+                 border_color=1,        # 边框颜色
+                 style=None,            # 共享的样式，指定时忽略以上的样式参数
+                 cache=False):          # 是否将视图缓存为位图
         self.elements = list(elements)
         self.space = space
-        self.margin = margin
-        self.padding = padding
-        self.border = border
-        self.border_color = border_color
+        if style is None:
+            style = make_style(margin, padding, border, border_color=border_color)
+        self.style = style
         self.spaces = []
+        self.cache = cache
 
     @property
-    def _edge_h(self):
-        return self.margin[1] + self.margin[3] + self.border
+    def margin(self):
+        return self.style.margin
+
+    @margin.setter
+    def margin(self, value):
+        self.style = self.style.replace(margin=value)
+
+    @property
+    def padding(self):
+        return self.style.padding
+
+    @padding.setter
+    def padding(self, value):
+        self.style = self.style.replace(padding=value)
+
+    @property
+    def border(self):
+        return self.style.border
+
+    @border.setter
+    def border(self, value):
+        self.style = self.style.replace(border=value)
 
     @property
-    def _edge_w(self):
-        return self.margin[0] + self.margin[2] + self.border
+    def border_color(self):
+        return self.style.border_color
+
+    @border_color.setter
+    def border_color(self, value):
+        self.style = self.style.replace(border_color=value)
 
     def draw(self, framebuf, axis=(0, 0)):
-        # margin
-        ele_axis = [axis[0]+self.margin[0], axis[1]+self.margin[1]]
-        
-        # border
-        for b in range(self.border):
-            framebuf.rect(
-                ele_axis[0]+b,
-                ele_axis[1]+b,
-                self.space[0]+2*(self.border-b),
-                self.space[1]+2*(self.border-b),
-                self.border_color)
-        
-        # padding
-        ele_axis=[
-            ele_axis[0]+self.border+self.padding[0],
-            ele_axis[1]+self.border+self.padding[1]
-        ]
-        
+        if self.cache:
+            # 缓存为位图，之后的帧只需要一次blit，子元素变化时重新绘制位图
+            st = self.style
+            if getattr(framebuf, "clip", None) is not None and not framebuf.caps & DIRECT:
+                framebuf.clip = None    # blit整个位图，可能超出需要重绘的区域
+            if layers.draw(self, framebuf, axis,
+                           self.space[0] + st.edge_w + st.border,
+                           self.space[1] + st.edge_h + st.border):
+                return
+        self._draw(framebuf, axis)
+
+    def _draw(self, framebuf, axis):
+        ele_axis = self._frame(framebuf, axis)
+        clip = getattr(framebuf, "clip", None)    # 直接绘制到FrameBuffer时没有该属性
         # elements
         for ele in self.elements:
-            ele.draw(framebuf, tuple(ele_axis))
+            if ele.focusable or ele.tracked:
+                ele.place(ele_axis)
+            if clip is not None and self._skip(framebuf, ele):
+                continue    # 不在本帧需要重绘的区域内
+            ele.draw(framebuf, ele_axis)
+
+    def _frame(self, framebuf, axis):
+        """绘制边框，返回子元素的绘图原点"""
+        st = self.style
+        border = st.border
+        if border > 0:
+            if getattr(framebuf, "clip", None) is not None and not framebuf.caps & DIRECT:
+                framebuf.clip = None    # 视图没有记录区域，边框可能超出需要重绘的区域
+            framebuf.border(
+                axis[0]+st.mx,
+                axis[1]+st.my,
+                self.space[0]+2*border,
+                self.space[1]+2*border,
+                border,
+                st.border_color)
+        return (axis[0]+st.ox, axis[1]+st.oy)
 
     def calc(self, f_space=(0, 0)):
-        return (self.space[0]+self._edge_w,self.space[1]+self._edge_h)
\ No newline at end of file
+        return (self.space[0]+self.style.edge_w, self.space[1]+self.style.edge_h)
@@ -12,8 +12,8 @@ class ColumnView(BasicView):
         # RowView 宽度计算子元素最宽宽度，高度通过计算得到
         # ColumnView 宽度通过计算得出，高度计算子元素最高高度
         # 传入可用空间，传出占用空间
-        l_space = [f_space[0]-self._edge_w, f_space[1]-self._edge_h] # 剩余空间
-        space= [self._edge_w, self._edge_h] # 占用空间
+        l_space = [f_space[0]-self.style.edge_w, f_space[1]-self.style.edge_h] # 剩余空间
+        space= [self.style.edge_w, self.style.edge_h] # 占用空间
 
         for i in self.elements:
             if isinstance(i, View):
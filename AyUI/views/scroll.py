@@ -0,0 +1,91 @@
+from AyUI import View
+from AyUI.views.basic import BasicView
+from AyUI.core.render import DIRECT
+
+
+class ScrollView(BasicView):
+    """滚动视图，子元素沿axis方向（0为横向，1为纵向）依次排列，只显示space大小的窗口
+    屏幕支持硬件滚动且滚动方向一致时（如AIR103TFT.TFT_SPI），滚动后只需要刷新新露出的部分
+    每块屏幕只有一个硬件滚动区域，同一画面中只应有一个ScrollView"""
+    keep = ("tracked", "spaces", "offset", "sizes", "origin")
+
+    def __init__(self, *elements, axis=1, **kw):
+        super().__init__(*elements, **kw)
+        self.axis = axis
+        self.offset = 0     # 内容的滚动位置
+        self.sizes = []     # 子元素沿axis方向的尺寸，calc时更新
+        self.origin = None  # 最近一次绘制时窗口的绝对坐标
+        self._hw = None     # 已在屏幕上定义的硬件滚动区域 (start, length)
+        self._shift = 0     # 尚未交给屏幕的滚动量
+        self._drawn = None  # 最近一次绘制时的滚动位置
+
+    def scroll_by(self, d):
+        """滚动d个像素，正数显示后面的内容
+        返回需要重绘的区域，交给self.activity.invalidate()，未使用硬件滚动时返回None即整个画面"""
+        self.offset += d
+        if self._hw is None:
+            return None
+        self._shift += d
+        a = self.axis
+        n = self.space[a]
+        rect = [self.origin[0], self.origin[1], self.space[0], self.space[1]]
+        shift = abs(self._shift)
+        if shift < n:
+            # 只有新露出的部分需要重绘
+            if self._shift > 0:
+                rect[a] += n - shift
+            rect[a + 2] = shift
+        return tuple(rect)
+
+    def draw(self, framebuf, axis=(0, 0)):
+        origin = self._frame(framebuf, axis)
+        self.origin = origin
+        self._sync(framebuf)
+        a = self.axis
+        n = self.space[a]
+        clip = getattr(framebuf, "clip", None)    # 直接绘制到FrameBuffer时没有该属性
+        if self._drawn != self.offset:
+            self._drawn = self.offset
+            if clip is not None and not framebuf.caps & DIRECT:
+                # 硬件滚动只重绘新露出的部分，但framebuf中窗口内的内容都需要移动
+                framebuf.clip = clip = None
+                framebuf.fill_rect(origin[0], origin[1], self.space[0], self.space[1], 0)
+        pos = -self.offset
+        i = 0
+        for ele in self.elements:
+            size = self.sizes[i]
+            i += 1
+            # 只绘制完整落在窗口内的子元素，framebuf不支持裁剪
+            if pos >= 0 and pos + size <= n:
+                ele_axis = (origin[0] + pos, origin[1]) if a == 0 else (origin[0], origin[1] + pos)
+                if ele.focusable or ele.tracked:
+                    ele.place(ele_axis)
+                if clip is None or not self._skip(framebuf, ele):
+                    ele.draw(framebuf, ele_axis)
+            pos += size
+            if pos >= n:
+                break
+
+    def _sync(self, framebuf):
+        # 将滚动量交给屏幕，屏幕在下一次刷新时移动显存的起始行
+        a = self.axis
+        if getattr(framebuf, "scroll_region", None) is None or framebuf.scroll_axis != a:
+            return
+        region = (self.origin[a], self.space[a])
+        if self._hw != region:
+            # 新定义的区域从0开始，这一帧会完整刷新
+            self._hw = region if framebuf.scroll_region(*region) else None
+            self._shift = 0
+        elif self._shift != 0:
+            framebuf.vscroll(self._shift)
+            self._shift = 0
+
+    def calc(self, f_space=(0, 0)):
+        sizes = self.sizes
+        sizes.clear()
+        for ele in self.elements:
+            if isinstance(ele, View):
+                sizes.append(ele.calc(f_space=tuple(self.space))[self.axis])
+            else:
+                sizes.append((ele.width, ele.height)[self.axis])
+        return super().calc(f_space)
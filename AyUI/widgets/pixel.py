@@ -1,4 +1,5 @@
 from AyUI import Drawable
+from AyUI.core.style import style as make_style
 
 class Pixel(Drawable):
     """基本绘画元素, 一个点"""
@@ -9,41 +10,58 @@ class Pixel(Drawable):
                  margin=(0, 0, 0, 0),   # 外边距 左上右下
                  padding=(0, 0, 0, 0),  # 内边距 左上右下
                  border=0,              # 边框
-                 border_color=1):       # 边框颜色
+                 border_color=1,        # 边框颜色
+                 style=None):           # 共享的样式，指定时忽略color以外的样式参数
         self.axis = axis
-        self.margin = margin
-        self.padding = padding
-        self.border = border
-        self.border_color = border_color
-        self.color = color
+        if style is None:
+            style = make_style(margin, padding, border, color, border_color)
+        elif color is not None and color != style.color_spec:
+            style = style.replace(color=color)
+        self.style = style
+
+    @property
+    def color(self):
+        return self.style.color
+
+    @color.setter
+    def color(self, value):
+        self.style = self.style.replace(color=value)
+
+    @property
+    def margin(self):
+        return self.style.margin
+
+    @property
+    def padding(self):
+        return self.style.padding
+
+    @property
+    def border(self):
+        return self.style.border
+
+    @property
+    def border_color(self):
+        return self.style.border_color
 
     @property
     def width(self):
-        return 1 + \
-            self.margin[0] + self.margin[2] + self.border + self.padding[0] + self.padding[2]
+        return 1 + self.style.box_w
 
     @property
     def height(self):
-        return 1 + \
-            self.margin[1] + self.margin[3] + self.border + self.padding[1] + self.padding[3]
+        return 1 + self.style.box_h
 
     def draw(self, framebuf, axis):
-        # margin
-        ele_axis = [axis[0]+self.margin[0], axis[1]+self.margin[1]] # 左上绘图原点
-        
+        st = self.style
         # border
-        for b in range(self.border):
-            framebuf.rect(
-                ele_axis[0]+b,
-                ele_axis[1]+b,
-                1+self.padding[0]+self.padding[2]+2*(self.border-b),
-                1+self.padding[1]+self.padding[3]+2*(self.border-b),
-                self.border_color)
-        
-        # padding
-        ele_axis=[
-            ele_axis[0]+self.border+self.padding[0],
-            ele_axis[1]+self.border+self.padding[1]
-        ]
+        border = st.border
+        if border > 0:
+            framebuf.border(
+                axis[0]+st.mx,
+                axis[1]+st.my,
+                1+st.pad_w+2*border,
+                1+st.pad_h+2*border,
+                border,
+                st.border_color)
         
-        framebuf.pixel(ele_axis[0], ele_axis[1], self.color)
\ No newline at end of file
+        framebuf.pixel(axis[0]+st.ox, axis[1]+st.oy, st.color)
@@ -1,11 +1,17 @@
 import framebuf
 from driver.ST7735 import TFT
+from driver.color import FRAMEBUF, COLORS, rgb565
+from driver import accel
 
+# 屏幕控制器显存沿扫描方向的行数，硬件滚动区域的上下固定区与滚动区之和必须等于它
+# ST7735S（GM=00）为162，128x160的ST7735R等为160，其他变体可以通过Builder.set_ram_lines()指定
+RAM_LINES = 162
 
 def RGB(r, g, b):
     '''Create a 16 bit rgb value from the given R,G,B from 0-255.
-       This assumes rgb 565 layout and will be incorrect for bgr.'''
-    return ((r & 0xF8) << 8) | ((b & 0xFC) << 3) | (g >> 3)
+       The bytes are pre-swapped so that framebuf.RGB565 stores them
+       in the big-endian order expected by the panel.'''
+    return FRAMEBUF.rgb(r, g, b)
 
 
 class Builder():
@@ -14,17 +20,18 @@ class Builder():
         self.spi = None
         self.size = None
         self.size_offset = (0, 0)
+        self.ram_lines = RAM_LINES
         self.cs = None
         self.dc = None
         self.reset = None
+        self.bpp = 16
+        self.palette = None
 
     def set_spi(self, spi):
         self.spi = spi
         return self
 
     def set_size(self, size_w, size_h):
-        if size_w * size_h > 8192:
-            print("[WARN]:Excessive size can lead to excessive memory usage, consider implementing FrameBuffer directly on the screen driver.")
         self.size = (size_w, size_h)
         return self
 
@@ -32,6 +39,11 @@ class Builder():
         self.size_offset = (size_offset_w, size_offset_h)
         return self
 
+    def set_ram_lines(self, ram_lines):
+        '''设置显存沿扫描方向的行数，用于硬件滚动，默认为RAM_LINES'''
+        self.ram_lines = ram_lines
+        return self
+
     def set_cs_pin(self, cs_pin):
         self.cs = cs_pin
         return self
@@ -44,8 +56,29 @@ class Builder():
         self.reset = reset_pin
         return self
 
+    def set_indexed(self, bpp=4, palette=None):
+        '''使用调色板模式，bpp为4或8，palette为RGB565颜色列表'''
+        if bpp not in (4, 8):
+            raise ValueError("Indexed mode only supports 4 or 8 bpp.")
+        self.bpp = bpp
+        self.palette = palette
+        return self
+
     def build(self):
         if (self.spi and self.size and self.cs and self.dc and self.reset):
+            if self.size[0] * self.size[1] * self.bpp // 8 > 16384:
+                print("[WARN]:Excessive size can lead to excessive memory usage, consider implementing FrameBuffer directly on the screen driver.")
+            if self.bpp != 16:
+                return TFT_SPI_Indexed(
+                    self.size,
+                    self.size_offset,
+                    self.rgb,
+                    self.spi,
+                    self.cs,
+                    self.dc,
+                    self.reset,
+                    self.bpp,
+                    self.palette)
             return TFT_SPI(
                 self.size,
                 self.size_offset,
@@ -53,38 +86,263 @@ class Builder():
                 self.spi,
                 self.cs,
                 self.dc,
-                self.reset)
+                self.reset,
+                self.ram_lines)
         else:
             raise TypeError("Insufficient parameters.")
 
+    def build_panel(self):
+        '''不分配缓冲区，返回初始化后的ST7735.TFT，配合AyUI.core.render.PanelRenderer直接绘制到屏幕'''
+        if (self.spi and self.size and self.cs and self.dc and self.reset):
+            return _panel(self.size, self.size_offset, self.rgb,
+                          self.spi, self.cs, self.dc, self.reset)
+        else:
+            raise TypeError("Insufficient parameters.")
+
+
+def _panel(size, size_offset, color_mode, spi, cs, dc, reset):
+    tft = TFT(spi, dc, reset, cs)
+    tft.initr()
+    tft.rgb(color_mode)
+    tft.rotation(1)
+    tft._setwindowloc((size_offset[0], size_offset[1]),
+                      (size_offset[0]+size[0]-1, size_offset[1]+size[1]-1))
+    return tft
+
+
+def _window(tft, size, size_offset, rect):
+    # 设置写入窗口，rect为None时恢复为整个屏幕，返回窗口的起止行
+    y0, y1 = 0, size[1] - 1
+    if rect is not None:
+        y0, y1 = rect[1], rect[1] + rect[3] - 1
+    tft._setwindowloc((size_offset[0], size_offset[1] + y0),
+                      (size_offset[0] + size[0] - 1, size_offset[1] + y1))
+    return y0, y1
+
+
+class _Panel(framebuf.FrameBuffer):
+    """ST7735屏幕的公共部分：尺寸和低功耗模式"""
+    power_area = None   # 低功耗时只显示的区域 (start, length)，沿scroll_axis，None为整个屏幕
+    power_idle = True   # 低功耗时是否进入8色空闲模式
+    scroll_area = None  # 硬件滚动区域 [start, length, offset]
+    _power = False
+
+    @property
+    def scroll_axis(self):
+        """硬件滚动和局部显示沿屏幕的扫描方向进行，横屏时为x轴(0)，竖屏时为y轴(1)"""
+        return 0 if self.rotate & 1 else 1
+
+    def power_region(self, start=None, length=0, idle=True):
+        """设置低功耗模式，start为None时显示整个屏幕，否则只显示沿scroll_axis从start开始的length行"""
+        self.power_area = None if start is None else (start, length)
+        self.power_idle = idle
+
+    def low_power(self, enable=True):
+        """进入或退出低功耗模式，适合长时间静止的画面，显存内容不受影响"""
+        if enable == self._power:
+            return
+        self._power = enable
+        tft = self.tft
+        area = self.power_area
+        if enable:
+            # 局部显示会退出硬件滚动，滚动过的区域显示会错位
+            if area is not None and (self.scroll_area is None or self.scroll_area[2] == 0):
+                start = self.size_offset[self.scroll_axis] + area[0]
+                tft.partial(start, start + area[1] - 1)
+            if self.power_idle:
+                tft.idle(True)
+            return
+        if self.power_idle:
+            tft.idle(False)
+        if area is not None:
+            tft.normal()
+            scroll = self.scroll_area
+            if scroll is not None and scroll[2] != 0:
+                tft._vscrolladdr(self.size_offset[self.scroll_axis] + scroll[0] + scroll[2])
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
 
-class TFT_SPI(framebuf.FrameBuffer):
-    def __init__(self, size, size_offset, color_mode, spi, cs, dc, reset):
+
+class TFT_SPI(_Panel):
+    layer_format = framebuf.RGB565  # 视图缓存位图使用的格式
+    def __init__(self, size, size_offset, color_mode, spi, cs, dc, reset, ram_lines=RAM_LINES):
         self.rotate = 1
         self.size = size
+        self.ram_lines = ram_lines  # 显存沿扫描方向的行数
         self.buffer = bytearray(size[0] * size[1] * 2)
         super().__init__(self.buffer, size[0], size[1], framebuf.RGB565)
-        print("[WARN]RGB565: There may be display issues with this color format")
+        self.color = FRAMEBUF   # 颜色已按屏幕字节序预先交换，刷新时直接发送缓冲区
+        self.size_offset = size_offset
+        self._mv = memoryview(self.buffer)
+        self._scroll_to = 0     # 下一次show()时生效的滚动位置
+        self.tft = _panel(size, size_offset, color_mode, spi, cs, dc, reset)
+
+    def scroll_region(self, start, length):
+        """定义硬件滚动区域，沿scroll_axis从start开始length行，当前旋转方向不支持时返回False"""
+        if self.rotate not in (0, 1):
+            return False    # 镜像的旋转方向需要反向换算显存地址，暂不支持
+        tfa = self.size_offset[self.scroll_axis] + start
+        self.tft.setvscroll(tfa, self.ram_lines - tfa - length)
+        self.tft._vscrolladdr(tfa)
+        self.scroll_area = [start, length, 0]
+        self._scroll_to = 0
+        return True
+
+    def vscroll(self, lines):
+        """将滚动区域的内容向起点方向移动lines行，在下一次show()时生效，新露出的行需要另外刷新"""
+        self._scroll_to = (self._scroll_to + lines) % self.scroll_area[1]
 
-        tft = TFT(spi, dc, reset, cs)
-        tft.initr()
-        tft.rgb(color_mode)
-        tft.rotation(self.rotate)
-        tft._setwindowloc((size_offset[0], size_offset[1]),
-                          (size_offset[0]+size[0]-1, size_offset[1]+size[1]-1))
-        self.tft = tft
+    def show(self, rect=None):
+        """刷新到屏幕，rect为(x, y, w, h)时只刷新该区域"""
+        area = self.scroll_area
+        if area is not None and area[2] != self._scroll_to:
+            area[2] = self._scroll_to
+            self.tft._vscrolladdr(self.size_offset[self.scroll_axis] + area[0] + area[2])
+        scrolled = area is not None and area[2] != 0
+        if rect is None and not scrolled:
+            self.tft._writedata(self.buffer)
+            return
+        w, h = self.size
+        x0, y0, x1, y1 = 0, 0, w - 1, h - 1
+        if rect is not None:
+            x0, y0 = rect[0], rect[1]
+            x1, y1 = x0 + rect[2] - 1, y0 + rect[3] - 1
+            if rect[2] * 2 > w:
+                x0, x1 = 0, w - 1   # 较宽的区域按整行发送，一次写入比逐行写入快
+        if self.scroll_axis:
+            for a, b, m in self._runs(y0, y1):
+                self._write(x0, a, x1, b, x0, m)
+        else:
+            for a, b, m in self._runs(x0, x1):
+                self._write(a, y0, b, y1, m, y0)
+        _window(self.tft, self.size, self.size_offset, None)
+
+    def _runs(self, a0, a1):
+        # 将沿扫描方向的区间[a0, a1]拆分为显存中连续的几段 (起点, 终点, 显存起点)
+        area = self.scroll_area
+        if area is None or area[2] == 0:
+            yield a0, a1, a0
+            return
+        s, n, off = area
+        e = s + n - 1
+        if a0 < s:
+            yield a0, min(a1, s - 1), a0
+        lo, hi = max(a0, s), min(a1, e)
+        if lo <= hi:
+            m = s + (lo - s + off) % n
+            wrap = lo + e - m   # 在这里到达滚动区域末尾，之后从区域起点继续
+            if hi <= wrap:
+                yield lo, hi, m
+            else:
+                yield lo, wrap, m
+                yield wrap + 1, hi, s
+        if a1 > e:
+            lo = max(a0, e + 1)
+            yield lo, a1, lo
 
-    def show(self):
-        self.tft._writedata(self.buffer)
+    def _write(self, x0, y0, x1, y1, mx, my):
+        # 将缓冲区中的(x0, y0)-(x1, y1)写入显存(mx, my)处
+        tft = self.tft
+        ox, oy = self.size_offset
+        tft._setwindowloc((ox + mx, oy + my), (ox + mx + x1 - x0, oy + my + y1 - y0))
+        row = self.size[0] * 2
+        if x0 == 0 and x1 == self.size[0] - 1:
+            tft._writedata(self._mv[y0 * row:(y1 + 1) * row])
+            return
+        spi = tft.device.begin()
+        for y in range(y0 * row + x0 * 2, y1 * row + x0 * 2 + 1, row):
+            spi.write(self._mv[y:y + (x1 - x0 + 1) * 2])
+        tft.device.end()
 
     @staticmethod
     def rgb(r, g, b):
         return RGB(r, g, b)
-    
-    @property
-    def width(self):
-        return self.size[0]
-    
-    @property
-    def height(self):
-        return self.size[1]
+
+
+class TFT_SPI_Indexed(_Panel):
+    """调色板模式的FrameBuffer，绘图使用调色板索引，在show()时逐行展开为RGB565"""
+
+    def __init__(self, size, size_offset, color_mode, spi, cs, dc, reset, bpp=4, palette=None):
+        self.rotate = 1
+        self.size = size
+        self.bpp = bpp
+        if bpp == 4:
+            self.row_bytes = (size[0] + 1) // 2    # 每行字节数，行首按字节对齐
+            fmt = framebuf.GS4_HMSB
+        else:
+            self.row_bytes = size[0]
+            fmt = framebuf.GS8
+        self.buffer = bytearray(self.row_bytes * size[1])
+        self.layer_format = fmt
+        self._mv = memoryview(self.buffer)
+        super().__init__(self.buffer, size[0], size[1], fmt, self.row_bytes * 8 // bpp)
+
+        # 调色板以大端RGB565保存，可以直接发送给屏幕
+        self.palette = bytearray(2 << bpp)
+        self.rgb332 = palette is None and bpp == 8
+        if palette is not None:
+            for i, color in enumerate(palette):
+                self.set_palette(i, color)
+        elif bpp == 4:
+            # 4bpp默认调色板，0为黑色，1为白色，与单色屏的默认颜色保持一致
+            for i, c in enumerate(COLORS):
+                self.set_palette(i, rgb565(c[1], c[2], c[3]))
+        else:
+            # 8bpp默认使用RGB332调色板
+            for i in range(256):
+                self.set_palette(i, rgb565(
+                    (i & 0xE0) * 255 // 0xE0,
+                    ((i << 3) & 0xE0) * 255 // 0xE0,
+                    ((i << 6) & 0xC0) * 255 // 0xC0))
+        self.line = bytearray(size[0] * 2)  # 行缓冲
+        self.size_offset = size_offset
+        self.tft = _panel(size, size_offset, color_mode, spi, cs, dc, reset)
+
+    def set_palette(self, index, color):
+        """设置调色板索引对应的RGB565颜色，颜色使用driver.color.rgb565生成"""
+        self.palette[2 * index] = color >> 8
+        self.palette[2 * index + 1] = color & 0xff
+
+    def show(self, rect=None):
+        """刷新到屏幕，rect为(x, y, w, h)时只刷新这些行"""
+        tft = self.tft
+        y0, y1 = 0, self.size[1] - 1
+        if rect is not None:
+            y0, y1 = _window(tft, self.size, self.size_offset, rect)
+        spi = tft.device.begin()
+        for y in range(y0, y1 + 1):
+            self._expand(y)
+            spi.write(self.line)
+        tft.device.end()
+        if rect is not None:
+            _window(tft, self.size, self.size_offset, None)
+
+    def _expand(self, y):
+        # 将一行调色板索引展开为RGB565
+        start = y * self.row_bytes
+        row = self._mv[start:start + self.row_bytes]
+        if self.bpp == 4:
+            accel.expand_gs4(self.line, row, self.palette, self.size[0])
+        else:
+            accel.expand_gs8(self.line, row, self.palette, self.size[0])
+
+    def rgb(self, r, g, b):
+        """返回调色板中最接近的颜色索引"""
+        if self.rgb332:
+            return (r & 0xE0) | ((g >> 3) & 0x1C) | (b >> 6)
+        target = rgb565(r, g, b)
+        tr, tg, tb = target >> 11, (target >> 5) & 0x3F, target & 0x1F
+        best, best_d = 0, -1
+        for i in range(1 << self.bpp):
+            c = (self.palette[2 * i] << 8) | self.palette[2 * i + 1]
+            d = (((c >> 11) - tr) ** 2) * 4 + (((c >> 5) & 0x3F) - tg) ** 2 \
+                + ((c & 0x1F) - tb) ** 2 * 4
+            if best_d < 0 or d < best_d:
+                best, best_d = i, d
+        return best
@@ -2,6 +2,8 @@
 
 from micropython import const
 import framebuf
+from driver.bus import SPIDevice
+from driver import accel
 
 
 # register definitions
@@ -26,17 +28,21 @@ SET_CHARGE_PUMP = const(0x8D)
 # Subclassing FrameBuffer provides support for graphics primitives
 # http://docs.micropython.org/en/latest/pyboard/library/framebuf.html
 class SSD1306(framebuf.FrameBuffer):
+    layer_format = framebuf.MONO_VLSB  # format of the bitmaps AyUI caches views in
+
     def __init__(self, width, height, external_vcc):
         self.width = width
         self.height = height
         self.external_vcc = external_vcc
         self.pages = self.height // 8
         self.buffer = bytearray(self.pages * self.width)
+        self.addr_cmds = bytearray(6)
+        self.shadow = None
         super().__init__(self.buffer, self.width, self.height, framebuf.MONO_VLSB)
         self.init_display()
 
     def init_display(self):
-        for cmd in (
+        self.write_cmds(bytes((
             SET_DISP | 0x00,  # off
             # address setting
             SET_MEM_ADDR,
@@ -66,9 +72,8 @@ class SSD1306(framebuf.FrameBuffer):
             # charge pump
             SET_CHARGE_PUMP,
             0x10 if self.external_vcc else 0x14,
-            SET_DISP | 0x01,
-        ):  # on
-            self.write_cmd(cmd)
+            SET_DISP | 0x01,  # on
+        )))
         self.fill(0)
         self.show()
 
@@ -85,28 +90,97 @@ class SSD1306(framebuf.FrameBuffer):
     def invert(self, invert):
         self.write_cmd(SET_NORM_INV | (invert & 1))
 
-    def show(self):
-        x0 = 0
-        x1 = self.width - 1
+    def write_cmds(self, cmds):
+        # Send several command bytes; subclasses batch them into one transfer
+        for cmd in cmds:
+            self.write_cmd(cmd)
+
+    def write_window(self, buf, c0, c1, p0, p1):
+        # Select columns c0..c1 of pages p0..p1 and send their data
+        self.write_cmds(self._addressing(c0, c1, p0, p1))
+        self.write_data(buf)
+
+    def _addressing(self, c0, c1, p0, p1):
+        # Command sequence that selects a window of the display RAM
         if self.width == 64:
             # displays with width of 64 pixels are shifted by 32
-            x0 += 32
-            x1 += 32
-        self.write_cmd(SET_COL_ADDR)
-        self.write_cmd(x0)
-        self.write_cmd(x1)
-        self.write_cmd(SET_PAGE_ADDR)
-        self.write_cmd(0)
-        self.write_cmd(self.pages - 1)
-        self.write_data(self.buffer)
+            c0 += 32
+            c1 += 32
+        addr = self.addr_cmds
+        addr[0] = SET_COL_ADDR
+        addr[1] = c0
+        addr[2] = c1
+        addr[3] = SET_PAGE_ADDR
+        addr[4] = p0
+        addr[5] = p1
+        return addr
+
+    def diff(self, enable=True):
+        # Keep a copy of the last transmitted frame and only send the changed
+        # column range of every page in show() and show_pages()
+        if enable:
+            self.shadow = bytearray(len(self.buffer))
+            self.shadow_valid = False
+        else:
+            self.shadow = None
+
+    def show(self):
+        if self.shadow is not None:
+            for _ in self._show_diff():
+                pass
+            return
+        self.write_window(self.buffer, 0, self.width - 1, 0, self.pages - 1)
+
+    def show_pages(self):
+        # Generator version of show() that yields after every page, so that a
+        # cooperative scheduler can run other work during a slow I2C transfer
+        if self.shadow is not None:
+            yield from self._show_diff()
+            return
+        mv = memoryview(self.buffer)
+        self.write_window(mv[:self.width], 0, self.width - 1, 0, self.pages - 1)
+        yield
+        for page in range(1, self.pages):
+            self.write_data(mv[page * self.width:(page + 1) * self.width])
+            yield
+
+    def _show_diff(self):
+        buf = self.buffer
+        shadow = self.shadow
+        if not self.shadow_valid:
+            # nothing has been sent yet, the whole frame is needed once
+            shadow[:] = buf
+            self.shadow_valid = True
+            self.write_window(buf, 0, self.width - 1, 0, self.pages - 1)
+            yield
+            return
+        mv = memoryview(buf)
+        for page in range(self.pages):
+            start = page * self.width
+            span = accel.diff_span(buf, shadow, start, start + self.width)
+            if span < 0:
+                continue
+            i = span >> 16
+            j = (span & 0xFFFF) + 1
+            shadow[i:j] = mv[i:j]
+            self.write_window(mv[i:j], i - start, j - 1 - start, page, page)
+            yield
 
 
 class SSD1306_I2C(SSD1306):
-    def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False):
+    # combined=True sends the addressing commands and the frame data in a
+    # single I2C transaction; set it to False for controllers that cannot
+    # handle large writevto() calls
+    def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False, combined=True):
         self.i2c = i2c
         self.addr = addr
+        self.combined = combined
         self.temp = bytearray(2)
         self.write_list = [b"\x40", None]  # Co=0, D/C#=1
+        self.cmd_list = [b"\x00", None]  # Co=0, D/C#=0, all following bytes are commands
+        # Co=1, D/C#=0 before every addressing command, then Co=0, D/C#=1 for the data
+        self.show_header = bytearray(13)
+        self.show_list = [self.show_header, None]
         super().__init__(width, height, external_vcc)
 
     def write_cmd(self, cmd):
@@ -114,18 +188,37 @@ class SSD1306_I2C(SSD1306):
         self.temp[1] = cmd
         self.i2c.writeto(self.addr, self.temp)
 
+    def write_cmds(self, cmds):
+        self.cmd_list[1] = cmds
+        self.i2c.writevto(self.addr, self.cmd_list)
+
     def write_data(self, buf):
         self.write_list[1] = buf
         self.i2c.writevto(self.addr, self.write_list)
 
+    def write_window(self, buf, c0, c1, p0, p1):
+        if not self.combined:
+            return super().write_window(buf, c0, c1, p0, p1)
+        # Addressing commands followed by data in one transaction
+        header = self.show_header
+        addr = self._addressing(c0, c1, p0, p1)
+        for i in range(6):
+            header[2 * i] = 0x80
+            header[2 * i + 1] = addr[i]
+        header[12] = 0x40
+        self.show_list[1] = buf
+        self.i2c.writevto(self.addr, self.show_list)
+
 
 class SSD1306_SPI(SSD1306):
+    # spi may be a machine.SPI or a driver.bus.SPIBus shared with other devices
     def __init__(self, width, height, spi, dc, res, cs, external_vcc=False):
         self.rate = 10 * 1024 * 1024
         dc.init(dc.OUT, value=0)
         res.init(res.OUT, value=0)
         cs.init(cs.OUT, value=1)
-        self.spi = spi
+        self.device = SPIDevice(spi, cs, dc, self.rate)
+        self.spi = self.device.spi
         self.dc = dc
         self.res = res
         self.cs = cs
@@ -139,17 +232,10 @@ class SSD1306_SPI(SSD1306):
         super().__init__(width, height, external_vcc)
 
     def write_cmd(self, cmd):
-        self.spi.init(baudrate=self.rate, polarity=0, phase=0)
-        self.cs(1)
-        self.dc(0)
-        self.cs(0)
-        self.spi.write(bytearray([cmd]))
-        self.cs(1)
+        self.device.command(cmd)
+
+    def write_cmds(self, cmds):
+        self.device.commands(cmds)
 
     def write_data(self, buf):
-        self.spi.init(baudrate=self.rate, polarity=0, phase=0)
-        self.cs(1)
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(buf)
-        self.cs(1)
\ No newline at end of file
+        self.device.write(buf)
@@ -6,7 +6,9 @@
 
 import machine
 import time
-from math import sqrt
+from array import array
+from driver import accel
+from driver.bus import SPIBus, SPIDevice
 
 TFTRotations = [0x00, 0x60, 0xC0, 0xA0]
 TFTBGR = 0x08
@@ -41,8 +43,11 @@ class TFT(object) :
   RAMWR = 0x2C
   RAMRD = 0x2E
 
+  PTLAR = 0x30
   VSCRDEF = 0x33
   VSCSAD = 0x37
+  IDMOFF = 0x38
+  IDMON = 0x39
 
   COLMOD = 0x3A
   MADCTL = 0x36
@@ -70,6 +75,8 @@ class TFT(object) :
   GMCTRP1 = 0xE0
   GMCTRN1 = 0xE1
 
+  BAUDRATE = 20000000   # SPI clock used on a shared SPIBus when no baudrate is given
+
   BLACK = 0
   RED = TFTColor(0xFF, 0x00, 0x00)
   MAROON = TFTColor(0x80, 0x00, 0x00)
@@ -87,7 +94,7 @@ class TFT(object) :
   def color( aR, aG, aB ) :
     return TFTColor(aR, aG, aB)
 
-  def __init__( self, spi, aDC, aReset, aCS) :
+  def __init__( self, spi, aDC, aReset, aCS, baudrate = None ) :
     self._size = ScreenSize
     self._offset = bytearray([0,0])
     self.rotate = 0
@@ -98,9 +105,20 @@ class TFT(object) :
     self.reset = machine.Pin(aReset, machine.Pin.OUT, machine.Pin.PULL_DOWN)
     self.cs = machine.Pin(aCS, machine.Pin.OUT, machine.Pin.PULL_DOWN)
     self.cs(1)
-    self.spi = spi
+    # spi may be a machine.SPI or a driver.bus.SPIBus shared with other devices.
+    # A plain SPI keeps its own configuration; on a shared bus the panel always
+    # sets its clock, otherwise it would run at whatever the previous device used
+    if baudrate is None and isinstance(spi, SPIBus):
+      baudrate = TFT.BAUDRATE
+    self.device = SPIDevice(spi, self.cs, self.dc, baudrate)
+    self.spi = self.device.spi
     self.colorData = bytearray(2)
     self.windowLocData = bytearray(4)
+    self.scrollData = bytearray(2)
+    self.glyphData = bytearray(0)
+    self.lineSeg = array('i', bytearray(16))
+    self.lineRuns = array('i', bytearray(0))
+    self.circlePts = array('i', bytearray(0))
 
   def size( self ) :
     return self._size
@@ -128,29 +146,24 @@ class TFT(object) :
       self._setwindowpoint(x, y)
       self._pushcolor(aColor)
 
-  def text( self, aString, x, y, aColor, aFont, w, h = 1, nowrap = False ) :
+  def text( self, aString, x, y, aColor, aFont, w = 1, h = 1, nowrap = False ) :
 
     if aFont == None:
       return
 
-    if (type(w, h) == int) or (type(w, h) == float):
-      wh = (w, h, w, h)
-    else:
-      wh = w, h
-
     px, py = x, y
-    width = wh[0] * aFont["Width"] + 1
+    width = w * aFont["Width"] + 1
     for c in aString:
-      self.char((px, py), c, aColor, aFont, wh)
+      self.char(px, py, c, aColor, aFont, w, h)
       px += width
       if px + width > self._size[0]:
         if nowrap:
           break
         else:
-          py += aFont["Height"] * wh[1] + 1
+          py += aFont["Height"] * h + 1
           px = x
 
-  def char( self, x, y, aChar, aColor, aFont, w, hs ) :
+  def char( self, x, y, aChar, aColor, aFont, w = 1, h = 1 ) :
 
     if aFont == None:
       return
@@ -166,66 +179,41 @@ class TFT(object) :
 
       charA = aFont["Data"][ci:ci + fontw]
       px = x
-      if w <= 1 and w <= 1 :
-        buf = bytearray(2 * fonth * fontw)
-        for q in range(fontw) :
-          c = charA[q]
-          for r in range(fonth) :
-            if c & 0x01 :
-              pos = 2 * (r * fontw + q)
-              buf[pos] = aColor >> 8
-              buf[pos + 1] = aColor & 0xff
-            c >>= 1
-        self.image(x, y, x + fontw - 1, y + fonth - 1, buf)
+      if w <= 1 and h <= 1 :
+        if len(self.glyphData) != 2 * fonth * fontw:
+          self.glyphData = bytearray(2 * fonth * fontw)
+        accel.glyph(self.glyphData, charA, fonth, aColor)
+        self.image(x, y, x + fontw - 1, y + fonth - 1, self.glyphData)
       else:
         for c in charA :
           py = y
           for r in range(fonth) :
             if c & 0x01 :
-              self.fillrect((px, py), w, hs, aColor)
-            py += w, hs[1]
+              self.fillrect(px, py, w, h, aColor)
+            py += h
             c >>= 1
-          px += w, hs[0]
+          px += w
 
   def line( self, x, y, x1, y1, aColor ) :
     if x == x1:
-      pnt = x1, y1 if (y1 < y) else x, y
-      self.vline(pnt, abs(y1 - y) + 1, aColor)
+      self.vline(x, min(y, y1), abs(y1 - y) + 1, aColor)
     elif y == y1:
-      pnt = x1, y1 if x1 < x else x, y
-      self.hline(pnt, abs(x1 - x) + 1, aColor)
+      self.hline(min(x, x1), y, abs(x1 - x) + 1, aColor)
     else:
-      px, py = x, y
-      ex, ey = x1, y1
-      dx = ex - px
-      dy = ey - py
-      inx = 1 if dx > 0 else -1
-      iny = 1 if dy > 0 else -1
-
-      dx = abs(dx)
-      dy = abs(dy)
-      if (dx >= dy):
-        dy <<= 1
-        e = dy - dx
-        dx <<= 1
-        while (px != ex):
-          self.pixel((px, py), aColor)
-          if (e >= 0):
-            py += iny
-            e -= dx
-          e += dy
-          px += inx
+      # 按主轴方向分解为若干水平/竖直线段，每段只需要一次窗口设置
+      need = 3 * (min(abs(x1 - x), abs(y1 - y)) + 1)
+      if len(self.lineRuns) < need:
+        self.lineRuns = array('i', bytearray(4 * need))
+      seg = self.lineSeg
+      seg[0], seg[1], seg[2], seg[3] = x, y, x1, y1
+      runs = self.lineRuns
+      n = accel.line_runs(runs, seg)
+      if abs(x1 - x) >= abs(y1 - y):
+        for i in range(0, 3 * n, 3):
+          self.hline(runs[i], runs[i + 1], runs[i + 2], aColor)
       else:
-        dx <<= 1
-        e = dx - dy
-        dy <<= 1
-        while (py != ey):
-          self.pixel((px, py), aColor)
-          if (e >= 0):
-            px += inx
-            e -= dy
-          e += dx
-          py += iny
+        for i in range(0, 3 * n, 3):
+          self.vline(runs[i], runs[i + 1], runs[i + 2], aColor)
 
   def vline( self, x, y, aLen, aColor ) :
     start = (clamp(x, 0, self._size[0]), clamp(y, 0, self._size[1]))
@@ -269,50 +257,40 @@ class TFT(object) :
     self._setColor(aColor)
     self._draw(numPixels)
 
+  def _circlepoints( self, aRadius ) :
+    if len(self.circlePts) < aRadius + 1:
+      self.circlePts = array('i', bytearray(4 * (aRadius + 1)))
+    return accel.circle_points(self.circlePts, aRadius)
+
+  def _plot( self, x, y ) :
+    self._setwindowpoint(x, y)
+    self._writedata(self.colorData)
+
   def circle( self, x, y, aRadius, aColor ) :
     self.colorData[0] = aColor >> 8
     self.colorData[1] = aColor
-    xend = int(0.7071 * aRadius) + 1
-    rsq = aRadius * aRadius
-    for x in range(xend) :
-      y = int(sqrt(rsq - x * x))
-      xp = x + x
-      yp = y + y
-      xn = x - x
-      yn = y - y
-      xyp = x + y
-      yxp = y + x
-      xyn = x - y
-      yxn = y - x
-
-      self._setwindowpoint((xp, yp))
-      self._writedata(self.colorData)
-      self._setwindowpoint((xp, yn))
-      self._writedata(self.colorData)
-      self._setwindowpoint((xn, yp))
-      self._writedata(self.colorData)
-      self._setwindowpoint((xn, yn))
-      self._writedata(self.colorData)
-      self._setwindowpoint((xyp, yxp))
-      self._writedata(self.colorData)
-      self._setwindowpoint((xyp, yxn))
-      self._writedata(self.colorData)
-      self._setwindowpoint((xyn, yxp))
-      self._writedata(self.colorData)
-      self._setwindowpoint((xyn, yxn))
-      self._writedata(self.colorData)
+    n = self._circlepoints(aRadius)
+    pts = self.circlePts
+    for i in range(n) :
+      j = pts[i]
+      self._plot(x + i, y + j)
+      self._plot(x + i, y - j)
+      self._plot(x - i, y + j)
+      self._plot(x - i, y - j)
+      self._plot(x + j, y + i)
+      self._plot(x + j, y - i)
+      self._plot(x - j, y + i)
+      self._plot(x - j, y - i)
 
   def fillcircle( self, x, y, aRadius, aColor ) :
-    rsq = aRadius * aRadius
-    for x in range(aRadius) :
-      y = int(sqrt(rsq - x * x))
-      y0 = y - y
-      ey = y0 + y * 2
-      y0 = clamp(y0, 0, self._size[1])
-      ln = abs(ey - y0) + 1;
-
-      self.vline((x + x, y0), ln, aColor)
-      self.vline((x - x, y0), ln, aColor)
+    n = self._circlepoints(aRadius)
+    pts = self.circlePts
+    for i in range(n) :
+      j = pts[i]
+      self.vline(x + i, y - j, 2 * j + 1, aColor)
+      self.vline(x - i, y - j, 2 * j + 1, aColor)
+      self.vline(x + j, y - i, 2 * i + 1, aColor)
+      self.vline(x - j, y - i, 2 * i + 1, aColor)
 
   def fill( self, aColor = BLACK ) :
     self.fillrect((0, 0), self._size, aColor)
@@ -322,13 +300,8 @@ class TFT(object) :
     self._writedata(data)
 
   def setvscroll(self, tfa, bfa) :
-    self._writecommand(TFT.VSCRDEF)
-    data2 = bytearray([0, tfa])
-    self._writedata(data2)
-    data2[1] = 162 - tfa - bfa
-    self._writedata(data2)
-    data2[1] = bfa
-    self._writedata(data2)
+    data6 = bytearray([0, tfa, 0, 162 - tfa - bfa, 0, bfa])
+    self._command(TFT.VSCRDEF, data6)
     self.tfa = tfa
     self.bfa = bfa
 
@@ -338,10 +311,25 @@ class TFT(object) :
       a = 162 - self.bfa
     self._vscrolladdr(a)
 
+  def partial( self, aStart, aEnd ) :
+    # only scan GRAM rows aStart..aEnd, the rest of the panel is left blank;
+    # this also leaves vertical scroll mode
+    data4 = bytearray([aStart >> 8, aStart & 0xff, aEnd >> 8, aEnd & 0xff])
+    self._command(TFT.PTLAR, data4)
+    self._writecommand(TFT.PTLON)
+
+  def normal( self ) :
+    # leave partial and vertical scroll mode
+    self._writecommand(TFT.NORON)
+
+  def idle( self, aTF = True ) :
+    # idle mode drops to 8 colors and a lower frame rate to save power
+    self._writecommand(TFT.IDMON if aTF else TFT.IDMOFF)
+
   def _vscrolladdr(self, addr) :
-    self._writecommand(TFT.VSCSAD)
-    data2 = bytearray([addr >> 8, addr & 0xff])
-    self._writedata(data2)
+    self.scrollData[0] = addr >> 8
+    self.scrollData[1] = addr & 0xff
+    self._command(TFT.VSCSAD, self.scrollData)
     
   def _setColor( self, aColor ) :
     self.colorData[0] = aColor >> 8
@@ -350,62 +338,54 @@ class TFT(object) :
 
   def _draw( self, aPixels ) :
 
-    self.dc(1)
-    self.cs(0)
+    spi = self.device.begin()
     for i in range(aPixels//32):
-      self.spi.write(self.buf)
+      spi.write(self.buf)
     rest = (int(aPixels) % 32)
     if rest > 0:
-        buf2 = bytes(self.colorData) * rest
-        self.spi.write(buf2)
-    self.cs(1)
+        spi.write(memoryview(self.buf)[:2 * rest])
+    self.device.end()
 
   def _setwindowpoint( self, x, y ) :
     x = self._offset[0] + int(x)
     y = self._offset[1] + int(y)
-    self._writecommand(TFT.CASET)
     self.windowLocData[0] = self._offset[0]
     self.windowLocData[1] = x
     self.windowLocData[2] = self._offset[0]
     self.windowLocData[3] = x
-    self._writedata(self.windowLocData)
+    self._command(TFT.CASET, self.windowLocData)
 
-    self._writecommand(TFT.RASET)
     self.windowLocData[0] = self._offset[1]
     self.windowLocData[1] = y
     self.windowLocData[2] = self._offset[1]
     self.windowLocData[3] = y
-    self._writedata(self.windowLocData)
+    self._command(TFT.RASET, self.windowLocData)
     self._writecommand(TFT.RAMWR)
 
   def _setwindowloc( self, aPos0, aPos1 ) :
-    self._writecommand(TFT.CASET)
     self.windowLocData[0] = self._offset[0]
     self.windowLocData[1] = self._offset[0] + int(aPos0[0])
     self.windowLocData[2] = self._offset[0]
     self.windowLocData[3] = self._offset[0] + int(aPos1[0])
-    self._writedata(self.windowLocData)
+    self._command(TFT.CASET, self.windowLocData)
 
-    self._writecommand(TFT.RASET)
     self.windowLocData[0] = self._offset[1]
     self.windowLocData[1] = self._offset[1] + int(aPos0[1])
     self.windowLocData[2] = self._offset[1]
     self.windowLocData[3] = self._offset[1] + int(aPos1[1])
-    self._writedata(self.windowLocData)
+    self._command(TFT.RASET, self.windowLocData)
 
     self._writecommand(TFT.RAMWR)  
 
   def _writecommand( self, aCommand ) :
-    self.dc(0)
-    self.cs(0)
-    self.spi.write(bytearray([aCommand]))
-    self.cs(1)
+    self.device.command(aCommand)
 
   def _writedata( self, aData ) :
-    self.dc(1)
-    self.cs(0)
-    self.spi.write(aData)
-    self.cs(1)
+    self.device.write(aData)
+
+  def _command( self, aCommand, aData ) :
+    # command byte and its parameters under a single CS assertion
+    self.device.command(aCommand, aData)
 
   def _pushcolor( self, aColor ) :
     self.colorData[0] = aColor >> 8
@@ -413,9 +393,8 @@ class TFT(object) :
     self._writedata(self.colorData)
 
   def _setMADCTL( self ) :
-    self._writecommand(TFT.MADCTL)
     rgb = TFTRGB if self._rgb else TFTBGR
-    self._writedata(bytearray([TFTRotations[self.rotate] | rgb]))
+    self._command(TFT.MADCTL, bytearray([TFTRotations[self.rotate] | rgb]))
 
   def _reset( self ) :
     self.dc(0)
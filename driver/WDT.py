@@ -1,11 +1,15 @@
 from machine import WDT
 class protect:
+    """硬件看门狗，导入时不会启动，启动后交给Engine.watchdog()由帧循环喂狗"""
     wdt = None
-    def start():
-        protect.wdt = WDT(id=0, timeout=6000)
+    timeout = 6000
+    def start(timeout=6000):
+        protect.timeout = timeout
+        protect.wdt = WDT(id=0, timeout=timeout)
+        return protect.wdt
     def keep():
         if protect.wdt != None:
             protect.wdt.feed()
     def stop():
-        protect.wdt.stop()
-protect.start()
\ No newline at end of file
+        if protect.wdt != None:
+            protect.wdt.stop()
@@ -0,0 +1,261 @@
+# 绘图热点循环的内核函数
+# 这里是纯Python实现，在任何Python环境下都可以运行；
+# 在MicroPython上会自动替换为 driver.accel_viper 中的viper版本，
+# 纯Python版本始终以 *_py 的名字保留，用于对比测试。
+
+NATIVE = False  # 是否已启用viper内核
+
+
+def glyph_py(buf, data, fonth, color):
+    """将按列存储的字模展开为大端RGB565，buf按行存储，未点亮的像素写0"""
+    fontw = len(data)
+    hi = (color >> 8) & 0xFF
+    lo = color & 0xFF
+    for q in range(fontw):
+        c = data[q]
+        pos = q << 1
+        step = fontw << 1
+        for r in range(fonth):
+            if c & 0x01:
+                buf[pos] = hi
+                buf[pos + 1] = lo
+            else:
+                buf[pos] = 0
+                buf[pos + 1] = 0
+            pos += step
+            c >>= 1
+
+
+def line_runs_py(out, seg):
+    """Bresenham直线分解为沿主轴方向的线段，seg为array('i')[x0,y0,x1,y1]
+    out依次写入(起点x,起点y,长度)，返回线段数量。
+    |dx|>=|dy|时线段为水平方向，否则为竖直方向"""
+    x0, y0, x1, y1 = seg[0], seg[1], seg[2], seg[3]
+    dx = x1 - x0
+    dy = y1 - y0
+    sx = 1 if dx >= 0 else -1
+    sy = 1 if dy >= 0 else -1
+    dx = abs(dx)
+    dy = abs(dy)
+    n = 0
+    if dx >= dy:
+        e = (dy << 1) - dx
+        x, y, r = x0, y0, x0
+        while x != x1:
+            if e >= 0:
+                out[n] = r if sx > 0 else x
+                out[n + 1] = y
+                out[n + 2] = abs(x - r) + 1
+                n += 3
+                y += sy
+                e -= dx << 1
+                r = x + sx
+            e += dy << 1
+            x += sx
+        out[n] = r if sx > 0 else x
+        out[n + 1] = y
+        out[n + 2] = abs(x - r) + 1
+    else:
+        e = (dx << 1) - dy
+        x, y, r = x0, y0, y0
+        while y != y1:
+            if e >= 0:
+                out[n] = x
+                out[n + 1] = r if sy > 0 else y
+                out[n + 2] = abs(y - r) + 1
+                n += 3
+                x += sx
+                e -= dy << 1
+                r = y + sy
+            e += dx << 1
+            y += sy
+        out[n] = x
+        out[n + 1] = r if sy > 0 else y
+        out[n + 2] = abs(y - r) + 1
+    return n // 3 + 1
+
+
+def circle_points_py(out, r):
+    """中点画圆法计算第一个八分圆，out[x]为对应的y，返回点数"""
+    x, y, d = 0, r, 1 - r
+    while x <= y:
+        out[x] = y
+        if d < 0:
+            d += (x << 1) + 3
+        else:
+            d += ((x - y) << 1) + 5
+            y -= 1
+        x += 1
+    return x
+
+
+def expand_gs4_py(dst, src, pal, n):
+    """将n个GS4_HMSB像素按调色板展开为大端RGB565"""
+    j = 0
+    end = n << 1
+    for b in src:
+        k = (b >> 3) & 0x1E
+        dst[j] = pal[k]
+        dst[j + 1] = pal[k + 1]
+        j += 2
+        if j >= end:
+            break
+        k = (b & 0x0F) << 1
+        dst[j] = pal[k]
+        dst[j + 1] = pal[k + 1]
+        j += 2
+        if j >= end:
+            break
+
+
+def expand_gs8_py(dst, src, pal, n):
+    """将n个GS8像素按调色板展开为大端RGB565"""
+    j = 0
+    for i in range(n):
+        k = src[i] << 1
+        dst[j] = pal[k]
+        dst[j + 1] = pal[k + 1]
+        j += 2
+
+
+def rgb888_to_565_py(dst, src, n, bgr):
+    """将n个RGB888像素转换为大端RGB565"""
+    j = 0
+    for i in range(0, 3 * n, 3):
+        if bgr:
+            r, g, b = src[i + 2], src[i + 1], src[i]
+        else:
+            r, g, b = src[i], src[i + 1], src[i + 2]
+        c = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+        dst[j] = c >> 8
+        dst[j + 1] = c & 0xFF
+        j += 2
+
+
+def diff_span_py(a, b, start, end):
+    """比较a和b在[start, end)内的字节，相同返回-1，否则返回(首个不同位置<<16)|最后一个不同位置"""
+    if a[start:end] == b[start:end]:
+        return -1
+    i = start
+    while a[i] == b[i]:
+        i += 1
+    j = end - 1
+    while a[j] == b[j]:
+        j -= 1
+    return (i << 16) | j
+
+
+def rle_encode_py(dst, src, n, unit):
+    """将src的前n字节按unit字节为单位进行游程编码，写入dst并返回长度
+    控制字节c<128时后面跟c+1个原样的单位，c>=128时后面的一个单位重复c-126次
+    最坏情况下输出比输入长三分之一，dst至少需要 n * 3 // 2 + 2 字节"""
+    i = 0
+    j = 0
+    lit = 0     # 尚未写入的原样单位数
+    ls = 0      # 原样单位的起点
+    while True:
+        run = 0
+        if i < n:
+            run = 1
+            k = i + unit
+            while k < n and run < 129:
+                t = 0
+                while t < unit and src[k + t] == src[i + t]:
+                    t += 1
+                if t < unit:
+                    break
+                run += 1
+                k += unit
+        if lit > 0 and (i >= n or run >= 2 or lit == 128):
+            dst[j] = lit - 1
+            j += 1
+            m = lit * unit
+            dst[j:j + m] = src[ls:ls + m]
+            j += m
+            lit = 0
+        if i >= n:
+            return j
+        if run >= 2:
+            dst[j] = run + 126
+            j += 1
+            dst[j:j + unit] = src[i:i + unit]
+            j += unit
+            i += run * unit
+        else:
+            if lit == 0:
+                ls = i
+            lit += 1
+            i += unit
+
+
+def fill_pattern_py(buf, start, n, pat, po, col, mask):
+    """MONO_VLSB的一页中，从start开始的n列按mask的位写入图案pat[po + ((col + i) & 7)]"""
+    keep = ~mask & 0xFF
+    for i in range(n):
+        j = start + i
+        buf[j] = (buf[j] & keep) | (pat[po + ((col + i) & 7)] & mask)
+
+
+def ordered_row_py(dst, src, so, w, y, thresh):
+    """有序抖动一行：src[so:so+w]为0-255的灰度，与阈值表thresh第y&7行比较后写入MONO_VLSB的dst第y行"""
+    base = (y >> 3) * w
+    bit = 1 << (y & 7)
+    keep = ~bit & 0xFF
+    t = (y & 7) << 3
+    for x in range(w):
+        if src[so + x] > thresh[t + (x & 7)]:
+            dst[base + x] |= bit
+        else:
+            dst[base + x] &= keep
+
+
+def diffuse_row_py(dst, src, so, err, w, y):
+    """Sierra Lite误差扩散一行：src[so:so+w]为0-255的灰度，结果写入MONO_VLSB的dst第y行
+    err为w+1个元素的array('i')，err[x+1]为上一行传给x的误差，处理后变为传给下一行的误差"""
+    base = (y >> 3) * w
+    bit = 1 << (y & 7)
+    keep = ~bit & 0xFF
+    carry = 0
+    err[0] = 0
+    for x in range(w):
+        v = src[so + x] + err[x + 1] + carry
+        if v >= 128:
+            dst[base + x] |= bit
+            e = v - 255
+        else:
+            dst[base + x] &= keep
+            e = v
+        carry = e >> 1
+        err[x] += e >> 2
+        err[x + 1] = e >> 2
+
+
+glyph = glyph_py
+line_runs = line_runs_py
+circle_points = circle_points_py
+expand_gs4 = expand_gs4_py
+expand_gs8 = expand_gs8_py
+rgb888_to_565 = rgb888_to_565_py
+diff_span = diff_span_py
+rle_encode = rle_encode_py
+fill_pattern = fill_pattern_py
+ordered_row = ordered_row_py
+diffuse_row = diffuse_row_py
+
+try:
+    # 仅在支持viper的MicroPython上可以导入成功
+    from driver import accel_viper as _viper
+    glyph = _viper.glyph
+    line_runs = _viper.line_runs
+    circle_points = _viper.circle_points
+    expand_gs4 = _viper.expand_gs4
+    expand_gs8 = _viper.expand_gs8
+    rgb888_to_565 = _viper.rgb888_to_565
+    diff_span = _viper.diff_span
+    rle_encode = _viper.rle_encode
+    fill_pattern = _viper.fill_pattern
+    ordered_row = _viper.ordered_row
+    diffuse_row = _viper.diffuse_row
+    NATIVE = True
+except Exception:
+    pass
@@ -0,0 +1,299 @@
+# driver.accel 的viper实现，只能在MicroPython上导入
+# 函数签名和行为与 driver.accel 中的纯Python版本保持一致
+
+import micropython
+
+
+@micropython.viper
+def glyph(buf, data, fonth: int, color: int):
+    d = ptr8(buf)
+    s = ptr8(data)
+    fontw = int(len(data))
+    hi = (color >> 8) & 0xFF
+    lo = color & 0xFF
+    step = fontw << 1
+    q = 0
+    while q < fontw:
+        c = s[q]
+        pos = q << 1
+        r = 0
+        while r < fonth:
+            if c & 1:
+                d[pos] = hi
+                d[pos + 1] = lo
+            else:
+                d[pos] = 0
+                d[pos + 1] = 0
+            pos += step
+            c >>= 1
+            r += 1
+        q += 1
+
+
+@micropython.viper
+def line_runs(out, seg) -> int:
+    o = ptr32(out)
+    p = ptr32(seg)
+    x0 = p[0]
+    y0 = p[1]
+    x1 = p[2]
+    y1 = p[3]
+    dx = x1 - x0
+    dy = y1 - y0
+    sx = 1
+    sy = 1
+    if dx < 0:
+        sx = -1
+        dx = 0 - dx
+    if dy < 0:
+        sy = -1
+        dy = 0 - dy
+    n = 0
+    if dx >= dy:
+        e = (dy << 1) - dx
+        x = x0
+        y = y0
+        r = x0
+        while x != x1:
+            if e >= 0:
+                if sx > 0:
+                    o[n] = r
+                    o[n + 2] = x - r + 1
+                else:
+                    o[n] = x
+                    o[n + 2] = r - x + 1
+                o[n + 1] = y
+                n += 3
+                y += sy
+                e -= dx << 1
+                r = x + sx
+            e += dy << 1
+            x += sx
+        if sx > 0:
+            o[n] = r
+            o[n + 2] = x - r + 1
+        else:
+            o[n] = x
+            o[n + 2] = r - x + 1
+        o[n + 1] = y
+    else:
+        e = (dx << 1) - dy
+        x = x0
+        y = y0
+        r = y0
+        while y != y1:
+            if e >= 0:
+                if sy > 0:
+                    o[n + 1] = r
+                    o[n + 2] = y - r + 1
+                else:
+                    o[n + 1] = y
+                    o[n + 2] = r - y + 1
+                o[n] = x
+                n += 3
+                x += sx
+                e -= dy << 1
+                r = y + sy
+            e += dx << 1
+            y += sy
+        if sy > 0:
+            o[n + 1] = r
+            o[n + 2] = y - r + 1
+        else:
+            o[n + 1] = y
+            o[n + 2] = r - y + 1
+        o[n] = x
+    return n // 3 + 1
+
+
+@micropython.viper
+def circle_points(out, r: int) -> int:
+    o = ptr32(out)
+    x = 0
+    y = r
+    d = 1 - r
+    while x <= y:
+        o[x] = y
+        if d < 0:
+            d += (x << 1) + 3
+        else:
+            d += ((x - y) << 1) + 5
+            y -= 1
+        x += 1
+    return x
+
+
+@micropython.viper
+def expand_gs4(dst, src, pal, n: int):
+    d = ptr8(dst)
+    s = ptr8(src)
+    p = ptr8(pal)
+    end = n << 1
+    i = 0
+    j = 0
+    while j < end:
+        b = s[i]
+        k = (b >> 3) & 0x1E
+        d[j] = p[k]
+        d[j + 1] = p[k + 1]
+        j += 2
+        if j < end:
+            k = (b & 0x0F) << 1
+            d[j] = p[k]
+            d[j + 1] = p[k + 1]
+            j += 2
+        i += 1
+
+
+@micropython.viper
+def expand_gs8(dst, src, pal, n: int):
+    d = ptr8(dst)
+    s = ptr8(src)
+    p = ptr8(pal)
+    i = 0
+    while i < n:
+        k = s[i] << 1
+        d[i << 1] = p[k]
+        d[(i << 1) + 1] = p[k + 1]
+        i += 1
+
+
+@micropython.viper
+def rgb888_to_565(dst, src, n: int, bgr: int):
+    d = ptr8(dst)
+    s = ptr8(src)
+    end = n * 3
+    i = 0
+    j = 0
+    while i < end:
+        if bgr:
+            r = s[i + 2]
+            b = s[i]
+        else:
+            r = s[i]
+            b = s[i + 2]
+        g = s[i + 1]
+        c = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+        d[j] = c >> 8
+        d[j + 1] = c & 0xFF
+        i += 3
+        j += 2
+
+
+@micropython.viper
+def diff_span(a, b, start: int, end: int) -> int:
+    pa = ptr8(a)
+    pb = ptr8(b)
+    i = start
+    while i < end and pa[i] == pb[i]:
+        i += 1
+    if i == end:
+        return -1
+    j = end - 1
+    while pa[j] == pb[j]:
+        j -= 1
+    return (i << 16) | j
+
+
+@micropython.viper
+def rle_encode(dst, src, n: int, unit: int) -> int:
+    d = ptr8(dst)
+    s = ptr8(src)
+    i = 0
+    j = 0
+    lit = 0
+    ls = 0
+    while True:
+        run = 0
+        if i < n:
+            run = 1
+            k = i + unit
+            while k < n and run < 129:
+                t = 0
+                while t < unit and s[k + t] == s[i + t]:
+                    t += 1
+                if t < unit:
+                    break
+                run += 1
+                k += unit
+        if lit > 0 and (i >= n or run >= 2 or lit == 128):
+            d[j] = lit - 1
+            j += 1
+            m = lit * unit
+            t = 0
+            while t < m:
+                d[j] = s[ls + t]
+                j += 1
+                t += 1
+            lit = 0
+        if i >= n:
+            return j
+        if run >= 2:
+            d[j] = run + 126
+            j += 1
+            t = 0
+            while t < unit:
+                d[j] = s[i + t]
+                j += 1
+                t += 1
+            i += run * unit
+        else:
+            if lit == 0:
+                ls = i
+            lit += 1
+            i += unit
+
+
+@micropython.viper
+def fill_pattern(buf, start: int, n: int, pat, po: int, col: int, mask: int):
+    b = ptr8(buf)
+    p = ptr8(pat)
+    keep = (mask ^ 0xFF) & 0xFF
+    i = 0
+    while i < n:
+        j = start + i
+        b[j] = (b[j] & keep) | (p[po + ((col + i) & 7)] & mask)
+        i += 1
+
+
+@micropython.viper
+def ordered_row(dst, src, so: int, w: int, y: int, thresh):
+    d = ptr8(dst)
+    s = ptr8(src)
+    th = ptr8(thresh)
+    base = (y >> 3) * w
+    bit = 1 << (y & 7)
+    keep = (bit ^ 0xFF) & 0xFF
+    t = (y & 7) << 3
+    x = 0
+    while x < w:
+        if s[so + x] > th[t + (x & 7)]:
+            d[base + x] = d[base + x] | bit
+        else:
+            d[base + x] = d[base + x] & keep
+        x += 1
+
+
+@micropython.viper
+def diffuse_row(dst, src, so: int, err, w: int, y: int):
+    d = ptr8(dst)
+    s = ptr8(src)
+    e32 = ptr32(err)
+    base = (y >> 3) * w
+    bit = 1 << (y & 7)
+    keep = (bit ^ 0xFF) & 0xFF
+    carry = 0
+    e32[0] = 0
+    x = 0
+    while x < w:
+        v = s[so + x] + e32[x + 1] + carry
+        if v >= 128:
+            d[base + x] = d[base + x] | bit
+            e = v - 255
+        else:
+            d[base + x] = d[base + x] & keep
+            e = v
+        carry = e >> 1
+        e32[x] = e32[x] + (e >> 2)
+        e32[x + 1] = e >> 2
+        x += 1
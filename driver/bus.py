@@ -0,0 +1,74 @@
+# 共享SPI总线管理
+# 多个设备共用一条SPI总线时，只有在切换到配置不同的设备时才重新配置总线，
+# 命令字节使用预分配的缓冲区，命令和参数可以在一次片选内发送。
+
+
+class SPIBus:
+    """共享SPI总线，记录总线当前的配置"""
+
+    def __init__(self, spi):
+        self.spi = spi
+        self.config = None  # 当前配置 (baudrate, polarity, phase)
+
+    def acquire(self, device):
+        """切换到device的配置，配置相同时不做任何操作"""
+        config = device.config
+        if config is not None and config != self.config:
+            self.spi.init(baudrate=config[0], polarity=config[1], phase=config[2])
+            self.config = config
+
+
+class SPIDevice:
+    """共享总线上的一个设备，baudrate为None时沿用总线当前的配置"""
+
+    def __init__(self, bus, cs, dc=None, baudrate=None, polarity=0, phase=0):
+        if not isinstance(bus, SPIBus):
+            bus = SPIBus(bus)
+        self.bus = bus
+        self.spi = bus.spi
+        self.cs = cs
+        self.dc = dc
+        self.config = None if baudrate is None else (baudrate, polarity, phase)
+        self._cmd = bytearray(1)
+
+    def begin(self, dc=1):
+        """开始一次事务并返回SPI对象，可以连续多次写入，最后调用end()"""
+        self.bus.acquire(self)
+        if self.dc is not None:
+            self.dc(dc)
+        self.cs(0)
+        return self.spi
+
+    def end(self):
+        self.cs(1)
+
+    def command(self, cmd: int, data=None):
+        """在一次片选内发送一个命令字节和它的参数"""
+        self.bus.acquire(self)
+        self.cs(1)
+        self.dc(0)
+        self.cs(0)
+        self._cmd[0] = cmd
+        self.spi.write(self._cmd)
+        if data is not None:
+            self.dc(1)
+            self.spi.write(data)
+        self.cs(1)
+
+    def commands(self, buf):
+        """在一次片选内发送多个命令字节"""
+        self.bus.acquire(self)
+        self.cs(1)
+        self.dc(0)
+        self.cs(0)
+        self.spi.write(buf)
+        self.cs(1)
+
+    def write(self, buf):
+        """在一次片选内发送数据"""
+        self.bus.acquire(self)
+        self.cs(1)
+        self.dc(1)
+        self.cs(0)
+        self.spi.write(buf)
+        self.cs(1)
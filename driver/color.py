@@ -0,0 +1,72 @@
+# RGB565 颜色工具
+# framebuf.RGB565 以小端序写入缓冲区，而 ST7735 等屏幕通过SPI接收大端序数据，
+# 因此写入 FrameBuffer 的颜色需要预先交换高低字节，这样缓冲区在刷新时无需任何转换即可直接发送。
+
+from micropython import const
+from driver import accel
+
+BIG_ENDIAN = const(0)       # 直接写屏，如 ST7735.TFT 的绘图方法
+LITTLE_ENDIAN = const(1)    # 写入 framebuf.RGB565 缓冲区
+
+COLORS = (
+    ("BLACK", 0x00, 0x00, 0x00),
+    ("WHITE", 0xFF, 0xFF, 0xFF),
+    ("RED", 0xFF, 0x00, 0x00),
+    ("GREEN", 0x00, 0xFF, 0x00),
+    ("BLUE", 0x00, 0x00, 0xFF),
+    ("YELLOW", 0xFF, 0xFF, 0x00),
+    ("CYAN", 0x00, 0xFF, 0xFF),
+    ("PURPLE", 0xFF, 0x00, 0xFF),
+    ("GRAY", 0x80, 0x80, 0x80),
+    ("DARKGRAY", 0x40, 0x40, 0x40),
+    ("MAROON", 0x80, 0x00, 0x00),
+    ("FOREST", 0x00, 0x80, 0x00),
+    ("NAVY", 0x00, 0x00, 0x80),
+    ("OLIVE", 0x80, 0x80, 0x00),
+    ("TEAL", 0x00, 0x80, 0x80),
+    ("VIOLET", 0x80, 0x00, 0x80),
+)
+
+
+def rgb565(r, g, b):
+    """将0-255的R,G,B转换为RGB565数值"""
+    return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+
+
+def swap16(color):
+    """交换16位颜色的高低字节"""
+    return ((color & 0xFF) << 8) | (color >> 8)
+
+
+class ColorFormat:
+    """按照目标字节序和屏幕颜色顺序生成颜色，常用颜色在创建时预先计算"""
+
+    def __init__(self, byte_order=LITTLE_ENDIAN, bgr=False):
+        self.byte_order = byte_order
+        self.bgr = bgr
+        for name, r, g, b in COLORS:
+            setattr(self, name, self.rgb(r, g, b))
+
+    def rgb(self, r, g, b):
+        """返回可以直接写入目标的颜色值"""
+        if self.bgr:
+            r, b = b, r
+        color = rgb565(r, g, b)
+        if self.byte_order == LITTLE_ENDIAN:
+            return swap16(color)
+        return color
+
+    def convert(self, data, out=None):
+        """将RGB888字节流批量转换为目标字节序的RGB565字节流，用于图片等资源"""
+        n = len(data) // 3
+        if out is None:
+            out = bytearray(2 * n)
+        # 输出字节始终是屏幕需要的顺序，写入缓冲区后直接发送
+        accel.rgb888_to_565(out, data, n, 1 if self.bgr else 0)
+        return out
+
+
+# 写入 framebuf.RGB565 缓冲区使用的颜色
+FRAMEBUF = ColorFormat(LITTLE_ENDIAN)
+# 直接写屏使用的颜色
+PANEL = ColorFormat(BIG_ENDIAN)
@@ -0,0 +1,113 @@
+# 单色屏幕的抖动
+# SSD1306等单色屏只能显示0和1，灰度通过Bayer有序抖动或误差扩散表现。
+# 有序抖动的图案在导入时预先计算为MONO_VLSB的列字节（每级8字节），填充时只需要查表；
+# 图片的转换在主机上（CPython）或加载资源时执行一次，结果可以直接作为MONO_VLSB的FrameBuffer使用。
+
+from array import array
+from micropython import const
+from driver import accel
+
+GRAY = const(0x100)     # 灰度颜色的标记，gray()生成的颜色为 GRAY | 亮度
+LEVELS = const(64)      # 有序抖动的灰度级数（不含全黑）
+
+# 8x8 Bayer矩阵，值为0-63
+BAYER8 = bytes((
+    0, 32, 8, 40, 2, 34, 10, 42,
+    48, 16, 56, 24, 50, 18, 58, 26,
+    12, 44, 4, 36, 14, 46, 6, 38,
+    60, 28, 52, 20, 62, 30, 54, 22,
+    3, 35, 11, 43, 1, 33, 9, 41,
+    51, 19, 59, 27, 49, 17, 57, 25,
+    15, 47, 7, 39, 13, 45, 5, 37,
+    63, 31, 55, 23, 61, 29, 53, 21,
+))
+
+# 0-255灰度的阈值表，用于图片的有序抖动
+THRESH = bytes(b * 4 + 2 for b in BAYER8)
+
+
+def _patterns(invert):
+    # 每一级8字节，第x字节为第x&7列的8个像素，bit y点亮表示该像素的阈值小于该级
+    table = bytearray((LEVELS + 1) * 8)
+    for level in range(LEVELS + 1):
+        for x in range(8):
+            byte = 0
+            for y in range(8):
+                b = BAYER8[y * 8 + x]
+                if (63 - b if invert else b) < level:
+                    byte |= 1 << y
+            table[level * 8 + x] = byte
+    return table
+
+
+# PATTERNS[0]为正常的图案，PATTERNS[1]的阈值反向，时间抖动时两者交替，
+# 每个像素在两帧中点亮的次数尽量平均，50%灰度时每个像素隔帧点亮
+PATTERNS = (_patterns(False), _patterns(True))
+
+
+def gray(level):
+    """返回亮度为level(0-255)的灰度颜色，用于DitherRenderer"""
+    return GRAY | (level & 0xFF)
+
+
+def luma(r, g, b):
+    """0-255的R,G,B转换为亮度"""
+    return (r * 77 + g * 150 + b * 29) >> 8
+
+
+def rgb(r, g, b):
+    """单色屏幕的颜色转换，中间的亮度转换为灰度颜色，可以传给AyUI.use_theme()"""
+    level = luma(r, g, b)
+    if level < 8:
+        return 0
+    if level > 247:
+        return 1
+    return gray(level)
+
+
+def level(color):
+    """灰度颜色对应的图案级数0-64"""
+    return ((color & 0xFF) * LEVELS + 127) // 255
+
+
+def fill(buf, width, height, x, y, w, h, color, phase=0):
+    """在MONO_VLSB的buf中用有序抖动的图案填充矩形，color为gray()生成的颜色"""
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, width), min(y + h, height)
+    if x1 <= x0 or y1 <= y0:
+        return
+    pat = PATTERNS[phase]
+    po = level(color) * 8
+    for page in range(y0 >> 3, ((y1 - 1) >> 3) + 1):
+        top = page << 3
+        mask = 0xFF
+        if y0 > top:
+            mask &= (0xFF << (y0 - top)) & 0xFF
+        if y1 < top + 8:
+            mask &= 0xFF >> (top + 8 - y1)
+        accel.fill_pattern(buf, page * width + x0, x1 - x0, pat, po, x0, mask)
+
+
+def bit(x, y, color, phase=0):
+    """灰度颜色在(x, y)处的抖动结果0或1"""
+    return (PATTERNS[phase][level(color) * 8 + (x & 7)] >> (y & 7)) & 1
+
+
+def ordered(src, w, h, dst=None):
+    """将w*h字节的灰度图按Bayer有序抖动转换为MONO_VLSB，返回dst"""
+    if dst is None:
+        dst = bytearray(w * ((h + 7) // 8))
+    for y in range(h):
+        accel.ordered_row(dst, src, y * w, w, y, THRESH)
+    return dst
+
+
+def diffuse(src, w, h, dst=None):
+    """将w*h字节的灰度图按Sierra Lite误差扩散转换为MONO_VLSB，返回dst
+    比有序抖动细腻，适合照片等图片资源"""
+    if dst is None:
+        dst = bytearray(w * ((h + 7) // 8))
+    err = array('i', bytes(4 * (w + 1)))
+    for y in range(h):
+        accel.diffuse_row(dst, src, y * w, err, w, y)
+    return dst
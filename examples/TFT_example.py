@@ -1,8 +1,9 @@
 from driver.ST7735 import TFT
+from driver.color import PANEL
 from machine import Pin,SPI
 
-def TFTColor(r,g,b) :
-  return ((b & 0xF8) << 8) | ((g & 0xFC) << 3) | (r >> 3)
+# 直接写屏使用大端序颜色，若红蓝颠倒请改用 tft.rgb(False)
+TFTColor = PANEL.rgb
 
 spi = SPI(1, baudrate=20000000, polarity=0, phase=0, sck=Pin(2), mosi=Pin(3), miso=Pin(10))
 
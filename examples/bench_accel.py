@@ -0,0 +1,38 @@
+# 对比 driver.accel 中纯Python内核与viper内核的耗时，在开发板上运行
+import time
+from array import array
+from driver import accel, dither
+
+ROUNDS = 20
+
+
+def bench(name, fn, *args):
+    start = time.ticks_us()
+    for i in range(ROUNDS):
+        fn(*args)
+    return time.ticks_diff(time.ticks_us(), start) // ROUNDS
+
+
+def compare(name, *args):
+    py = bench(name, getattr(accel, name + "_py"), *args)
+    fast = bench(name, getattr(accel, name), *args)
+    print("%-14s py: %6d us  accel: %6d us  x%.1f" %
+          (name, py, fast, py / fast if fast else 0))
+
+
+print("viper kernels:", "enabled" if accel.NATIVE else "unavailable")
+
+palette = bytearray(512)
+line = bytearray(160 * 2)
+compare("expand_gs4", line, bytearray(80), palette, 160)
+compare("expand_gs8", line, bytearray(160), palette, 160)
+compare("glyph", bytearray(2 * 8 * 5), b"\x3e\x51\x49\x45\x3e", 8, 0xF800)
+compare("line_runs", array('i', bytearray(4 * 3 * 81)),
+        array('i', [0, 0, 159, 79]))
+compare("circle_points", array('i', bytearray(4 * 41)), 40)
+compare("diff_span", bytearray(1024), bytearray(1024), 0, 1024)
+compare("rgb888_to_565", bytearray(2 * 160), bytearray(3 * 160), 160, 0)
+compare("rle_encode", bytearray(512 * 3 // 2 + 2), bytearray(512), 512, 2)
+compare("fill_pattern", bytearray(128), 0, 128, dither.PATTERNS[0], 256, 0, 0xFF)
+compare("ordered_row", bytearray(128 * 8), bytearray(128), 0, 128, 0, dither.THRESH)
+compare("diffuse_row", bytearray(128 * 8), bytearray(128), 0, array('i', bytearray(4 * 129)), 128, 0)
@@ -0,0 +1,107 @@
+# 测量每个组件占用的堆内存，对比旧的字典+元组表示和紧凑表示，在开发板上运行
+# MicroPython忽略__slots__，紧凑表示节省的内存来自共享的样式和盒模型数组
+import gc
+import framebuf
+from AyUI import BasicView, Pixel, Drawable
+from AyUI.core.event import Event
+from AyUI.core.render import FrameBufferRenderer
+
+COUNT = 100
+
+
+class LegacyPixel(Drawable):
+    """旧的表示：盒模型以元组保存在实例字典中，绘制时复制为列表"""
+
+    def __init__(self, color, axis=(0, 0), margin=(0, 0, 0, 0),
+                 padding=(0, 0, 0, 0), border=0, border_color=1):
+        self.axis = axis
+        self.margin = margin
+        self.padding = padding
+        self.border = border
+        self.border_color = border_color
+        self.color = color
+
+    def draw(self, framebuf, axis):
+        ele_axis = [axis[0]+self.margin[0], axis[1]+self.margin[1]]
+        for b in range(self.border):
+            framebuf.rect(ele_axis[0]+b, ele_axis[1]+b,
+                          1+self.padding[0]+self.padding[2]+2*(self.border-b),
+                          1+self.padding[1]+self.padding[3]+2*(self.border-b), self.border_color)
+        ele_axis = [
+            ele_axis[0]+self.border+self.padding[0],
+            ele_axis[1]+self.border+self.padding[1]
+        ]
+        framebuf.pixel(ele_axis[0], ele_axis[1], self.color)
+
+
+class LegacyView:
+    """旧的BasicView表示"""
+
+    def __init__(self, *elements, space=(0, 0), margin=(0, 0, 0, 0),
+                 padding=(0, 0, 0, 0), border=0, border_color=1):
+        self.elements = list(elements)
+        self.space = space
+        self.margin = margin
+        self.padding = padding
+        self.border = border
+        self.border_color = border_color
+        self.spaces = []
+
+    def draw(self, framebuf, axis=(0, 0)):
+        ele_axis = [axis[0]+self.margin[0], axis[1]+self.margin[1]]
+        for b in range(self.border):
+            framebuf.rect(ele_axis[0]+b, ele_axis[1]+b,
+                          self.space[0]+2*(self.border-b),
+                          self.space[1]+2*(self.border-b), self.border_color)
+        ele_axis = [
+            ele_axis[0]+self.border+self.padding[0],
+            ele_axis[1]+self.border+self.padding[1]
+        ]
+        ele_axis = tuple(ele_axis)
+        for ele in self.elements:
+            ele.draw(framebuf, ele_axis)
+
+
+class LegacyEvent:
+    def __init__(self, event, payload=None):
+        self.event = event
+        self.payload = payload
+
+
+def per_item(make):
+    items = []
+    gc.collect()
+    before = gc.mem_alloc()
+    for i in range(COUNT):
+        items.append(make(i))
+    gc.collect()
+    used = gc.mem_alloc() - before
+    return used // COUNT, items
+
+
+def per_draw(items):
+    fb = FrameBufferRenderer(framebuf.FrameBuffer(bytearray(128 * 64 // 8), 128, 64, framebuf.MONO_VLSB), 128, 64)
+    gc.collect()
+    gc.disable()
+    before = gc.mem_alloc()
+    for item in items:
+        item.draw(fb, (1, 1))
+    used = gc.mem_alloc() - before
+    gc.enable()
+    return used // COUNT
+
+
+def compare(name, legacy, compact, draw=True):
+    old, old_items = per_item(legacy)
+    new, new_items = per_item(compact)
+    print("%-10s heap/widget legacy: %4d B  compact: %4d B" % (name, old, new))
+    if draw:
+        print("%-10s heap/draw   legacy: %4d B  compact: %4d B" %
+              (name, per_draw(old_items), per_draw(new_items)))
+
+
+STYLE = dict(margin=(2, 2, 2, 2), padding=(1, 1, 1, 1), border=1)
+compare("Pixel", lambda i: LegacyPixel(1, **STYLE), lambda i: Pixel(1, **STYLE))
+compare("Event", lambda i: LegacyEvent("click", i), lambda i: Event("click", i), draw=False)
+compare("BasicView", lambda i: LegacyView(space=(4, 4), **STYLE),
+        lambda i: BasicView(space=(4, 4), **STYLE))
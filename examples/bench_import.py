@@ -0,0 +1,24 @@
+# 测量冷启动时导入AyUI的耗时和内存占用，应在复位后第一个运行
+import gc
+import sys
+import time
+
+gc.collect()
+free_before = gc.mem_free()
+start = time.ticks_ms()
+
+import AyUI
+
+import_ms = time.ticks_diff(time.ticks_ms(), start)
+gc.collect()
+free_after = gc.mem_free()
+print("import AyUI: %d ms, heap %d bytes" % (import_ms, free_before - free_after))
+# 动画、输入、后台任务、垃圾回收调度、视图缓存等在第一次使用时才导入
+print("modules:", " ".join(sorted(m for m in sys.modules if m.startswith("AyUI"))))
+
+start = time.ticks_ms()
+from AyUI import BasicView, Memtest
+lazy_ms = time.ticks_diff(time.ticks_ms(), start)
+gc.collect()
+print("views/widgets on first use: %d ms, heap %d bytes" %
+      (lazy_ms, free_after - gc.mem_free()))
@@ -0,0 +1,8 @@
+# 冻结清单，将 AyUI 和 driver 编译进固件:
+#     make BOARD=<board> FROZEN_MANIFEST=/path/to/manifest.py
+# 冻结的模块直接从Flash中执行，导入时不占用编译时间和堆内存
+
+include("$(PORT_DIR)/boards/manifest.py")
+
+package("AyUI")
+package("driver")
@@ -0,0 +1,28 @@
+"""在CPython上用pytest运行测试：缺少MicroPython的模块时使用tests/shims中的替代实现，
+并为time和gc补上MicroPython特有的函数。开发板和unix port上可以直接运行各个测试文件"""
+import gc
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+for _name in ("micropython", "framebuf", "uasyncio"):
+    try:
+        __import__(_name)
+    except ImportError:
+        sys.path.append(os.path.join(ROOT, "tests", "shims"))
+        break
+
+if not hasattr(time, "ticks_ms"):
+    time.ticks_ms = lambda: int(time.monotonic() * 1000)
+    time.ticks_us = lambda: int(time.monotonic() * 1000000)
+    time.ticks_diff = lambda a, b: a - b
+    time.ticks_add = lambda a, b: a + b
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+
+if not hasattr(gc, "mem_free"):
+    gc.mem_free = lambda: 1 << 20
+    gc.mem_alloc = lambda: 0
+    gc.threshold = lambda *args: None
@@ -0,0 +1,55 @@
+"""主机测试用的模拟引脚和时钟，不随AyUI部署到开发板"""
+from micropython import const
+
+
+class MockPin:
+    """用于主机测试的模拟引脚，通过set()改变电平并触发中断"""
+    IRQ_FALLING = const(1)
+    IRQ_RISING = const(2)
+
+    def __init__(self, value=1):
+        self._value = value
+        self._handler = None
+        self._trigger = 0
+
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        self.set(value)
+
+    def __call__(self, value=None):
+        return self.value(value)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING):
+        self._handler = handler
+        self._trigger = trigger
+
+    def set(self, value):
+        value = 1 if value else 0
+        if value == self._value:
+            return
+        self._value = value
+        edge = MockPin.IRQ_RISING if value else MockPin.IRQ_FALLING
+        if self._handler is not None and self._trigger & edge:
+            self._handler(self)
+
+
+class MockClock:
+    """用于主机测试的时钟，配合MockPin按脚本时间线驱动输入"""
+
+    def __init__(self, now=0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def play(self, inputs, timeline, until: int, step=1):
+        """timeline为[(时间, 引脚, 电平), ...]，按step毫秒推进时间并轮询，直到until"""
+        timeline = sorted(timeline, key=lambda e: e[0])
+        i = 0
+        while self.now <= until:
+            while i < len(timeline) and timeline[i][0] <= self.now:
+                timeline[i][1].set(timeline[i][2])
+                i += 1
+            inputs.poll(self.now)
+            self.now += step
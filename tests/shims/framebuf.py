@@ -0,0 +1,114 @@
+"""CPython下运行测试用的framebuf，逐像素实现，只用于检查绘制结果
+支持MONO_VLSB、RGB565（小端）、GS8和GS4_HMSB；text()将每个字符画为6x6的方块"""
+
+MONO_VLSB = 0
+RGB565 = 1
+GS4_HMSB = 2
+MONO_HLSB = 3
+MONO_HMSB = 4
+GS2_HMSB = 5
+GS8 = 6
+
+
+class FrameBuffer:
+
+    def __init__(self, buf, width, height, fmt, stride=None):
+        assert fmt in (MONO_VLSB, RGB565, GS8, GS4_HMSB), "format not supported by the test shim"
+        self._buf = buf
+        self._w = width
+        self._h = height
+        self._fmt = fmt
+        self._stride = stride or width
+
+    def _set(self, x, y, c):
+        if not (0 <= x < self._w and 0 <= y < self._h):
+            return
+        b = self._buf
+        if self._fmt == MONO_VLSB:
+            i = (y >> 3) * self._stride + x
+            bit = 1 << (y & 7)
+            b[i] = (b[i] | bit) if c else (b[i] & ~bit & 0xFF)
+        elif self._fmt == RGB565:
+            i = 2 * (y * self._stride + x)
+            b[i] = c & 0xFF
+            b[i + 1] = (c >> 8) & 0xFF
+        elif self._fmt == GS8:
+            b[y * self._stride + x] = c & 0xFF
+        else:
+            i = (y * self._stride + x) >> 1
+            if x & 1:
+                b[i] = (b[i] & 0xF0) | (c & 0x0F)
+            else:
+                b[i] = (b[i] & 0x0F) | ((c & 0x0F) << 4)
+
+    def _get(self, x, y):
+        b = self._buf
+        if self._fmt == MONO_VLSB:
+            return (b[(y >> 3) * self._stride + x] >> (y & 7)) & 1
+        if self._fmt == RGB565:
+            i = 2 * (y * self._stride + x)
+            return b[i] | (b[i + 1] << 8)
+        if self._fmt == GS8:
+            return b[y * self._stride + x]
+        v = b[(y * self._stride + x) >> 1]
+        return v & 0x0F if x & 1 else v >> 4
+
+    def pixel(self, x, y, c=None):
+        if c is None:
+            if 0 <= x < self._w and 0 <= y < self._h:
+                return self._get(x, y)
+            return None
+        self._set(x, y, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        for yy in range(max(y, 0), min(y + h, self._h)):
+            for xx in range(max(x, 0), min(x + w, self._w)):
+                self._set(xx, yy, c)
+
+    def fill(self, c):
+        self.fill_rect(0, 0, self._w, self._h, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def line(self, x0, y0, x1, y1, c):
+        dx, dy = abs(x1 - x0), -abs(y1 - y0)
+        sx, sy = (1 if x0 < x1 else -1), (1 if y0 < y1 else -1)
+        err = dx + dy
+        while True:
+            self._set(x0, y0, c)
+            if x0 == x1 and y0 == y1:
+                return
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+
+    def text(self, s, x, y, c=1):
+        for i in range(len(s)):
+            self.fill_rect(x + 8 * i + 1, y + 1, 6, 6, c)
+
+    def blit(self, fb, x, y, key=-1, palette=None):
+        for yy in range(fb._h):
+            for xx in range(fb._w):
+                v = fb._get(xx, yy)
+                if v != key:
+                    self._set(x + xx, y + yy, v)
+
+    def scroll(self, dx, dy):
+        pass
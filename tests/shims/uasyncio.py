@@ -0,0 +1,11 @@
+"""CPython下运行测试用的uasyncio，基于asyncio"""
+import asyncio
+from asyncio import *  # noqa: F401,F403
+
+
+async def sleep_ms(ms):
+    await asyncio.sleep(ms / 1000)
+
+
+async def wait_for_ms(awaitable, ms):
+    return await asyncio.wait_for(awaitable, ms / 1000)
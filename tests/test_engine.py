@@ -0,0 +1,108 @@
+"""引擎帧循环的测试
+
+用法（在仓库根目录运行）:
+    python -m pytest tests/test_engine.py
+    micropython tests/test_engine.py
+"""
+import sys
+import os
+
+sys.path.insert(0, os.getcwd() if hasattr(os, "getcwd") else ".")
+
+import framebuf
+import uasyncio
+from AyUI import Engine, Activity, Event, BasicView, Pixel
+
+
+def make_engine():
+    fb = framebuf.FrameBuffer(bytearray(64 * 32 // 8), 64, 32, framebuf.MONO_VLSB)
+    engine = Engine(64, 32, fb, lambda *args: None)
+    side = framebuf.FrameBuffer(bytearray(16), 16, 8, framebuf.MONO_VLSB)
+    engine.add_surface("side", 16, 8, side, lambda *args: None)
+
+    @engine.register_activity("Main")
+    class Main(Activity):
+        def view(self, space):
+            return BasicView(Pixel(1), space=space)
+
+    engine.start_activity_from("Main")
+    return engine
+
+
+def test_stop_wakes_idle_surfaces():
+    # 按需渲染时所有表面都在空闲等待，stop()需要唤醒它们
+    engine = make_engine()
+    result = []
+
+    async def stop():
+        await uasyncio.sleep_ms(100)
+        engine.stop()
+
+    async def main():
+        uasyncio.create_task(stop())
+        try:
+            await uasyncio.wait_for_ms(engine.start(20, on_demand=True), 2000)
+            result.append("stopped")
+        except uasyncio.TimeoutError:
+            result.append("timeout")
+
+    uasyncio.run(main())
+    assert result == ["stopped"], result
+    assert not engine.enable
+
+
+def test_job_result_goes_to_owner():
+    # 结果作为事件提交，在下一帧处理事件时交给提交任务的Activity，即使它不在最前面
+    fb = framebuf.FrameBuffer(bytearray(64 * 32 // 8), 64, 32, framebuf.MONO_VLSB)
+    engine = Engine(64, 32, fb, lambda *args: None)
+    received = []
+
+    def work():
+        yield
+        return 42
+
+    @engine.register_activity("Owner")
+    class Owner(Activity):
+        def onCreate(self):
+            self.event.on("done", received.append)
+            self.activity.submit(work(), "done")
+
+        def view(self, space):
+            return BasicView(Pixel(1), space=space)
+
+    @engine.register_activity("Top")
+    class Top(Activity):
+        def onCreate(self):
+            self.event.on("done", lambda payload: received.append(("top", payload)))
+
+        def view(self, space):
+            return BasicView(Pixel(1), space=space)
+
+    surface = engine.surface
+    engine.start_activity_from("Owner")
+    surface.handle_events()
+    surface.commit(Event(Event.PUSH_ACTIVITY, "Top"))
+    surface.handle_events()
+    engine.jobs.run(100)
+    assert received == []
+    assert [event.event for event in surface.events] == ["done"]
+    surface.handle_events()
+    assert received == [42]
+
+
+def main():
+    failed = 0
+    names = [name for name in sorted(globals()) if name.startswith("test_")]
+    for name in names:
+        try:
+            globals()[name]()
+            print("ok     ", name)
+        except AssertionError as e:
+            failed += 1
+            print("FAILED ", name, e)
+    print("%d passed, %d failed" % (len(names) - failed, failed))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
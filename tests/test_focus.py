@@ -0,0 +1,115 @@
+"""焦点管理的测试
+
+用法（在仓库根目录运行）:
+    python -m pytest tests/test_focus.py
+    micropython tests/test_focus.py
+"""
+import sys
+import os
+
+sys.path.insert(0, os.getcwd() if hasattr(os, "getcwd") else ".")
+
+import framebuf
+from AyUI import Engine, Activity, Event, Drawable, BasicView, ScrollView
+
+
+class Item(Drawable):
+    """可获得焦点的4x4方块"""
+    focusable = True
+
+    @property
+    def width(self):
+        return 4
+
+    @property
+    def height(self):
+        return 4
+
+    def draw(self, framebuf, axis):
+        framebuf.fill_rect(axis[0], axis[1], 4, 4, 1 if self.focused else 0)
+
+
+def make_engine(view):
+    """创建只有一个Activity的引擎，Activity记录收到的编码器事件"""
+    fb = framebuf.FrameBuffer(bytearray(64 * 32 // 8), 64, 32, framebuf.MONO_VLSB)
+    engine = Engine(64, 32, fb, lambda *args: None)
+
+    @engine.register_activity("Main")
+    class Main(Activity):
+        def onCreate(self):
+            self.turns = []
+            self.event.on(Event.ENCODER_TURN, self.turns.append)
+
+        def view(self, space):
+            return view(space)
+
+    engine.start_activity_from("Main")
+    frame(engine)
+    return engine, engine.instances[-1]
+
+
+def frame(engine):
+    surface = engine.surface
+    surface.handle_events()
+    surface.apply_state()
+    surface.draw()
+    surface.flush()
+
+
+def items(space):
+    return BasicView(BasicView(Item(), space=(4, 4)), BasicView(Item(), space=(4, 4), margin=(8, 0, 0, 0)),
+                     space=space)
+
+
+def test_encoder_not_bound_by_default():
+    # 没有绑定焦点导航时，编码器事件交给Activity
+    engine, instance = make_engine(items)
+    first = instance.focus.current
+    engine.commit(Event(Event.ENCODER_TURN, 1))
+    frame(engine)
+    assert instance.activity.turns == [1]
+    assert instance.focus.current is first
+
+
+def test_encoder_bound():
+    engine, instance = make_engine(items)
+    focus = instance.focus
+    focus.bind(Event.ENCODER_TURN)
+    engine.commit(Event(Event.ENCODER_TURN, 1))
+    frame(engine)
+    assert instance.activity.turns == []
+    assert focus.current is focus.order[1]
+
+
+def test_sync_after_scroll():
+    # 滚动后元素的位置变化，点击测试使用新的位置
+    def view(space):
+        return ScrollView(*[Item() for _ in range(8)], space=(4, 16))
+
+    engine, instance = make_engine(view)
+    focus = instance.focus
+    assert focus.hit(1, 5) is focus.order[1]
+    scroll = instance.view
+    scroll.offset = 4
+    engine.invalidate()
+    frame(engine)
+    assert focus.hit(1, 5) is focus.order[2]
+    assert [node.rect[1] for node in focus._rows] == sorted(node.rect[1] for node in focus._rows)
+
+
+def main():
+    failed = 0
+    names = [name for name in sorted(globals()) if name.startswith("test_")]
+    for name in names:
+        try:
+            globals()[name]()
+            print("ok     ", name)
+        except AssertionError as e:
+            failed += 1
+            print("FAILED ", name, e)
+    print("%d passed, %d failed" % (len(names) - failed, failed))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
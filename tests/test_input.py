@@ -0,0 +1,132 @@
+"""Button和Encoder的主机测试
+
+用法（在仓库根目录运行，需要MicroPython unix port）:
+    micropython tests/test_input.py
+"""
+import sys
+import os
+
+sys.path.insert(0, os.getcwd() if hasattr(os, "getcwd") else ".")
+
+from AyUI.core.event import Event
+from AyUI.core.input import Input
+from mock_input import MockPin, MockClock
+
+# 编码器顺时针转动一格的A、B电平变化
+CW = ((1, 0), (1, 1), (0, 1), (0, 0))
+CCW = ((0, 1), (1, 1), (1, 0), (0, 0))
+
+
+class FakeEngine:
+    """只接收事件的引擎，Input.queued()读取surface.events"""
+
+    def __init__(self):
+        self.surface = self
+        self.events = []
+
+    def commit(self, event):
+        self.events.append(event)
+
+    def wake(self):
+        pass
+
+    def take(self):
+        result = [(e.event, e.payload) for e in self.events]
+        self.events.clear()
+        return result
+
+
+def setup(**kw):
+    engine = FakeEngine()
+    clock = MockClock()
+    inputs = Input(engine, clock=clock)
+    pin = MockPin(1)
+    inputs.button(pin, "ok", **kw)
+    return engine, clock, inputs, pin
+
+
+def test_click_debounce():
+    engine, clock, inputs, pin = setup()
+    # 按下和松开时都有抖动
+    clock.play(inputs, [(10, pin, 0), (12, pin, 1), (13, pin, 0), (100, pin, 1), (102, pin, 0),
+                        (103, pin, 1)], 300)
+    assert engine.take() == [(Event.BUTTON_CLICK, "ok")]
+
+
+def test_double_click():
+    engine, clock, inputs, pin = setup(double_click=250)
+    clock.play(inputs, [(10, pin, 0), (60, pin, 1), (150, pin, 0), (200, pin, 1)], 600)
+    assert engine.take() == [(Event.BUTTON_DOUBLE_CLICK, "ok")]
+    # 间隔超过double_click时为单击
+    clock.play(inputs, [(1000, pin, 0), (1050, pin, 1)], 1500)
+    assert engine.take() == [(Event.BUTTON_CLICK, "ok")]
+
+
+def test_long_press_repeat():
+    engine, clock, inputs, pin = setup(long_press=600, repeat=100)
+    clock.play(inputs, [(10, pin, 0), (1000, pin, 1)], 1200)
+    events = engine.take()
+    assert events[0] == (Event.BUTTON_LONG_PRESS, "ok")
+    assert events[1:] == [(Event.BUTTON_REPEAT, "ok")] * 3, events
+
+
+def test_long_press_cancels_pending_click():
+    engine, clock, inputs, pin = setup(long_press=600, double_click=250)
+    # 单击后在双击间隔内再次按下并长按
+    clock.play(inputs, [(10, pin, 0), (60, pin, 1), (150, pin, 0), (1000, pin, 1)], 1500)
+    assert engine.take() == [(Event.BUTTON_LONG_PRESS, "ok")]
+
+
+def turn(a, b, steps):
+    for va, vb in steps:
+        if a.value() != va:
+            a.set(va)
+        if b.value() != vb:
+            b.set(vb)
+
+
+def test_encoder():
+    engine = FakeEngine()
+    inputs = Input(engine)
+    a, b = MockPin(0), MockPin(0)
+    inputs.encoder(a, b)
+    turn(a, b, CW * 2)
+    inputs.poll(10)
+    turn(a, b, CCW)
+    inputs.poll(20)
+    assert engine.take() == [(Event.ENCODER_TURN, 1)]
+
+
+def test_encoder_merges_queued():
+    engine = FakeEngine()
+    inputs = Input(engine)
+    a, b = MockPin(0), MockPin(0)
+    inputs.encoder(a, b)
+    # 事件处理之前轮询两次，合并为同一个事件
+    turn(a, b, CW)
+    inputs.poll(10)
+    turn(a, b, CW * 2)
+    inputs.poll(20)
+    assert engine.take() == [(Event.ENCODER_TURN, 3)]
+    # 事件被处理之后重新提交
+    turn(a, b, CCW)
+    inputs.poll(30)
+    assert engine.take() == [(Event.ENCODER_TURN, -1)]
+
+
+def main():
+    failed = 0
+    names = [name for name in sorted(globals()) if name.startswith("test_")]
+    for name in names:
+        try:
+            globals()[name]()
+            print("ok     ", name)
+        except AssertionError as e:
+            failed += 1
+            print("FAILED ", name, e)
+    print("%d passed, %d failed" % (len(names) - failed, failed))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
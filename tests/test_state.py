@@ -0,0 +1,145 @@
+"""状态绑定的测试
+
+用法（在仓库根目录运行）:
+    python -m pytest tests/test_state.py
+    micropython tests/test_state.py
+"""
+import sys
+import os
+
+sys.path.insert(0, os.getcwd() if hasattr(os, "getcwd") else ".")
+
+import framebuf
+from AyUI import Engine, Activity, BasicView, Pixel
+
+
+def make_engine(view):
+    """创建只有一个Activity的引擎，view(activity, space)返回视图"""
+    fb = framebuf.FrameBuffer(bytearray(64 * 32 // 8), 64, 32, framebuf.MONO_VLSB)
+    engine = Engine(64, 32, fb, lambda *args: None, partial_flush=True)
+
+    @engine.register_activity("Main")
+    class Main(Activity):
+        def onCreate(self):
+            self.value = self.activity.state(1)
+            self.other = self.activity.state(0)
+
+        def view(self, space):
+            return view(self, space)
+
+    engine.start_activity_from("Main")
+    frame(engine)
+    return engine, fb, engine.instances[-1].activity
+
+
+def frame(engine):
+    surface = engine.surface
+    surface.handle_events()
+    surface.apply_state()
+    surface.draw()
+    surface.flush()
+
+
+def test_bind_view_attribute():
+    # 绑定到视图的属性，视图没有place()和尺寸，变化时重新布局整个画面
+    def view(activity, space):
+        inner = BasicView(Pixel(1), space=(8, 8))
+        activity.value.bind(inner, "border")
+        return BasicView(inner, space=space)
+
+    engine, fb, activity = make_engine(view)
+    inner = engine.instances[-1].view.elements[0]
+    assert not inner.tracked
+    assert fb.pixel(0, 0) == 1      # 宽度为1的边框
+    activity.value.set(0)
+    frame(engine)
+    assert inner.border == 0
+    assert fb.pixel(0, 0) == 1      # 没有边框时Pixel位于原点
+    assert fb.pixel(9, 0) == 0
+
+
+def test_bind_drawable_partial():
+    # 绑定到组件的属性，尺寸不变时只重绘组件的区域
+    def view(activity, space):
+        dot = Pixel(1)
+        activity.value.bind(dot, "color")
+        return BasicView(dot, space=space)
+
+    engine, fb, activity = make_engine(view)
+    dot = engine.instances[-1].view.elements[0]
+    assert dot.tracked
+    assert fb.pixel(0, 0) == 1
+    activity.value.set(0)
+    engine.surface.apply_state()
+    assert not engine.surface._full
+    assert engine.surface.damage == [0, 0, 0, 0]
+    frame(engine)
+    assert fb.pixel(0, 0) == 0
+
+
+class CountingPixel(Pixel):
+    """记录绘制次数的Pixel"""
+    draws = 0
+
+    def draw(self, framebuf, axis):
+        self.draws += 1
+        super().draw(framebuf, axis)
+
+
+def test_partial_skips_outside():
+    # 只重绘部分区域时跳过区域外的组件，区域外的画面保持不变
+    def view(activity, space):
+        a = CountingPixel(1)
+        b = CountingPixel(1)
+        activity.value.bind(a, "color")
+        activity.other.bind(b, "color", fmt=lambda v: 1 - v)
+        return BasicView(BasicView(a, space=(1, 1)), BasicView(b, space=(1, 1), margin=(4, 0, 0, 0)),
+                         space=space)
+
+    engine, fb, activity = make_engine(view)
+    b = engine.instances[-1].view.elements[1].elements[0]
+    draws = b.draws
+    activity.value.set(0)
+    frame(engine)
+    assert fb.pixel(0, 0) == 0
+    assert fb.pixel(4, 0) == 1
+    assert b.draws == draws
+
+
+def test_partial_overdraw():
+    # 不能裁剪的framebuf中，超出区域绘制的组件之后的组件也需要重绘
+    def view(activity, space):
+        a = Pixel(1)
+        frame = Pixel(1, padding=(0, 0, 8, 0), border=1)   # 上边框覆盖(0, 0)到(10, 0)
+        c = Pixel(0, margin=(5, 0, 0, 0))
+        activity.value.bind(a, "color")
+        activity.other.bind(c, "color")
+        return BasicView(BasicView(a, space=(1, 1), margin=(2, 4, 0, 0)), frame, c, space=space)
+
+    engine, fb, activity = make_engine(view)
+    assert fb.pixel(5, 0) == 0
+    activity.value.set(0)
+    engine.surface.apply_state()
+    assert not engine.surface._full
+    frame(engine)
+    assert fb.pixel(2, 4) == 0
+    assert fb.pixel(5, 0) == 0
+    assert fb.pixel(4, 0) == 1
+
+
+def main():
+    failed = 0
+    names = [name for name in sorted(globals()) if name.startswith("test_")]
+    for name in names:
+        try:
+            globals()[name]()
+            print("ok     ", name)
+        except AssertionError as e:
+            failed += 1
+            print("FAILED ", name, e)
+    print("%d passed, %d failed" % (len(names) - failed, failed))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
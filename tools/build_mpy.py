@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""在主机上将 AyUI 和 driver 预编译为 .mpy
+
+用法:
+    python tools/build_mpy.py [--march armv7m] [--out build]
+
+需要安装 mpy-cross (pip install mpy-cross)，并且版本与固件中的MicroPython一致。
+未指定 --march 时无法编译viper代码，driver/accel_viper.py 会被跳过，运行时自动使用纯Python内核。
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+PACKAGES = ("AyUI", "driver")
+NATIVE_MODULES = ("accel_viper.py",)
+
+
+def build(root, out, mpy_cross, march=None, opt=None):
+    count = 0
+    for pkg in PACKAGES:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(root, pkg)):
+            dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+            for name in sorted(filenames):
+                if not name.endswith(".py"):
+                    continue
+                if name in NATIVE_MODULES and march is None:
+                    print("skip %s (requires --march)" % name)
+                    continue
+                src = os.path.join(dirpath, name)
+                rel = os.path.relpath(src, root)
+                dst = os.path.join(out, rel[:-3] + ".mpy")
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                cmd = [mpy_cross, "-s", rel, "-o", dst]
+                if march:
+                    cmd.append("-march=" + march)
+                if opt is not None:
+                    cmd.append("-O%d" % opt)
+                cmd.append(src)
+                subprocess.check_call(cmd)
+                print("%s -> %s" % (rel, os.path.relpath(dst, root)))
+                count += 1
+    return count
+
+
+def main():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--out", default=os.path.join(root, "build"),
+                        help="output directory (default: build/)")
+    parser.add_argument("--mpy-cross", default="mpy-cross",
+                        help="path to the mpy-cross executable")
+    parser.add_argument("--march", default=None,
+                        help="native architecture, e.g. armv7m, xtensawin, rv32imc")
+    parser.add_argument("-O", dest="opt", type=int, default=None,
+                        help="optimisation level passed to mpy-cross")
+    args = parser.parse_args()
+    try:
+        count = build(root, args.out, args.mpy_cross, args.march, args.opt)
+    except FileNotFoundError:
+        print("mpy-cross not found, install it with: pip install mpy-cross")
+        return 1
+    print("%d modules compiled into %s" % (count, args.out))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""在主机上回放设备记录的事件，并与基准对比帧耗时和画面
+
+用法:
+    micropython tools/replay.py <app> <recording.bin> [--out dir] [--golden dir] [--tolerance 20]
+
+需要MicroPython unix port（提供framebuf），在仓库根目录运行。
+<app>为可导入的模块名，需要提供make_engine()，返回注册了相同Activity、使用主机framebuf的Engine，
+不需要调用start()。记录文件由设备上的AyUI.core.recorder.Recorder.save()生成。
+
+--out     保存回放结果：replay.bin（包含每帧的耗时和画面CRC）以及每帧的画面 frame_<表面>_<帧>.raw
+--golden  与之前保存的回放结果对比，报告耗时超过基准tolerance%的帧和画面不同的帧
+"""
+import sys
+import os
+
+sys.path.insert(0, os.getcwd() if hasattr(os, "getcwd") else ".")
+
+import framebuf
+from AyUI.core.recorder import Recorder, load, replay, frame_buffer, FRAME
+
+RESULT = "replay.bin"
+
+
+def _exists(path):
+    try:
+        os.stat(path)
+        return True
+    except OSError:
+        return False
+
+
+def _frame_path(root, surface, n):
+    return "%s/frame_%d_%04d.raw" % (root, surface, n)
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _pixel_diff(surface, a, b):
+    # 返回不同的像素数和包围盒，framebuf格式未知时按字节比较
+    fmt = getattr(surface.framebuf, "layer_format", None)
+    w, h = surface.width, surface.height
+    if fmt is None:
+        n = 0
+        for i in range(min(len(a), len(b))):
+            if a[i] != b[i]:
+                n += 1
+        return n, None
+    fa = framebuf.FrameBuffer(bytearray(a), w, h, fmt)
+    fb = framebuf.FrameBuffer(bytearray(b), w, h, fmt)
+    n = 0
+    box = [w, h, -1, -1]
+    for y in range(h):
+        for x in range(w):
+            if fa.pixel(x, y) != fb.pixel(x, y):
+                n += 1
+                box[0], box[1] = min(box[0], x), min(box[1], y)
+                box[2], box[3] = max(box[2], x), max(box[3], y)
+    if n == 0:
+        return 0, None
+    return n, (box[0], box[1], box[2] - box[0] + 1, box[3] - box[1] + 1)
+
+
+def run(app, path, out=None, golden=None, tolerance=20):
+    engine = __import__(app).make_engine()
+    wrapped, records = load(path)
+    device = [r for r in records if r[0] == FRAME]
+    if wrapped:
+        print("[WARN] The recording has wrapped, frames before the first activity change may differ")
+    print("recorded: %d frames, %d events, max %d ms" % (
+        len(device), len(records) - len(device), max([r[3] for r in device] or [0])))
+
+    base = None
+    if golden is not None:
+        _, base = load(golden + "/" + RESULT)
+        base = [r for r in base if r[0] == FRAME]
+
+    # 回放的结果与记录大小相近，留出足够的空间避免覆盖
+    recorder = Recorder(size=os.stat(path)[6] * 2 + 64, crc=True)
+    if out is not None and not _exists(out):
+        os.mkdir(out)
+    counts = [0] * len(engine.surfaces)
+    slow = []
+    changed = []
+    total = 0
+    i = 0
+    for index, duration, crc in replay(engine, records, recorder, wrapped):
+        surface = engine.surfaces[index]
+        n = counts[index]
+        counts[index] += 1
+        total += duration
+        if out is not None:
+            buf = frame_buffer(surface)
+            if buf is not None:
+                with open(_frame_path(out, index, n), "wb") as f:
+                    f.write(buf)
+        if base is not None and i < len(base):
+            ref = base[i]
+            if duration > ref[3] * (100 + tolerance) // 100 and duration - ref[3] >= 2:
+                slow.append((i, duration, ref[3]))
+            if crc != ref[4]:
+                diff = None
+                ref_path = _frame_path(golden, index, n)
+                buf = frame_buffer(surface)
+                if buf is not None and _exists(ref_path):
+                    diff = _pixel_diff(surface, bytes(buf), _read(ref_path))
+                changed.append((i, index, n, diff))
+        i += 1
+
+    print("replayed: %d frames, total %d ms" % (i, total))
+    if out is not None:
+        recorder.save(out + "/" + RESULT)
+        print("saved to %s" % out)
+    if base is None:
+        return 0
+    if len(base) != i:
+        print("[WARN] Golden run has %d frames, replay has %d" % (len(base), i))
+    for frame, duration, ref in slow:
+        print("slower: frame %d took %d ms, golden %d ms" % (frame, duration, ref))
+    for frame, surface, n, diff in changed:
+        if diff is None:
+            print("changed: frame %d (surface %d #%d)" % (frame, surface, n))
+        else:
+            print("changed: frame %d (surface %d #%d) %d pixels in %s" % (frame, surface, n, diff[0], diff[1]))
+    print("%d slower, %d changed" % (len(slow), len(changed)))
+    return 1 if slow or changed else 0
+
+
+def main(argv):
+    args = []
+    opts = {"--out": None, "--golden": None, "--tolerance": "20"}
+    i = 1
+    while i < len(argv):
+        if argv[i] in opts:
+            opts[argv[i]] = argv[i + 1]
+            i += 2
+        else:
+            args.append(argv[i])
+            i += 1
+    if len(args) != 2:
+        print(__doc__)
+        return 2
+    return run(args[0], args[1], opts["--out"], opts["--golden"], int(opts["--tolerance"]))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""RemoteSink与tools/rfb_viewer.py的端到端检查，不需要开发板
+
+用法（在仓库根目录运行）:
+    python tools/rfb_check.py [--micropython micropython]
+
+用CPython启动查看器（--pty --dump），再用MicroPython unix port运行设备端：
+设备端在主机framebuf上绘制固定的图案，分几帧修改后通过伪终端发送，
+检查查看器保存的最后一帧与期望的画面是否一致。MONO_VLSB和RGB565格式各检查一次。
+"""
+import sys
+import os
+
+# 设备端绘制的帧数，每帧修改画面的一部分
+FRAMES = 3
+FORMATS = (("mono", 128, 64), ("rgb565", 64, 32))
+
+
+def color(kind, x, y, frame):
+    """(x, y)处在第frame帧之后的颜色，设备端和检查共用"""
+    if kind == "mono":
+        v = ((x * 7 + y * 3) >> 3) & 1
+        if x < 16 * frame:
+            v ^= 1
+        return v
+    v = (x * 2048 + y * 37 + x * y) & 0xFFFF
+    if y < 8 * frame:
+        v ^= 0xF81F
+    return v
+
+
+def device(path, kind, w, h):
+    """在MicroPython unix port中运行，向伪终端path发送FRAMES帧"""
+    sys.path.insert(0, os.getcwd())
+    import time
+    import framebuf
+    from AyUI import Engine
+    from AyUI.core.remote import RemoteSink
+
+    fmt = framebuf.MONO_VLSB if kind == "mono" else framebuf.RGB565
+    size = w * ((h + 7) // 8) if kind == "mono" else w * h * 2
+
+    class Screen(framebuf.FrameBuffer):
+        layer_format = fmt
+
+        def __init__(self):
+            buf = bytearray(size)
+            super().__init__(buf, w, h, fmt)
+            self.buffer = buf
+
+    fb = Screen()
+    engine = Engine(w, h, fb, lambda: None)
+    stream = open(path, "wb")
+    # 不限制预算，每次刷新都发送完整的变化
+    sink = RemoteSink(stream, share=100, big_endian=False)
+    assert sink.attach(engine.surface), Exception("RemoteSink.attach failed")
+    for frame in range(1, FRAMES + 1):
+        for y in range(h):
+            for x in range(w):
+                fb.pixel(x, y, color(kind, x, y, frame))
+        time.sleep_ms(1000 // engine.surface.target_fps)   # 按帧率刷新，每帧的预算是完整的
+        engine.surface.draw_exec()
+        assert sink.skipped == 0, Exception("frame {} did not fit into the budget".format(frame))
+    stream.close()
+
+
+def expected_rgb(kind, w, h):
+    out = bytearray()
+    for y in range(h):
+        for x in range(w):
+            c = color(kind, x, y, FRAMES)
+            if kind == "mono":
+                out += bytes((255, 255, 255)) if c else bytes(3)
+            else:
+                out += bytes(((c >> 11) * 255 // 31, ((c >> 5) & 0x3F) * 255 // 63, (c & 0x1F) * 255 // 31))
+    return bytes(out)
+
+
+def check(micropython, kind, w, h):
+    import subprocess
+    import tempfile
+    dump = os.path.join(tempfile.mkdtemp(), "frame.ppm")
+    viewer = subprocess.Popen(
+        [sys.executable, os.path.join("tools", "rfb_viewer.py"), "--pty", "--dump", dump,
+         "--scale", "1", "--frames", str(FRAMES)],
+        stdout=subprocess.PIPE, universal_newlines=True)
+    try:
+        path = viewer.stdout.readline().strip()
+        subprocess.check_call(micropython.split() + [os.path.join("tools", "rfb_check.py"),
+                                                     "--device", path, kind, str(w), str(h)])
+        viewer.wait(timeout=30)
+    finally:
+        if viewer.poll() is None:
+            viewer.kill()
+    with open(dump, "rb") as f:
+        data = f.read()
+    header = b"P6 %d %d 255\n" % (w, h)
+    if not data.startswith(header) or data[len(header):] != expected_rgb(kind, w, h):
+        print("%s: FAILED" % kind)
+        return False
+    print("%s: ok" % kind)
+    return True
+
+
+def main(argv):
+    if len(argv) == 6 and argv[1] == "--device":
+        device(argv[2], argv[3], int(argv[4]), int(argv[5]))
+        return 0
+    micropython = "micropython"
+    if len(argv) == 3 and argv[1] == "--micropython":
+        micropython = argv[2]
+    ok = True
+    for kind, w, h in FORMATS:
+        ok = check(micropython, kind, w, h) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
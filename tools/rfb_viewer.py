@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""在主机上显示设备通过AyUI.core.remote.RemoteSink发送的画面
+
+用法:
+    python tools/rfb_viewer.py /dev/ttyUSB0 [--baud 115200] [--scale 4]
+    python tools/rfb_viewer.py --pty [--dump frame.ppm] [--frames N]
+
+只使用Python标准库，Linux/macOS下直接打开串口设备。有tkinter时打开窗口显示，
+否则（或指定--dump时）将每帧画面写入PPM文件。
+--pty 创建一对伪终端并打印设备端的路径，在主机上用MicroPython unix port运行UI时，
+      将该路径作为RemoteSink的字节流，即可不接开发板进行端到端测试：
+          sink = RemoteSink(open("/dev/pts/5", "wb"))
+--frames 收到N帧后退出，退出码为0
+"""
+import argparse
+import os
+import select
+import struct
+import sys
+import zlib
+
+# MicroPython framebuf 的格式常量
+MONO_VLSB, RGB565, GS4_HMSB, MONO_HLSB, MONO_HMSB, GS2_HMSB, GS8 = range(7)
+
+BAUDS = {9600: "B9600", 19200: "B19200", 38400: "B38400", 57600: "B57600",
+         115200: "B115200", 230400: "B230400", 460800: "B460800",
+         921600: "B921600", 1000000: "B1000000", 2000000: "B2000000"}
+
+
+def open_port(path, baud):
+    fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+    if os.isatty(fd):
+        import termios
+        import tty
+        tty.setraw(fd)
+        attrs = termios.tcgetattr(fd)
+        speed = getattr(termios, BAUDS.get(baud, "B115200"))
+        attrs[4] = attrs[5] = speed
+        termios.tcsetattr(fd, termios.TCSANOW, attrs)
+    return fd
+
+
+def rle_decode(data, unit):
+    """与driver.accel.rle_encode对应的解码"""
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        c = data[i]
+        i += 1
+        if c < 128:
+            m = (c + 1) * unit
+            out += data[i:i + m]
+            i += m
+        else:
+            out += data[i:i + unit] * (c - 126)
+            i += unit
+    return out
+
+
+class Screen:
+    """按设备缓冲区的格式保存画面，并转换为RGB"""
+
+    def __init__(self, header):
+        (self.w, self.h, self.fmt, self.row_bytes, self.rows, self.tile_bytes,
+         self.tile_rows, self.unit, self.big_endian) = struct.unpack("<HHBHHHHBB", header)
+        self.buffer = bytearray(self.row_bytes * self.rows)
+        self.palette = None
+
+    def tile(self, payload):
+        c, r, enc = payload[0], payload[1], payload[2]
+        data = payload[3:]
+        if enc == 1:
+            data = rle_decode(data, self.unit)
+        x0 = c * self.tile_bytes
+        y0 = r * self.tile_rows
+        w = min(self.tile_bytes, self.row_bytes - x0)
+        h = min(self.tile_rows, self.rows - y0)
+        if len(data) != w * h:
+            return False
+        for y in range(h):
+            start = (y0 + y) * self.row_bytes + x0
+            self.buffer[start:start + w] = data[y * w:(y + 1) * w]
+        return True
+
+    def _index(self, x, y):
+        b = self.buffer
+        if self.fmt == MONO_VLSB:
+            return (b[(y >> 3) * self.row_bytes + x] >> (y & 7)) & 1
+        if self.fmt == MONO_HLSB:
+            return (b[y * self.row_bytes + (x >> 3)] >> (7 - (x & 7))) & 1
+        if self.fmt == MONO_HMSB:
+            return (b[y * self.row_bytes + (x >> 3)] >> (x & 7)) & 1
+        if self.fmt == GS2_HMSB:
+            return (b[y * self.row_bytes + (x >> 2)] >> ((x & 3) * 2)) & 3
+        if self.fmt == GS4_HMSB:
+            v = b[y * self.row_bytes + (x >> 1)]
+            return (v >> 4) if (x & 1) == 0 else (v & 0x0F)
+        return b[y * self.row_bytes + x]
+
+    def rgb(self):
+        """返回w*h*3字节的RGB数据"""
+        out = bytearray(self.w * self.h * 3)
+        o = 0
+        levels = {MONO_VLSB: 1, MONO_HLSB: 1, MONO_HMSB: 1, GS2_HMSB: 3, GS4_HMSB: 15, GS8: 255}
+        for y in range(self.h):
+            for x in range(self.w):
+                if self.fmt == RGB565:
+                    i = y * self.row_bytes + x * 2
+                    hi, lo = self.buffer[i], self.buffer[i + 1]
+                    c = (hi << 8 | lo) if self.big_endian else (lo << 8 | hi)
+                elif self.palette is not None:
+                    i = self._index(x, y) * 2
+                    c = self.palette[i] << 8 | self.palette[i + 1]
+                else:
+                    v = self._index(x, y) * 255 // levels[self.fmt]
+                    out[o:o + 3] = bytes((v, v, v))
+                    o += 3
+                    continue
+                out[o] = (c >> 11) * 255 // 31
+                out[o + 1] = ((c >> 5) & 0x3F) * 255 // 63
+                out[o + 2] = (c & 0x1F) * 255 // 31
+                o += 3
+        return out
+
+    def ppm(self, scale=1):
+        rgb = self.rgb()
+        if scale > 1:
+            rows = []
+            for y in range(self.h):
+                row = bytearray()
+                line = rgb[y * self.w * 3:(y + 1) * self.w * 3]
+                for x in range(self.w):
+                    row += line[x * 3:x * 3 + 3] * scale
+                rows.append(bytes(row) * scale)
+            rgb = b"".join(rows)
+        return b"P6 %d %d 255\n" % (self.w * scale, self.h * scale) + bytes(rgb)
+
+
+class Parser:
+    """从字节流中解析消息，校验失败时丢弃并重新同步"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.errors = 0
+
+    def feed(self, chunk):
+        self.data += chunk
+        messages = []
+        data = self.data
+        while True:
+            i = data.find(b"\xA5\x5A")
+            if i < 0:
+                del data[:max(len(data) - 1, 0)]
+                break
+            if len(data) < i + 5:
+                del data[:i]
+                break
+            kind = data[i + 2]
+            n = data[i + 3] | data[i + 4] << 8
+            end = i + 5 + n + 1
+            if len(data) < end:
+                del data[:i]
+                break
+            body = bytes(data[i + 5:i + 5 + n])
+            if zlib.crc32(body) & 0xFF != data[end - 1]:
+                self.errors += 1
+                del data[:i + 2]   # 从下一个字节开始重新查找
+                continue
+            messages.append((kind, body))
+            del data[:end]
+        return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("port", nargs="?", help="serial device, e.g. /dev/ttyUSB0")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--pty", action="store_true", help="create a pseudo-terminal pair")
+    parser.add_argument("--scale", type=int, default=4, help="window / dump scale")
+    parser.add_argument("--dump", default=None, help="write every frame to this PPM file")
+    parser.add_argument("--frames", type=int, default=0, help="exit after N frames")
+    args = parser.parse_args()
+
+    if args.pty:
+        import tty
+        fd, device = os.openpty()
+        tty.setraw(device)
+        print(os.ttyname(device), flush=True)
+    elif args.port:
+        fd = open_port(args.port, args.baud)
+    else:
+        parser.error("either a port or --pty is required")
+
+    window = None
+    if args.dump is None:
+        try:
+            import tkinter
+            window = tkinter.Tk()
+            window.title("AyUI remote")
+            label = tkinter.Label(window)
+            label.pack()
+        except Exception:
+            args.dump = "frame.ppm"
+            print("tkinter is not available, writing frames to %s" % args.dump)
+
+    os.write(fd, b"R")  # 请求完整的画面
+    stream = Parser()
+    screen = None
+    frames = 0
+    while True:
+        if window is not None:
+            window.update()
+        ready, _, _ = select.select([fd], [], [], 0.05)
+        if not ready:
+            continue
+        try:
+            chunk = os.read(fd, 4096)
+        except OSError:
+            break   # 设备端已关闭
+        for kind, body in stream.feed(chunk):
+            if kind == ord("H"):
+                screen = Screen(body)
+            elif screen is None:
+                continue
+            elif kind == ord("P"):
+                screen.palette = body
+            elif kind == ord("T"):
+                if not screen.tile(body):
+                    stream.errors += 1
+            elif kind == ord("F"):
+                frames += 1
+                image = screen.ppm(args.scale)
+                if args.dump is not None:
+                    with open(args.dump, "wb") as f:
+                        f.write(image)
+                if window is not None:
+                    photo = tkinter.PhotoImage(data=image, format="PPM")
+                    label.configure(image=photo)
+                    label.image = photo
+                if args.frames and frames >= args.frames:
+                    print("%d frames, %d errors" % (frames, stream.errors))
+                    return 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())